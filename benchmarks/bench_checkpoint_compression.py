@@ -0,0 +1,80 @@
+"""
+Measure the compression ratio and the encode/decode throughput of the checkpoint blob compression formats
+on synthetic checkpoint blobs (serialized chat threads of growing length).
+
+Usage:
+    python -m benchmarks.bench_checkpoint_compression [--blobs 200] [--messages 400]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from welearn_database.data import compressed_blob
+from welearn_database.data.compressed_blob import compress_blob, decompress_blob
+from welearn_database.data.enumeration import BlobCompression
+
+WORDS = (
+    "the learning outcome of this course covers climate energy water biodiversity "
+    "sustainable development goal syllabus tutor question answer document source"
+).split()
+
+
+def _checkpoint_blob(rng: random.Random, messages: int) -> bytes:
+    thread = [
+        {
+            "type": "human" if i % 2 == 0 else "ai",
+            "id": f"run-{rng.getrandbits(64):016x}",
+            "content": " ".join(rng.choices(WORDS, k=rng.randint(10, 120))),
+            "response_metadata": {"finish_reason": "stop", "model_name": "gpt"},
+        }
+        for i in range(messages)
+    ]
+    return json.dumps({"messages": thread, "step": messages}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blobs", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=400)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    blobs = [
+        _checkpoint_blob(rng, rng.randint(1, args.messages)) for _ in range(args.blobs)
+    ]
+    raw_size = sum(len(blob) for blob in blobs)
+    megabytes = raw_size / 1e6
+
+    formats = [
+        (BlobCompression.ZLIB, 1),
+        (BlobCompression.ZLIB, None),
+        (BlobCompression.LZMA, None),
+    ]
+    if compressed_blob.zstandard is not None:
+        formats += [(BlobCompression.ZSTD, None), (BlobCompression.ZSTD, 10)]
+    else:
+        print("zstandard is not installed, zstd is skipped")
+
+    print(f"{len(blobs)} blobs, {megabytes:.1f} MB uncompressed")
+    print(f"{'format':12s} {'ratio':>8s} {'encode MB/s':>12s} {'decode MB/s':>12s}")
+    for compression, level in formats:
+        start = time.perf_counter()
+        stored = [compress_blob(blob, compression, level) for blob in blobs]
+        encode = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = [decompress_blob(blob) for blob in stored]
+        decode = time.perf_counter() - start
+        assert decoded == blobs
+
+        ratio = raw_size / sum(len(blob) for blob in stored)
+        name = compression.value + ("" if level is None else f"-{level}")
+        print(
+            f"{name:12s} {ratio:8.1f} {megabytes / encode:12.1f} {megabytes / decode:12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
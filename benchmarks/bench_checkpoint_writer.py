@@ -0,0 +1,157 @@
+"""
+Compare persisting agent steps one ORM object at a time with write_checkpoint_step,
+on simulated 50-turn conversations: each turn writes a checkpoint, the blobs of the channels it changed
+(merged, as they are shared by the following checkpoints) and its pending writes.
+
+Usage:
+    python -m benchmarks.bench_checkpoint_writer [--conversations 20] [--turns 50]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.models import Base
+from welearn_database.data.models.agent_related import (
+    CheckpointBlobs,
+    Checkpoints,
+    CheckpointWrites,
+)
+from welearn_database.modules.checkpoint_writer import (
+    CheckpointStep,
+    write_checkpoint_step,
+)
+
+CHANNELS = ["messages", "documents", "sdg", "task", "memory"]
+WRITES_PER_TURN = 4
+
+
+def _conversation(name: str, turns: int) -> list[CheckpointStep]:
+    steps = []
+    versions = {channel: "1" for channel in CHANNELS}
+    messages = []
+    for turn in range(1, turns + 1):
+        messages.append({"role": "user", "content": f"question {turn} " * 20})
+        messages.append({"role": "assistant", "content": f"answer {turn} " * 60})
+        # Two channels change on every turn, the other ones keep their version
+        changed = ["messages", CHANNELS[1 + turn % (len(CHANNELS) - 1)]]
+        for channel in changed:
+            versions[channel] = str(turn)
+        state = json.dumps({"messages": messages}).encode()
+        steps.append(
+            CheckpointStep(
+                thread_id=name,
+                checkpoint_id=f"{turn:05d}",
+                parent_checkpoint_id=f"{turn - 1:05d}" if turn > 1 else None,
+                checkpoint={"v": 1, "channel_versions": dict(versions)},
+                metadata={"step": turn, "source": "loop"},
+                blobs=[
+                    (channel, versions[channel], "json", state) for channel in changed
+                ],
+                writes=[
+                    ("task", idx, "messages", "json", state[-512:])
+                    for idx in range(WRITES_PER_TURN)
+                ],
+            )
+        )
+    return steps
+
+
+def _orm_write(session, step: CheckpointStep):
+    session.add(
+        Checkpoints(
+            thread_id=step.thread_id,
+            checkpoint_ns=step.checkpoint_ns,
+            checkpoint_id=step.checkpoint_id,
+            parent_checkpoint_id=step.parent_checkpoint_id,
+            checkpoint=step.checkpoint,
+            metadata_=step.metadata,
+        )
+    )
+    session.flush()
+    for channel, version, type_, blob in step.blobs:
+        session.merge(
+            CheckpointBlobs(
+                thread_id=step.thread_id,
+                checkpoint_ns=step.checkpoint_ns,
+                channel=channel,
+                version_=version,
+                type_=type_,
+                blob=blob,
+            )
+        )
+        session.flush()
+    for task_id, idx, channel, type_, blob in step.writes:
+        session.add(
+            CheckpointWrites(
+                thread_id=step.thread_id,
+                checkpoint_ns=step.checkpoint_ns,
+                checkpoint_id=step.checkpoint_id,
+                task_id=task_id,
+                idx=idx,
+                channel=channel,
+                type_=type_,
+                blob=blob,
+            )
+        )
+        session.flush()
+    session.commit()
+
+
+def _steps_per_sec(session_maker, conversations, write) -> float:
+    with session_maker() as session:
+        start = time.perf_counter()
+        for steps in conversations:
+            for step in steps:
+                write(session, step)
+        elapsed = time.perf_counter() - start
+    return sum(len(steps) for steps in conversations) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+
+        @event.listens_for(engine, "connect")
+        def _attach(dbapi_connection, _):
+            for schema in DbSchemaEnum:
+                path = os.path.join(tmp_dir, f"{schema.value}.db")
+                dbapi_connection.execute(f"ATTACH '{path}' AS {schema.value}")
+
+        Base.metadata.create_all(engine)
+        session_maker = sessionmaker(engine)
+
+        orm = _steps_per_sec(
+            session_maker,
+            [_conversation(f"orm-{i}", args.turns) for i in range(args.conversations)],
+            _orm_write,
+        )
+        batched = _steps_per_sec(
+            session_maker,
+            [
+                _conversation(f"batched-{i}", args.turns)
+                for i in range(args.conversations)
+            ],
+            write_checkpoint_step,
+        )
+        engine.dispose()
+
+    print(f"{args.conversations} conversations of {args.turns} turns")
+    print(f"one ORM object per row : {orm:10.0f} steps/sec")
+    print(f"write_checkpoint_step  : {batched:10.0f} steps/sec")
+    print(f"speedup                : {batched / orm:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
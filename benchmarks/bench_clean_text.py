@@ -0,0 +1,82 @@
+"""
+Compare clean_text with the previous implementation (one HTMLParser per call, no fast path)
+on multi-megabyte documents and on many short descriptions.
+
+Usage:
+    python -m benchmarks.bench_clean_text
+"""
+
+import time
+from html import unescape
+from html.parser import HTMLParser
+
+from welearn_database.modules.text_cleaning import clean_text
+
+DOCUMENT_SIZE = 4 * 1024 * 1024
+REPEAT = 5
+SHORT_TEXTS = 100_000
+
+
+class _LegacyTagRemover(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.result = []
+
+    def handle_data(self, data):
+        self.result.append(data)
+
+
+def legacy_clean_text(content):
+    remover = _LegacyTagRemover()
+    remover.feed(content + "\n")
+    txt = unescape("".join(remover.result))
+    return " ".join(txt.split()).strip()
+
+
+def _make_documents():
+    sentence = "WeLearn helps learners find   relevant resources\tabout the SDGs.\n"
+    plain = (sentence * (DOCUMENT_SIZE // len(sentence) + 1))[:DOCUMENT_SIZE]
+    html_sentence = "<p>WeLearn helps <b>learners</b> find resources &amp; more.</p>\n"
+    html = (html_sentence * (DOCUMENT_SIZE // len(html_sentence) + 1))[:DOCUMENT_SIZE]
+    return {"plain text": plain, "html": html}
+
+
+def _timeit(func, text) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func(text)
+    return (time.perf_counter() - start) / REPEAT
+
+
+def _timeit_many(func, texts) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    return time.perf_counter() - start
+
+
+def main():
+    for name, text in _make_documents().items():
+        assert clean_text(text) == legacy_clean_text(text)
+        before = _timeit(legacy_clean_text, text)
+        after = _timeit(clean_text, text)
+        mb_size = len(text) / 1024 / 1024
+        print(
+            f"{name:<11} ({mb_size:.0f} MB): legacy {before * 1000:8.1f} ms, "
+            f"clean_text {after * 1000:8.1f} ms, speedup {before / after:5.1f}x"
+        )
+
+    short_texts = [
+        f"Description {i} of a document, about two hundred characters long. " * 3
+        for i in range(SHORT_TEXTS)
+    ]
+    before = _timeit_many(legacy_clean_text, short_texts)
+    after = _timeit_many(clean_text, short_texts)
+    print(
+        f"{SHORT_TEXTS} short plain texts: legacy {before * 1000:8.1f} ms, "
+        f"clean_text {after * 1000:8.1f} ms, speedup {before / after:5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
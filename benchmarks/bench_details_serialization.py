@@ -0,0 +1,96 @@
+"""
+Compare the serialization of document details (nested author and license dataclasses):
+the previous dataclass walk followed by json.dumps, serialize_details with the stdlib json, and with orjson.
+
+Usage:
+    python -m benchmarks.bench_details_serialization [--documents 20000] [--authors 8]
+"""
+
+import argparse
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from welearn_database.data import details_dict
+from welearn_database.data.details_dict import DetailsDict, serialize_details
+
+
+@dataclass
+class AuthorDetails:
+    name: str
+    misc: str
+    affiliation: str = ""
+
+
+@dataclass
+class LicenseDetails:
+    name: str
+    url: str
+    since: str = ""
+    holders: list[AuthorDetails] = field(default_factory=list)
+
+
+def _details(i: int, authors: int) -> dict:
+    # Dates as strings, the previous serializer does not handle them
+    return {
+        "authors": [
+            AuthorDetails(
+                name=f"Author {i}-{j}",
+                misc=f"https://orcid.org/0000-0000-0000-{j:04d}",
+                affiliation="Learning Planet Institute",
+            )
+            for j in range(authors)
+        ],
+        "license": LicenseDetails(
+            name="CC BY-SA 4.0",
+            url="https://creativecommons.org/licenses/by-sa/4.0/",
+            since="2020-01-01",
+            holders=[AuthorDetails(name=f"Publisher {i}", misc="")],
+        ),
+        "publisher": "WeLearn",
+        "tags": ["climate", "energy", "biodiversity"],
+        "duration": 3600 + i,
+        "external_id": str(uuid.UUID(int=i)),
+        "published_at": datetime(2026, 1, 1, tzinfo=timezone.utc).isoformat(),
+    }
+
+
+def _documents_per_sec(documents: list[dict], serialize) -> float:
+    start = time.perf_counter()
+    for details in documents:
+        serialize(details)
+    return len(documents) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=20_000)
+    parser.add_argument("--authors", type=int, default=8)
+    args = parser.parse_args()
+
+    documents = [_details(i, args.authors) for i in range(args.documents)]
+    details_type = DetailsDict()
+
+    previous = _documents_per_sec(
+        documents,
+        lambda details: json.dumps(details_type.process_bind_param(details, None)),
+    )
+    with patch.object(details_dict, "orjson", None):
+        stdlib = _documents_per_sec(documents, serialize_details)
+
+    print(f"{args.documents} documents, {args.authors} authors each")
+    print(f"dataclass walk + json.dumps : {previous:10.0f} documents/sec")
+    print(f"serialize_details (stdlib)  : {stdlib:10.0f} documents/sec")
+    if details_dict.orjson is None:
+        print("orjson is not installed, the orjson path is skipped")
+        return
+    fast = _documents_per_sec(documents, serialize_details)
+    print(f"serialize_details (orjson)  : {fast:10.0f} documents/sec")
+    print(f"speedup                     : {fast / previous:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare WeLearnDocument construction throughput with and without the validators.
+
+Usage:
+    python -m benchmarks.bench_document_construction
+"""
+
+import time
+import uuid
+
+from welearn_database.data.models.document_related import WeLearnDocument
+from welearn_database.modules.text_cleaning import clean_text
+
+DOCUMENTS = 100_000
+
+
+def _make_values() -> list[dict]:
+    corpus_id = uuid.uuid4()
+    content = "<p>WeLearn helps <b>learners</b> find resources &amp; more.</p>" * 20
+    return [
+        dict(
+            url=f"https://example.com/document-{i}",
+            title=f"Document {i}",
+            lang="en",
+            full_content=content,
+            description="<i>A short description</i> of the document.",
+            doi=f"10.1000/doc{i}",
+            corpus_id=corpus_id,
+        )
+        for i in range(DOCUMENTS)
+    ]
+
+
+def main():
+    values = _make_values()
+    cleaned_values = [
+        {
+            **v,
+            "full_content": clean_text(v["full_content"]),
+            "description": clean_text(v["description"]),
+        }
+        for v in values
+    ]
+
+    start = time.perf_counter()
+    for v in values:
+        WeLearnDocument(**v)
+    validated = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for v in cleaned_values:
+        WeLearnDocument.from_trusted_values(**v)
+    trusted = time.perf_counter() - start
+
+    print(f"validated construction : {DOCUMENTS / validated:10.0f} documents/sec")
+    print(f"trusted construction   : {DOCUMENTS / trusted:10.0f} documents/sec")
+    print(f"speedup                : {validated / trusted:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Load slice embeddings from an SQLite stand-in, decoding them by hand (np.frombuffer + copy)
+versus through the EmbeddingArray column type (read-only view, no copy).
+
+Usage:
+    python -m benchmarks.bench_embedding_array [--rows 1000000] [--dim 64]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import (
+    Column,
+    Integer,
+    LargeBinary,
+    MetaData,
+    Table,
+    create_engine,
+    select,
+)
+
+from welearn_database.data.embedding_array import EmbeddingArray, encode_embedding
+
+BATCH_SIZE = 50_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=64)
+    args = parser.parse_args()
+
+    metadata = MetaData()
+    raw_table = Table(
+        "document_slice",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("embedding", LargeBinary),
+    )
+    typed_table = Table(
+        "document_slice",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("embedding", EmbeddingArray),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        metadata.create_all(engine)
+        rng = np.random.default_rng(0)
+        with engine.begin() as conn:
+            for start in range(0, args.rows, BATCH_SIZE):
+                count = min(BATCH_SIZE, args.rows - start)
+                vectors = rng.random((count, args.dim), dtype=np.float32)
+                conn.execute(
+                    raw_table.insert(),
+                    [{"embedding": encode_embedding(v)} for v in vectors],
+                )
+
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            hand_rolled = [
+                np.frombuffer(blob, dtype=np.float32, offset=16).copy()
+                for blob in conn.execute(select(raw_table.c.embedding)).scalars()
+            ]
+            hand_rolled_time = time.perf_counter() - start
+            del hand_rolled
+
+            start = time.perf_counter()
+            views = conn.execute(select(typed_table.c.embedding)).scalars().all()
+            view_time = time.perf_counter() - start
+            del views
+        engine.dispose()
+
+    print(f"{args.rows} embeddings of dimension {args.dim}")
+    print(f"frombuffer + copy  : {hand_rolled_time:8.2f} s")
+    print(f"EmbeddingArray view: {view_time:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
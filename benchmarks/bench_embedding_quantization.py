@@ -0,0 +1,68 @@
+"""
+Measure the recall impact of the float16 and int8 embedding storage formats:
+top-k cosine rankings over dequantized vectors are compared with the float32 rankings.
+
+Usage:
+    python -m benchmarks.bench_embedding_quantization [--slices 20000] [--dim 384]
+"""
+
+import argparse
+
+import numpy as np
+
+from welearn_database.data.embedding_array import decode_embedding, quantize_embedding
+from welearn_database.data.enumeration import EmbeddingStorage
+
+TOP_K = 10
+QUERIES = 200
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _top_k(corpus: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :TOP_K]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slices", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    # Clustered vectors, closer to real sentence embeddings than uniform noise
+    centers = rng.normal(size=(50, args.dim))
+    corpus = centers[rng.integers(0, 50, args.slices)] + 0.5 * rng.normal(
+        size=(args.slices, args.dim)
+    )
+    corpus = _normalize(corpus.astype(np.float32))
+    queries = _normalize(
+        (
+            corpus[rng.integers(0, args.slices, QUERIES)]
+            + 0.3 * rng.normal(size=(QUERIES, args.dim))
+        ).astype(np.float32)
+    )
+    reference = _top_k(corpus, queries)
+
+    for storage in EmbeddingStorage:
+        blobs = [quantize_embedding(vector, storage) for vector in corpus]
+        decoded = np.stack([decode_embedding(blob) for blob in blobs]).astype(
+            np.float32
+        )
+        ranking = _top_k(_normalize(decoded), queries)
+        recall = np.mean(
+            [len(set(r) & set(q)) / TOP_K for r, q in zip(reference, ranking)]
+        )
+        cosine_error = np.abs(np.sum(_normalize(decoded) * corpus, axis=1) - 1.0).mean()
+        size = sum(len(blob) for blob in blobs) / 1024 / 1024
+        print(
+            f"{storage.value:<8} size {size:8.2f} MB, recall@{TOP_K} {recall:.4f}, "
+            f"mean cosine drift {cosine_error:.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
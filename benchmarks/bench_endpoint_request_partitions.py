@@ -0,0 +1,116 @@
+"""
+Compare a 30-day dashboard query over endpoint_request as a plain table and as a monthly partitioned table.
+Partitioning is PostgreSQL specific: set the PG_* variables to target a local Postgres, the tables are
+created in a scratch schema which is dropped afterwards.
+
+Usage:
+    python -m benchmarks.bench_endpoint_request_partitions [--rows 10000000] [--months 24]
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import MetaData, Table, text
+
+from welearn_database.database_utils import create_sqlalchemy_engine
+from welearn_database.modules.partitions import add_months, month_start, plan_partitions
+
+SCHEMA = "bench_partitions"
+PLAIN = "endpoint_request_plain"
+PARTITIONED = "endpoint_request"
+RUNS = 5
+
+COLUMNS = """
+    id uuid DEFAULT gen_random_uuid() NOT NULL,
+    session_id uuid NOT NULL,
+    endpoint_name varchar NOT NULL,
+    http_code integer NOT NULL,
+    message varchar,
+    created_at timestamp DEFAULT NOW() NOT NULL
+"""
+
+DASHBOARD_QUERY = """
+SELECT endpoint_name, count(1), count(DISTINCT session_id)
+FROM {schema}.{table}
+WHERE created_at >= LOCALTIMESTAMP - INTERVAL '30 days'
+GROUP BY endpoint_name
+"""
+
+
+def _create_tables(conn, months: int):
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.{PLAIN} ({COLUMNS}, PRIMARY KEY (id))"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.{PARTITIONED} ({COLUMNS}, PRIMARY KEY (id, created_at)) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    for table in (PLAIN, PARTITIONED):
+        conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (session_id)"))
+    table = Table(PARTITIONED, MetaData(), schema=SCHEMA)
+    today = date.today()
+    plan = plan_partitions(
+        table, [], today, first_month=add_months(month_start(today), -months)
+    )
+    for partition in plan.to_create:
+        conn.execute(text(partition.create_ddl()))
+
+
+def _populate(conn, rows: int, months: int):
+    span = timedelta(days=30 * months)
+    insert = f"""
+        INSERT INTO {SCHEMA}.{{table}} (session_id, endpoint_name, http_code, created_at)
+        SELECT md5((i % 50000)::text)::uuid,
+            '/api/v1/endpoint_' || (i % 12),
+            200,
+            LOCALTIMESTAMP - (random() * INTERVAL '{span.days} days')
+        FROM generate_series(1, :rows) AS i
+    """
+    for table in (PLAIN, PARTITIONED):
+        conn.execute(text(insert.format(table=table)), {"rows": rows})
+        conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+
+
+def _time_query(conn, table: str) -> float:
+    query = text(DASHBOARD_QUERY.format(schema=SCHEMA, table=table))
+    conn.execute(query).all()
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        conn.execute(query).all()
+    return (time.perf_counter() - start) / RUNS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    engine = create_sqlalchemy_engine()
+    if engine.dialect.name != "postgresql":
+        print("Partitioning is PostgreSQL specific, set the PG_* variables")
+        sys.exit(1)
+
+    try:
+        with engine.begin() as conn:
+            _create_tables(conn, args.months)
+            _populate(conn, args.rows, args.months)
+        with engine.connect() as conn:
+            plain = _time_query(conn, PLAIN)
+            partitioned = _time_query(conn, PARTITIONED)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print(f"endpoint_request rows : {args.rows:10d} over {args.months} months")
+    print(f"plain table           : {plain:10.3f}s per 30-day query")
+    print(f"monthly partitions    : {partitioned:10.3f}s per 30-day query")
+    print(f"speedup               : {plain / partitioned:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
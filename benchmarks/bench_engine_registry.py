@@ -0,0 +1,57 @@
+"""
+Compare sessions/sec between a fresh engine per session and the shared engine registry.
+
+Usage (SQLite stand-in by default, set the PG_* variables to target a local Postgres):
+    python -m benchmarks.bench_engine_registry
+"""
+
+import os
+import tempfile
+import time
+
+from sqlalchemy import URL, create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from welearn_database.database_utils import create_db_session, dispose_engines
+
+ITERATIONS = 2000
+
+
+def _legacy_session():
+    url = URL.create(
+        drivername=os.environ["PG_DRIVER"],
+        username=os.getenv("PG_USER"),
+        password=os.getenv("PG_PASSWORD"),
+        host=os.getenv("PG_HOST"),
+        port=os.getenv("PG_PORT"),
+        database=os.getenv("PG_DB"),
+    )
+    return sessionmaker(create_engine(url))()
+
+
+def _run(session_factory) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        session = session_factory()
+        session.execute(text("SELECT 1"))
+        session.close()
+    return ITERATIONS / (time.perf_counter() - start)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if "PG_DRIVER" not in os.environ:
+            os.environ["PG_DRIVER"] = "sqlite"
+            os.environ["PG_DB"] = os.path.join(tmp_dir, "bench.db")
+
+        before = _run(_legacy_session)
+        after = _run(create_db_session)
+        dispose_engines()
+
+    print(f"engine per session : {before:10.1f} sessions/sec")
+    print(f"engine registry    : {after:10.1f} sessions/sec")
+    print(f"speedup            : {after / before:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Compare filling the historical_qty_* tables with three scans of process_state, one aggregate scan
+of process_state, and snapshot_historical_qty over document_latest_state, on an SQLite stand-in.
+
+Usage:
+    python -m benchmarks.bench_historical_qty [--states 5000000] [--states-per-document 5]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from welearn_database.data.enumeration import DbSchemaEnum, Step
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import (
+    ProcessState,
+    WeLearnDocument,
+)
+from welearn_database.modules.historical_qty import snapshot_historical_qty
+from welearn_database.modules.process_state import backfill_document_latest_state
+
+BATCH_SIZE = 50_000
+CORPORA = 20
+STEPS = [
+    Step.URL_RETRIEVED.value,
+    Step.DOCUMENT_SCRAPED.value,
+    Step.DOCUMENT_VECTORIZED.value,
+    Step.DOCUMENT_CLASSIFIED_SDG.value,
+    Step.DOCUMENT_IN_QDRANT.value,
+]
+
+
+def _latest_states():
+    latest = (
+        select(
+            ProcessState.document_id,
+            func.max(ProcessState.operation_order).label("operation_order"),
+        )
+        .group_by(ProcessState.document_id)
+        .subquery()
+    )
+    return (
+        select(ProcessState.document_id, ProcessState.title)
+        .join(
+            latest,
+            (latest.c.document_id == ProcessState.document_id)
+            & (latest.c.operation_order == ProcessState.operation_order),
+        )
+        .subquery()
+    )
+
+
+def _per_corpus_query(only_in_qdrant: bool):
+    latest = _latest_states()
+    query = (
+        select(Corpus.source_name, func.count())
+        .select_from(latest)
+        .join(WeLearnDocument, WeLearnDocument.id == latest.c.document_id)
+        .join(Corpus, Corpus.id == WeLearnDocument.corpus_id)
+        .group_by(Corpus.source_name)
+    )
+    if only_in_qdrant:
+        query = query.where(latest.c.title == Step.DOCUMENT_IN_QDRANT.value)
+    return query
+
+
+def _populate(conn, states: int, states_per_document: int):
+    category_id = uuid.uuid4()
+    corpus_ids = [uuid.uuid4() for _ in range(CORPORA)]
+    conn.execute(insert(Category), [{"id": category_id, "title": "bench"}])
+    conn.execute(
+        insert(Corpus),
+        [
+            {
+                "id": corpus_id,
+                "source_name": f"corpus_{i}",
+                "is_fix": True,
+                "is_active": True,
+                "category_id": category_id,
+            }
+            for i, corpus_id in enumerate(corpus_ids)
+        ],
+    )
+    documents = states // states_per_document
+    document_ids = [uuid.uuid4() for _ in range(documents)]
+    for start in range(0, documents, BATCH_SIZE):
+        conn.execute(
+            insert(WeLearnDocument),
+            [
+                {
+                    "id": document_id,
+                    "url": f"https://example.com/{start + i}",
+                    "corpus_id": corpus_ids[(start + i) % CORPORA],
+                }
+                for i, document_id in enumerate(
+                    document_ids[start : start + BATCH_SIZE]
+                )
+            ],
+        )
+
+    # Documents advance one step per round, a third of them stop before Qdrant
+    operation_order = 0
+    rows = []
+    for round_index in range(states_per_document):
+        for i, document_id in enumerate(document_ids):
+            if round_index == states_per_document - 1 and i % 3 == 0:
+                continue
+            operation_order += 1
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "document_id": document_id,
+                    "title": STEPS[min(round_index, len(STEPS) - 1)],
+                    "operation_order": operation_order,
+                    "created_at": datetime(2026, 1, 1),
+                }
+            )
+            if len(rows) == BATCH_SIZE:
+                conn.execute(insert(ProcessState), rows)
+                rows = []
+    if rows:
+        conn.execute(insert(ProcessState), rows)
+    return operation_order
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--states", type=int, default=5_000_000)
+    parser.add_argument("--states-per-document", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        with engine.begin() as conn:
+            for schema in DbSchemaEnum:
+                path = os.path.join(tmp_dir, f"{schema.value}.db")
+                conn.execute(text(f"ATTACH '{path}' AS {schema.value}"))
+            Base.metadata.create_all(conn)
+            state_count = _populate(conn, args.states, args.states_per_document)
+            print(f"process_state rows       : {state_count:10d}")
+
+            session = sessionmaker(bind=conn)()
+
+            start = time.perf_counter()
+            session.execute(_per_corpus_query(only_in_qdrant=False)).all()
+            in_qdrant = session.execute(_per_corpus_query(only_in_qdrant=True)).all()
+            session.execute(
+                select(func.count())
+                .select_from(_latest_states())
+                .where(text("title = 'document_in_qdrant'"))
+            ).scalar()
+            three_scans = time.perf_counter() - start
+
+            start = time.perf_counter()
+            latest = _latest_states()
+            session.execute(
+                select(
+                    Corpus.source_name,
+                    func.count(),
+                    func.count().filter(
+                        latest.c.title == Step.DOCUMENT_IN_QDRANT.value
+                    ),
+                )
+                .select_from(latest)
+                .join(WeLearnDocument, WeLearnDocument.id == latest.c.document_id)
+                .join(Corpus, Corpus.id == WeLearnDocument.corpus_id)
+                .group_by(Corpus.source_name)
+            ).all()
+            one_scan = time.perf_counter() - start
+
+            # Paid once at migration time, the trigger keeps the table current afterwards
+            backfill_document_latest_state(session)
+            start = time.perf_counter()
+            snapshot = snapshot_historical_qty(session)
+            latest_state = time.perf_counter() - start
+            assert snapshot.in_qdrant == sum(count for _, count in in_qdrant)
+
+    print(f"three process_state scans: {three_scans:10.2f}s")
+    print(f"one process_state scan   : {one_scan:10.2f}s")
+    print(f"snapshot_historical_qty  : {latest_state:10.2f}s (document_latest_state)")
+
+
+if __name__ == "__main__":
+    main()
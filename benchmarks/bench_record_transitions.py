@@ -0,0 +1,87 @@
+"""
+Compare recording process states one ORM object at a time with record_transitions.
+
+Usage:
+    python -m benchmarks.bench_record_transitions
+"""
+
+import time
+import uuid
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from welearn_database.data.enumeration import DbSchemaEnum, Step
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import (
+    ProcessState,
+    WeLearnDocument,
+)
+from welearn_database.modules.process_state import record_transitions
+
+DOCUMENTS = 20_000
+
+
+def _setup_session():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for schema in DbSchemaEnum:
+            conn.execute(text(f"ATTACH ':memory:' AS {schema.value}"))
+        Base.metadata.create_all(conn)
+    session = sessionmaker(engine)()
+
+    category = Category(id=uuid.uuid4(), title="Benchmark")
+    corpus = Corpus(
+        id=uuid.uuid4(),
+        source_name="benchmark",
+        is_fix=True,
+        is_active=True,
+        category_id=category.id,
+    )
+    session.add_all([category, corpus])
+    session.commit()
+    document_ids = [uuid.uuid4() for _ in range(DOCUMENTS)]
+    session.add_all(
+        WeLearnDocument.from_trusted_values(
+            id=document_id,
+            url=f"https://example.com/document-{i}",
+            full_content="A document used to benchmark the state recorder.",
+            corpus_id=corpus.id,
+        )
+        for i, document_id in enumerate(document_ids)
+    )
+    session.commit()
+    return session, document_ids
+
+
+def main():
+    session, document_ids = _setup_session()
+
+    start = time.perf_counter()
+    for operation_order, document_id in enumerate(document_ids, start=1):
+        # SQLite has no sequence, the order is given explicitly and each object is flushed
+        session.add(
+            ProcessState(
+                id=uuid.uuid4(),
+                document_id=document_id,
+                title=Step.URL_RETRIEVED.value,
+                operation_order=operation_order,
+            )
+        )
+        session.flush()
+    session.commit()
+    orm = time.perf_counter() - start
+
+    start = time.perf_counter()
+    record_transitions(session, document_ids, Step.DOCUMENT_SCRAPED)
+    session.commit()
+    bulk = time.perf_counter() - start
+
+    print(f"one ORM object per state : {DOCUMENTS / orm:10.0f} states/sec")
+    print(f"record_transitions       : {DOCUMENTS / bulk:10.0f} states/sec")
+    print(f"speedup                  : {orm / bulk:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Report SliceEmbeddingIndex build time and batched query latency on an SQLite stand-in.
+
+Usage:
+    python -m benchmarks.bench_vector_search [--slices 50000] [--dim 384] [--queries 100]
+"""
+
+import argparse
+import os
+import tempfile
+import uuid
+
+import numpy as np
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import (
+    Category,
+    Corpus,
+    EmbeddingModel,
+)
+from welearn_database.data.models.document_related import (
+    DocumentSlice,
+    WeLearnDocument,
+)
+from welearn_database.modules.vector_search import SliceEmbeddingIndex
+
+BATCH_SIZE = 10_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slices", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}")
+        with engine.begin() as conn:
+            for schema in DbSchemaEnum:
+                path = os.path.join(tmp_dir, f"{schema.value}.db")
+                conn.execute(text(f"ATTACH '{path}' AS {schema.value}"))
+            Base.metadata.create_all(conn)
+
+            category_id, corpus_id, model_id, document_id = (
+                uuid.uuid4() for _ in range(4)
+            )
+            conn.execute(insert(Category), [{"id": category_id, "title": "bench"}])
+            conn.execute(
+                insert(Corpus),
+                [
+                    {
+                        "id": corpus_id,
+                        "source_name": "bench",
+                        "is_fix": True,
+                        "is_active": True,
+                        "category_id": category_id,
+                    }
+                ],
+            )
+            conn.execute(
+                insert(EmbeddingModel),
+                [{"id": model_id, "title": "bench", "lang": "en"}],
+            )
+            conn.execute(
+                insert(WeLearnDocument),
+                [
+                    {
+                        "id": document_id,
+                        "url": "https://example.com",
+                        "corpus_id": corpus_id,
+                    }
+                ],
+            )
+            rng = np.random.default_rng(0)
+            for start in range(0, args.slices, BATCH_SIZE):
+                count = min(BATCH_SIZE, args.slices - start)
+                conn.execute(
+                    insert(DocumentSlice),
+                    [
+                        {
+                            "id": uuid.uuid4(),
+                            "document_id": document_id,
+                            "embedding": vector,
+                            "order_sequence": start + i,
+                            "embedding_model_name": "bench",
+                            "embedding_model_id": model_id,
+                        }
+                        for i, vector in enumerate(
+                            rng.random((count, args.dim), dtype=np.float32)
+                        )
+                    ],
+                )
+
+        with sessionmaker(engine)() as session:
+            index = SliceEmbeddingIndex(model_id)
+            index.build(session)
+            queries = rng.random((args.queries, args.dim), dtype=np.float32)
+            index.search(queries, k=10)
+            single_latencies = []
+            for query in queries[:20]:
+                index.search(query, k=10)
+                single_latencies.append(index.query_latency)
+            index.search(queries, k=10)
+            batch_latency = index.query_latency
+        engine.dispose()
+
+    print(f"{args.slices} slices of dimension {args.dim}")
+    print(f"build time              : {index.build_time * 1000:10.1f} ms")
+    print(f"single query latency    : {np.median(single_latencies) * 1000:10.2f} ms")
+    print(
+        f"batch of {args.queries} queries    : {batch_latency * 1000:10.2f} ms "
+        f"({batch_latency / args.queries * 1000:.3f} ms/query)"
+    )
+
+
+if __name__ == "__main__":
+    main()
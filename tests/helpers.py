@@ -1,7 +1,11 @@
 # Function from :
 # https://stackoverflow.com/questions/66208938/sqlalchemy-exc-operationalerror-sqlite3-operationalerror-unknown-database-my
+import re
+
 import sqlalchemy
 from sqlalchemy import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
 
 from welearn_database.data.enumeration import DbSchemaEnum
 
@@ -15,3 +19,11 @@ def handle_schema_with_sqlite(db_engine: Engine):
     with db_engine.begin() as conn:
         for schema_name in DbSchemaEnum:
             conn.execute(sqlalchemy.text(f"ATTACH ':memory:' AS {schema_name.value}"))
+
+
+@compiles(CreateColumn, "sqlite")
+def _create_column_sqlite(element, compiler, **kw):
+    # Server defaults of the PostgreSQL schema carry casts ('{}'::jsonb) SQLite does not parse
+    return re.sub(
+        r"(DEFAULT '[^']*')::\w+", r"\1", compiler.visit_create_column(element, **kw)
+    )
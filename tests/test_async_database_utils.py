@@ -0,0 +1,129 @@
+import os
+import uuid
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from sqlalchemy import select, text
+
+from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import WeLearnDocument
+from welearn_database.data.models.user_related import (
+    ChatMessage,
+    EndpointRequest,
+    InferredUser,
+)
+from welearn_database.data.models.user_related import Session as UserSession
+from welearn_database.database_utils import (
+    _create_url,
+    create_async_db_session,
+    create_async_sqlalchemy_engine,
+    dispose_async_engines,
+)
+
+
+class TestAsyncEngineRegistry(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.env_patch = patch.dict(os.environ, {"PG_DRIVER": "sqlite"})
+        self.env_patch.start()
+        self.engine = create_async_sqlalchemy_engine()
+        async with self.engine.begin() as conn:
+            for schema_name in DbSchemaEnum:
+                await conn.execute(text(f"ATTACH ':memory:' AS {schema_name.value}"))
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def asyncTearDown(self):
+        await dispose_async_engines()
+        self.env_patch.stop()
+
+    def test_sync_driver_is_mapped_to_async_driver(self):
+        self.assertEqual(self.engine.url.drivername, "sqlite+aiosqlite")
+        with patch.dict(os.environ, {"PG_DRIVER": "postgresql+psycopg2"}):
+            self.assertEqual(
+                _create_url(is_async=True).drivername, "postgresql+asyncpg"
+            )
+        with patch.dict(os.environ, {"PG_DRIVER": "postgresql+psycopg"}):
+            self.assertEqual(
+                _create_url(is_async=True).drivername, "postgresql+psycopg"
+            )
+
+    def test_engine_is_cached(self):
+        self.assertIs(self.engine, create_async_sqlalchemy_engine())
+
+    async def test_document_crud(self):
+        async with create_async_db_session() as session:
+            category = Category(id=uuid.uuid4(), title="Category Test")
+            session.add(category)
+            await session.commit()
+            corpus = Corpus(
+                id=uuid.uuid4(),
+                source_name="Corpus Test",
+                is_fix=True,
+                is_active=True,
+                binary_treshold=0.5,
+                category_id=category.id,
+            )
+            session.add(corpus)
+            await session.commit()
+            doc = WeLearnDocument(
+                id=uuid.uuid4(),
+                title="Document Test",
+                url="https://example.com/async-doc",
+                full_content="<p>This is a test document, used for unit testing.</p>",
+                lang="en",
+                corpus_id=corpus.id,
+            )
+            session.add(doc)
+            await session.commit()
+
+        async with create_async_db_session() as session:
+            result = await session.scalars(
+                select(WeLearnDocument).where(
+                    WeLearnDocument.url == "https://example.com/async-doc"
+                )
+            )
+            doc_from_db = result.one()
+        self.assertEqual(
+            doc_from_db.full_content,
+            "This is a test document, used for unit testing.",
+        )
+        self.assertIsNotNone(doc_from_db.trace)
+
+    async def test_chat_message_and_endpoint_request(self):
+        async with create_async_db_session() as session:
+            user = InferredUser(id=uuid.uuid4())
+            session.add(user)
+            await session.commit()
+            user_session = UserSession(
+                id=uuid.uuid4(),
+                inferred_user_id=user.id,
+                host="localhost",
+                end_at=user.created_at,
+            )
+            session.add(user_session)
+            await session.commit()
+            session.add_all(
+                [
+                    ChatMessage(
+                        id=uuid.uuid4(),
+                        inferred_user_id=user.id,
+                        conversation_id=uuid.uuid4(),
+                        role="user",
+                        textual_content="Hello",
+                    ),
+                    EndpointRequest(
+                        id=uuid.uuid4(),
+                        session_id=user_session.id,
+                        endpoint_name="/api/v1/qna/chat/answer",
+                        http_code=200,
+                    ),
+                ]
+            )
+            await session.commit()
+
+        async with create_async_db_session() as session:
+            message = (await session.scalars(select(ChatMessage))).one()
+            request = (await session.scalars(select(EndpointRequest))).one()
+        self.assertEqual(message.textual_content, "Hello")
+        self.assertEqual(request.session_id, user_session.id)
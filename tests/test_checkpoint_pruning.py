@@ -0,0 +1,228 @@
+import os
+import tempfile
+from threading import Event, Thread
+from unittest import TestCase
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.models import Base
+from welearn_database.data.models.agent_related import (
+    CheckpointBlobs,
+    Checkpoints,
+    CheckpointWrites,
+)
+from welearn_database.modules.checkpoint_storage import prune_checkpoints
+from welearn_database.modules.checkpoint_writer import (
+    CheckpointStep,
+    write_checkpoint_step,
+)
+
+
+class TestPruneCheckpoints(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _add_checkpoint(self, thread_id: str, checkpoint_id: str, parent_id, step: int):
+        # Every step writes a new version of the "messages" channel, "task" keeps its first version
+        versions = {"messages": f"{step:05d}.0.1", "task": "00001.0.1"}
+        self.session.add(
+            Checkpoints(
+                thread_id=thread_id,
+                checkpoint_ns="",
+                checkpoint_id=checkpoint_id,
+                parent_checkpoint_id=parent_id,
+                checkpoint={"v": 1, "id": checkpoint_id, "channel_versions": versions},
+                metadata_={},
+            )
+        )
+        self.session.add(
+            CheckpointWrites(
+                thread_id=thread_id,
+                checkpoint_ns="",
+                checkpoint_id=checkpoint_id,
+                task_id="task",
+                idx=0,
+                channel="messages",
+                type_="json",
+                blob=b"write",
+            )
+        )
+        for channel, version in versions.items():
+            self.session.merge(
+                CheckpointBlobs(
+                    thread_id=thread_id,
+                    checkpoint_ns="",
+                    channel=channel,
+                    version_=version,
+                    type_="json",
+                    blob=b"blob",
+                )
+            )
+
+    def _add_thread(self, thread_id: str, steps: int) -> list[str]:
+        ids = [f"{thread_id}-{step:03d}" for step in range(1, steps + 1)]
+        parent_id = None
+        for step, checkpoint_id in enumerate(ids, start=1):
+            self._add_checkpoint(thread_id, checkpoint_id, parent_id, step)
+            parent_id = checkpoint_id
+        self.session.commit()
+        return ids
+
+    def _checkpoint_ids(self, model, thread_id: str) -> list[str]:
+        return list(
+            self.session.scalars(
+                select(model.checkpoint_id)
+                .where(model.thread_id == thread_id)
+                .order_by(model.checkpoint_id)
+            )
+        )
+
+    def _blob_versions(self, thread_id: str) -> list[tuple[str, str]]:
+        return list(
+            self.session.execute(
+                select(CheckpointBlobs.channel, CheckpointBlobs.version_)
+                .where(CheckpointBlobs.thread_id == thread_id)
+                .order_by(CheckpointBlobs.channel, CheckpointBlobs.version_)
+            )
+        )
+
+    def test_keeps_last_checkpoints_of_each_thread(self):
+        long_ids = self._add_thread("long", 5)
+        short_ids = self._add_thread("short", 2)
+
+        result = prune_checkpoints(self.session, keep_last=2)
+
+        self.assertEqual(self._checkpoint_ids(Checkpoints, "long"), long_ids[-2:])
+        self.assertEqual(self._checkpoint_ids(CheckpointWrites, "long"), long_ids[-2:])
+        self.assertEqual(
+            self._blob_versions("long"),
+            [
+                ("messages", "00004.0.1"),
+                ("messages", "00005.0.1"),
+                ("task", "00001.0.1"),
+            ],
+        )
+        self.assertEqual(self._checkpoint_ids(Checkpoints, "short"), short_ids)
+        self.assertEqual(len(self._blob_versions("short")), 3)
+        self.assertEqual(result.threads, 1)
+        self.assertEqual(result.checkpoints, 3)
+        self.assertEqual(result.writes, 3)
+        self.assertEqual(result.blobs, 3)
+
+    def test_fork_off_the_latest_chain_is_deleted(self):
+        ids = self._add_thread("thread", 3)
+        # A replay forked from the first checkpoint, older than the latest one
+        self._add_checkpoint("thread", "thread-002b", ids[0], 9)
+        self.session.commit()
+
+        prune_checkpoints(self.session, keep_last=3)
+
+        self.assertEqual(self._checkpoint_ids(Checkpoints, "thread"), ids)
+        self.assertNotIn(("messages", "00009.0.1"), self._blob_versions("thread"))
+
+    def test_batches_and_reruns(self):
+        for i in range(5):
+            self._add_thread(f"thread-{i}", 4)
+
+        result = prune_checkpoints(self.session, keep_last=1, batch_size=2)
+
+        self.assertEqual(result.threads, 5)
+        self.assertEqual(result.checkpoints, 15)
+        for i in range(5):
+            self.assertEqual(
+                self._checkpoint_ids(Checkpoints, f"thread-{i}"), [f"thread-{i}-004"]
+            )
+        self.assertEqual(prune_checkpoints(self.session, keep_last=1).threads, 0)
+
+    def test_keep_last_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            prune_checkpoints(self.session, keep_last=0)
+
+
+class TestPruneWhileWriting(TestCase):
+    def setUp(self):
+        # Schemas are attached from files so that every thread gets its own connection to the same data
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'main.db')}",
+            connect_args={"timeout": 30, "check_same_thread": False},
+        )
+
+        @event.listens_for(self.engine, "connect")
+        def attach_schemas(dbapi_connection, _):
+            for schema_name in DbSchemaEnum:
+                path = os.path.join(self.tmp_dir.name, f"{schema_name.value}.db")
+                dbapi_connection.execute(
+                    f"ATTACH DATABASE '{path}' AS {schema_name.value}"
+                )
+
+        Base.metadata.create_all(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _step(step: int) -> CheckpointStep:
+        # "side" alternates between two versions, each step sends its blob again: the other one is unreferenced
+        # once the previous checkpoint is pruned, and must not be deleted under a writer sending it
+        versions = {"messages": f"{step:05d}", "side": f"{step % 2}"}
+        return CheckpointStep(
+            thread_id="thread",
+            checkpoint_id=f"{step:05d}",
+            parent_checkpoint_id=f"{step - 1:05d}" if step > 1 else None,
+            checkpoint={"id": f"{step:05d}", "channel_versions": versions},
+            blobs=[
+                (channel, version, "json", b"blob")
+                for channel, version in versions.items()
+            ],
+        )
+
+    def test_steps_written_while_pruning_keep_their_blobs(self):
+        steps = 60
+        done = Event()
+
+        def write():
+            session = self.s_maker()
+            try:
+                for step in range(1, steps + 1):
+                    write_checkpoint_step(session, self._step(step))
+            finally:
+                session.close()
+                done.set()
+
+        def prune():
+            session = self.s_maker()
+            try:
+                while not done.is_set():
+                    prune_checkpoints(session, keep_last=1)
+            finally:
+                session.close()
+
+        threads = [Thread(target=write), Thread(target=prune)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        session = self.s_maker()
+        prune_checkpoints(session, keep_last=1)
+        checkpoint = session.scalars(select(Checkpoints)).one()
+        self.assertEqual(checkpoint.checkpoint_id, f"{steps:05d}")
+        blobs = set(
+            session.execute(select(CheckpointBlobs.channel, CheckpointBlobs.version_))
+        )
+        self.assertEqual(blobs, set(checkpoint.checkpoint["channel_versions"].items()))
+        session.close()
@@ -0,0 +1,143 @@
+from unittest import TestCase
+
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.agent_related import CheckpointBlobs, Checkpoints
+from welearn_database.modules.checkpoint_reader import CheckpointReader
+
+
+class TestCheckpointReader(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        self.statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.statements.append(statement),
+        )
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _add_checkpoint(
+        self, checkpoint_id: str, versions: dict[str, str], thread_id: str = "thread"
+    ):
+        self.session.add(
+            Checkpoints(
+                thread_id=thread_id,
+                checkpoint_ns="",
+                checkpoint_id=checkpoint_id,
+                checkpoint={"id": checkpoint_id, "channel_versions": versions},
+                metadata_={"step": checkpoint_id},
+            )
+        )
+        for channel, version in versions.items():
+            self.session.merge(
+                CheckpointBlobs(
+                    thread_id=thread_id,
+                    checkpoint_ns="",
+                    channel=channel,
+                    version_=version,
+                    type_="json",
+                    blob=f"{channel}@{version}".encode(),
+                )
+            )
+        self.session.commit()
+
+    def test_latest_checkpoint_with_blobs_in_one_query(self):
+        self._add_checkpoint("1", {"messages": "1", "task": "1"})
+        self._add_checkpoint("2", {"messages": "2", "task": "1", "memory": "9"})
+        reader = CheckpointReader()
+        self.statements.clear()
+
+        snapshot = reader.get_latest(self.session, "thread")
+
+        self.assertEqual(snapshot.checkpoint_id, "2")
+        self.assertEqual(snapshot.metadata, {"step": "2"})
+        self.assertEqual(
+            snapshot.blobs,
+            {
+                "messages": ("json", b"messages@2"),
+                "task": ("json", b"task@1"),
+                "memory": ("json", b"memory@9"),
+            },
+        )
+        # The latest id with the checkpoint joined with its blobs
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(reader.stats.misses, 1)
+
+    def test_cache_hits_and_new_checkpoints(self):
+        self._add_checkpoint("1", {"messages": "1"})
+        reader = CheckpointReader()
+        first = reader.get_latest(self.session, "thread")
+        self.statements.clear()
+
+        self.assertIs(reader.get_latest(self.session, "thread"), first)
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual((reader.stats.hits, reader.stats.misses), (1, 1))
+
+        self._add_checkpoint("2", {"messages": "2"})
+
+        self.statements.clear()
+        self.assertEqual(reader.get_latest(self.session, "thread").checkpoint_id, "2")
+        self.assertEqual(len(self.statements), 1)
+        self.assertEqual(reader.stats.misses, 2)
+        self.assertIsNotNone(reader.get(self.session, "thread", "", "1"))
+        self.assertEqual(reader.stats.hits, 2)
+
+    def test_missing_checkpoints(self):
+        self._add_checkpoint("1", {})
+        reader = CheckpointReader()
+
+        self.assertIsNone(reader.get_latest(self.session, "other"))
+        self.assertIsNone(reader.get(self.session, "thread", "", "2"))
+        self.assertEqual(reader.get(self.session, "thread", "", "1").blobs, {})
+        self.assertEqual(len(reader), 1)
+
+    def test_channel_without_blob(self):
+        self._add_checkpoint("1", {"messages": "1", "task": "1"})
+        self.session.execute(
+            delete(CheckpointBlobs).where(CheckpointBlobs.channel == "task")
+        )
+        self.session.commit()
+
+        snapshot = CheckpointReader().get_latest(self.session, "thread")
+
+        self.assertEqual(snapshot.blobs, {"messages": ("json", b"messages@1")})
+
+    def test_lru_eviction(self):
+        for thread_id in ["a", "b", "c"]:
+            self._add_checkpoint("1", {"messages": "1"}, thread_id)
+        reader = CheckpointReader(max_size=2)
+
+        reader.get_latest(self.session, "a")
+        reader.get_latest(self.session, "b")
+        reader.get_latest(self.session, "a")
+        reader.get_latest(self.session, "c")
+
+        self.assertEqual(reader.stats.evictions, 1)
+        reader.get_latest(self.session, "a")
+        self.assertEqual(reader.stats.hits, 2)
+        reader.get_latest(self.session, "b")
+        self.assertEqual(reader.stats.misses, 4)
+
+    def test_invalidate(self):
+        self._add_checkpoint("1", {"messages": "1"})
+        self._add_checkpoint("2", {"messages": "2"})
+        reader = CheckpointReader()
+        reader.get(self.session, "thread", "", "1")
+        reader.get(self.session, "thread", "", "2")
+
+        self.assertEqual(reader.invalidate("thread", "", "1"), 1)
+        self.assertEqual(reader.invalidate("thread"), 1)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(reader.stats.invalidations, 2)
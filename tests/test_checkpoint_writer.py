@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+from sqlalchemy import LargeBinary, create_engine, event, func, select, type_coerce
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.agent_related import (
+    CheckpointBlobs,
+    Checkpoints,
+    CheckpointWrites,
+)
+from welearn_database.modules.checkpoint_reader import CheckpointReader
+from welearn_database.modules.checkpoint_writer import (
+    CheckpointStep,
+    write_checkpoint_step,
+    write_checkpoint_steps,
+)
+
+STATE = b'{"messages": ["hello"]}' * 10
+
+
+def _step(step: int, thread_id: str = "thread") -> CheckpointStep:
+    versions = {"messages": f"{step}", "task": "1"}
+    return CheckpointStep(
+        thread_id=thread_id,
+        checkpoint_id=f"{step:03d}",
+        parent_checkpoint_id=f"{step - 1:03d}" if step > 1 else None,
+        checkpoint={"id": f"{step:03d}", "channel_versions": versions},
+        metadata={"step": step},
+        blobs=[
+            (channel, version, "json", STATE) for channel, version in versions.items()
+        ],
+        writes=[("task", idx, "messages", "json", STATE) for idx in range(3)],
+    )
+
+
+class TestCheckpointWriter(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _count(self, model) -> int:
+        return self.session.scalar(select(func.count()).select_from(model))
+
+    def test_write_step(self):
+        statements = []
+        event.listen(
+            self.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: statements.append(statement),
+        )
+
+        write_checkpoint_step(self.session, _step(1))
+
+        inserts = [s for s in statements if s.startswith("INSERT")]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(self._count(Checkpoints), 1)
+        self.assertEqual(self._count(CheckpointBlobs), 2)
+        self.assertEqual(self._count(CheckpointWrites), 3)
+        stored = self.session.scalar(
+            select(type_coerce(CheckpointBlobs.blob, LargeBinary)).limit(1)
+        )
+        self.assertEqual(stored, STATE)
+
+    def test_blobs_are_deduplicated(self):
+        # The "task" channel keeps the same version over the three steps
+        write_checkpoint_steps(self.session, [_step(1), _step(2)])
+        write_checkpoint_step(self.session, _step(3))
+
+        self.assertEqual(self._count(Checkpoints), 3)
+        self.assertEqual(self._count(CheckpointBlobs), 4)
+        self.assertEqual(self._count(CheckpointWrites), 9)
+
+    def test_rewrite_updates_checkpoint_and_invalidates_cache(self):
+        reader = CheckpointReader()
+        write_checkpoint_step(self.session, _step(1), reader)
+        snapshot = reader.get_latest(self.session, "thread")
+        self.assertEqual(snapshot.metadata, {"step": 1})
+
+        step = _step(1)
+        step.metadata = {"step": 1, "source": "update"}
+        write_checkpoint_step(self.session, step, reader)
+
+        self.assertEqual(reader.stats.invalidations, 1)
+        snapshot = reader.get_latest(self.session, "thread")
+        self.assertEqual(snapshot.metadata, {"step": 1, "source": "update"})
+        self.assertEqual(snapshot.blobs["messages"], ("json", STATE))
+
+    def test_no_steps(self):
+        write_checkpoint_steps(self.session, [])
+
+        self.assertEqual(self._count(Checkpoints), 0)
@@ -0,0 +1,124 @@
+import json
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+from sqlalchemy import LargeBinary, create_engine, select, type_coerce
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data import compressed_blob
+from welearn_database.data.compressed_blob import (
+    HEADER_STRUCT,
+    CompressedSerializer,
+    blob_compression,
+    compress_blob,
+    decompress_blob,
+)
+from welearn_database.data.enumeration import BlobCompression
+from welearn_database.data.models import Base
+from welearn_database.data.models.agent_related import CheckpointBlobs
+
+# Serialized agent state is repetitive JSON, like the checkpoints of a long chat thread
+STATE = json.dumps(
+    {"messages": [{"role": "user", "content": f"question {i}"} for i in range(200)]}
+).encode()
+
+
+class TestCompressedBlobCodec(TestCase):
+    def test_round_trip(self):
+        compressions = [BlobCompression.ZLIB, BlobCompression.LZMA]
+        if compressed_blob.zstandard is not None:
+            compressions.append(BlobCompression.ZSTD)
+        for compression in compressions:
+            with self.subTest(compression=compression):
+                blob = compress_blob(STATE, compression)
+                self.assertEqual(blob_compression(blob), compression)
+                self.assertLess(len(blob), len(STATE) // 4)
+                self.assertEqual(decompress_blob(blob), STATE)
+
+    def test_small_or_incompressible_blob_is_stored_raw(self):
+        for value in [b"tiny", os.urandom(1024)]:
+            with self.subTest(size=len(value)):
+                blob = compress_blob(value, BlobCompression.ZLIB)
+                self.assertEqual(blob_compression(blob), BlobCompression.NONE)
+                self.assertEqual(len(blob), HEADER_STRUCT.size + len(value))
+                self.assertEqual(decompress_blob(blob), value)
+
+    def test_legacy_blob(self):
+        self.assertIsNone(blob_compression(STATE))
+        self.assertEqual(decompress_blob(STATE), STATE)
+
+    def test_legacy_blob_starting_with_magic(self):
+        value = compress_blob(STATE)[: HEADER_STRUCT.size] + b"not zlib data"
+        self.assertEqual(decompress_blob(value), value)
+
+    def test_zstd_falls_back_to_zlib_without_zstandard(self):
+        with patch.object(compressed_blob, "zstandard", None):
+            serde = CompressedSerializer(_JsonSerde(), BlobCompression.ZSTD)
+        self.assertEqual(serde.compression, BlobCompression.ZLIB)
+
+
+class _JsonSerde:
+    # Stand-in for a LangGraph serializer
+    def dumps_typed(self, obj) -> tuple[str, bytes]:
+        return "json", json.dumps(obj).encode()
+
+    def loads_typed(self, data: tuple[str, bytes]):
+        return json.loads(data[1])
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+class TestCompressedSerializer(TestCase):
+    def test_round_trip(self):
+        serde = CompressedSerializer(_JsonSerde())
+        state = json.loads(STATE)
+
+        type_, blob = serde.dumps_typed(state)
+
+        self.assertEqual(type_, "json")
+        self.assertEqual(blob_compression(blob), BlobCompression.ZLIB)
+        self.assertLess(len(blob), len(STATE))
+        self.assertEqual(serde.loads_typed((type_, blob)), state)
+
+    def test_reads_uncompressed_blobs(self):
+        serde = CompressedSerializer(_JsonSerde(), BlobCompression.LZMA)
+
+        self.assertEqual(serde.loads_typed(("json", STATE)), json.loads(STATE))
+
+    def test_other_methods_are_delegated(self):
+        self.assertEqual(CompressedSerializer(_JsonSerde()).dumps([1]), b"[1]")
+
+
+class TestCheckpointModels(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_blobs_are_stored_as_given(self):
+        # LangGraph reads the blob columns directly, the models must not transform them
+        self.session.add(
+            CheckpointBlobs(
+                thread_id="thread",
+                checkpoint_ns="",
+                channel="messages",
+                version_="1",
+                type_="json",
+                blob=STATE,
+            )
+        )
+        self.session.commit()
+
+        stored = self.session.scalar(
+            select(type_coerce(CheckpointBlobs.blob, LargeBinary))
+        )
+        self.assertEqual(stored, STATE)
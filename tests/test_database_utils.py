@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from sqlalchemy import text
+
+from welearn_database.database_utils import (
+    create_db_session,
+    create_sqlalchemy_engine,
+    dispose_engines,
+)
+
+
+class TestEngineRegistry(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.env = {
+            "PG_DRIVER": "sqlite",
+            "PG_DB": os.path.join(self.tmp_dir.name, "registry.db"),
+        }
+
+    def tearDown(self):
+        dispose_engines()
+        self.tmp_dir.cleanup()
+
+    def test_engine_is_cached(self):
+        with patch.dict(os.environ, self.env):
+            first = create_sqlalchemy_engine()
+            second = create_sqlalchemy_engine()
+        self.assertIs(first, second)
+
+    def test_new_engine_when_options_change(self):
+        with patch.dict(os.environ, self.env):
+            first = create_sqlalchemy_engine()
+            with patch.dict(os.environ, {"PG_POOL_SIZE": "3"}):
+                second = create_sqlalchemy_engine()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.pool.size(), 3)
+
+    def test_pool_options_from_env(self):
+        env = {
+            **self.env,
+            "PG_POOL_SIZE": "7",
+            "PG_MAX_OVERFLOW": "2",
+            "PG_POOL_RECYCLE": "300",
+            "PG_POOL_PRE_PING": "false",
+        }
+        with patch.dict(os.environ, env):
+            engine = create_sqlalchemy_engine()
+        self.assertEqual(engine.pool.size(), 7)
+        self.assertEqual(engine.pool._max_overflow, 2)
+        self.assertEqual(engine.pool._recycle, 300)
+        self.assertFalse(engine.pool._pre_ping)
+
+    def test_sessions_share_engine(self):
+        with patch.dict(os.environ, self.env):
+            engine = create_sqlalchemy_engine()
+            first = create_db_session()
+            second = create_db_session()
+        self.assertIsNot(first, second)
+        self.assertIs(first.get_bind(), engine)
+        self.assertIs(second.get_bind(), engine)
+        self.assertEqual(first.execute(text("SELECT 1")).scalar(), 1)
+        first.close()
+        second.close()
+
+    def test_dispose_engines(self):
+        with patch.dict(os.environ, self.env):
+            first = create_sqlalchemy_engine()
+            dispose_engines()
+            second = create_sqlalchemy_engine()
+        self.assertIsNot(first, second)
+
+    def test_pre_ping_disabled_by_default(self):
+        with patch.dict(os.environ, self.env):
+            engine = create_sqlalchemy_engine()
+        self.assertFalse(engine.pool._pre_ping)
+
+    def test_dispose_engines_without_closing(self):
+        with patch.dict(os.environ, self.env):
+            engine = create_sqlalchemy_engine()
+        pooled = engine.raw_connection()
+        dbapi_connection = pooled.dbapi_connection
+        pooled.close()
+
+        # As in a forked child: the connection shared with the parent stays open
+        dispose_engines(close=False)
+        self.assertEqual(dbapi_connection.execute("SELECT 1").fetchone(), (1,))
+        dbapi_connection.close()
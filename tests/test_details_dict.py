@@ -0,0 +1,138 @@
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from unittest import TestCase
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data import details_dict
+from welearn_database.data.details_dict import serialize_details
+from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.models import Base, WeLearnDocument
+from welearn_database.data.models.corpus_related import Category, Corpus
+
+
+@dataclass
+class AuthorDetails:
+    name: str
+    misc: str
+    orcid: uuid.UUID | None = None
+
+
+@dataclass
+class LicenseDetails:
+    name: str
+    url: str
+    since: date | None = None
+    authors: list[AuthorDetails] = field(default_factory=list)
+
+
+DETAILS = {
+    "authors": [
+        AuthorDetails(name="Zoé Ürbán", misc="", orcid=uuid.UUID(int=42)),
+        AuthorDetails(name="李雷", misc='quote " and \\ backslash'),
+    ],
+    "license": LicenseDetails(
+        name="CC BY-SA 4.0",
+        url="https://creativecommons.org/licenses/by-sa/4.0/",
+        since=date(2020, 1, 31),
+        authors=[AuthorDetails(name="Nested", misc="\n")],
+    ),
+    "published_at": datetime(2026, 10, 17, 8, 30, 0, 123, tzinfo=timezone.utc),
+    "retrieved_at": datetime(2026, 10, 17, 8, 30),
+    "tags": ["climate", "énergie", 1, 2.5, True, None],
+    "pages": (1, 12),
+}
+
+
+class TestSerializeDetails(TestCase):
+    def _fallback(self, value) -> str:
+        with patch.object(details_dict, "orjson", None):
+            return serialize_details(value)
+
+    def test_orjson_and_stdlib_write_the_same_bytes(self):
+        if details_dict.orjson is None:
+            self.skipTest("orjson is not installed")
+        for name, value in [
+            ("nested", DETAILS),
+            ("dataclass", DETAILS["license"]),
+            ("list", DETAILS["authors"]),
+            ("empty", {}),
+        ]:
+            with self.subTest(name=name):
+                self.assertEqual(serialize_details(value), self._fallback(value))
+
+    def test_values_are_kept(self):
+        self.assertEqual(
+            json.loads(self._fallback(DETAILS))["license"],
+            {
+                "name": "CC BY-SA 4.0",
+                "url": "https://creativecommons.org/licenses/by-sa/4.0/",
+                "since": "2020-01-31",
+                "authors": [{"name": "Nested", "misc": "\n", "orcid": None}],
+            },
+        )
+        self.assertEqual(
+            json.loads(self._fallback(DETAILS))["published_at"],
+            "2026-10-17T08:30:00.000123+00:00",
+        )
+
+    def test_values_orjson_refuses_fall_back_to_stdlib(self):
+        value = {"counts": {1: "one"}, "big": 2**70}
+
+        self.assertEqual(serialize_details(value), self._fallback(value))
+
+    def test_unsupported_value(self):
+        for serialize in [serialize_details, self._fallback]:
+            with self.subTest(serialize=serialize):
+                with self.assertRaises(TypeError):
+                    serialize({"tags": {"climate"}})
+
+
+class TestDetailsColumn(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_details_round_trip(self):
+        category = Category(id=uuid.uuid4(), title="category")
+        corpus = Corpus(
+            id=uuid.uuid4(),
+            source_name="corpus",
+            is_fix=True,
+            is_active=True,
+            category_id=category.id,
+        )
+        self.session.add_all([category, corpus])
+        self.session.commit()
+        document = WeLearnDocument(
+            id=uuid.uuid4(),
+            url="https://example.com/document",
+            full_content="A document used to test the details column.",
+            corpus_id=corpus.id,
+            details=DETAILS,
+        )
+        self.session.add(document)
+        self.session.commit()
+        self.session.expire_all()
+
+        stored = self.session.scalar(
+            text(
+                f"SELECT details FROM {DbSchemaEnum.DOCUMENT_RELATED.value}.welearn_document"
+            )
+        )
+        self.assertEqual(stored, serialize_details(DETAILS))
+        details = self.session.scalars(select(WeLearnDocument.details)).one()
+        self.assertEqual(details["authors"][0]["name"], "Zoé Ürbán")
+        self.assertEqual(details["pages"], [1, 12])
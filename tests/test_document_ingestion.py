@@ -0,0 +1,176 @@
+import uuid
+from dataclasses import dataclass
+from unittest import TestCase
+from zlib import adler32
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import WeLearnDocument
+from welearn_database.exceptions import (
+    ContentIsTooShort,
+    InvalidDOI,
+    InvalidURLScheme,
+    MissingRequiredField,
+)
+from welearn_database.modules.document_ingestion import (
+    DOCUMENT_COLUMNS,
+    _iter_copy_lines,
+    bulk_insert_documents,
+    prepare_document_row,
+    upsert_documents,
+)
+
+CONTENT = "<p>This is a test document, used for unit testing, please ignore.</p>"
+CLEANED_CONTENT = "This is a test document, used for unit testing, please ignore."
+
+
+@dataclass
+class AuthorDetails:
+    name: str
+    misc: str
+
+
+class TestDocumentIngestion(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        self.corpus = Corpus(
+            id=uuid.uuid4(),
+            source_name="Corpus Test",
+            is_fix=True,
+            is_active=True,
+            binary_treshold=0.5,
+            category_id=category.id,
+        )
+        self.session.add(self.corpus)
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _document(self, i, **kwargs):
+        document = {
+            "url": f"https://example.com/doc-{i}",
+            "title": f"Document {i}",
+            "lang": "en",
+            "full_content": CONTENT,
+            "description": "<b>Short</b> description",
+            "details": {"author": AuthorDetails(name="Test Author", misc="")},
+            "corpus_id": self.corpus.id,
+        }
+        document.update(kwargs)
+        return document
+
+    def test_prepare_row_matches_orm_validation(self):
+        row = prepare_document_row(self._document(0, doi="10.1000/xyz123"))
+        orm_doc = WeLearnDocument(**self._document(0, doi="10.1000/xyz123"))
+
+        self.assertEqual(set(row), set(DOCUMENT_COLUMNS))
+        self.assertEqual(row["full_content"], orm_doc.full_content)
+        self.assertEqual(row["description"], orm_doc.description)
+        self.assertEqual(row["trace"], orm_doc.trace)
+        self.assertEqual(row["trace"], adler32(CLEANED_CONTENT.encode("utf-8")))
+
+    def test_bulk_insert_with_rejects(self):
+        documents = [self._document(i) for i in range(10)]
+        documents[2]["url"] = "http://example.com/doc-2"
+        documents[5]["doi"] = "https://doi.org/10.1000/xyz123"
+        documents[7]["full_content"] = "Too short"
+
+        report = bulk_insert_documents(self.session, documents, batch_size=3)
+        self.session.commit()
+
+        self.assertEqual(len(report.inserted_ids), 7)
+        self.assertEqual([r.index for r in report.rejected], [2, 5, 7])
+        self.assertIsInstance(report.rejected[0].error, InvalidURLScheme)
+        self.assertIsInstance(report.rejected[1].error, InvalidDOI)
+        self.assertIsInstance(report.rejected[2].error, ContentIsTooShort)
+
+        docs_from_db = self.session.query(WeLearnDocument).all()
+        self.assertEqual(len(docs_from_db), 7)
+        doc = self.session.get(WeLearnDocument, report.inserted_ids[0])
+        self.assertEqual(doc.full_content, CLEANED_CONTENT)
+        self.assertEqual(doc.description, "Short description")
+        self.assertEqual(doc.details, {"author": {"name": "Test Author", "misc": ""}})
+        self.assertEqual(doc.trace, adler32(CLEANED_CONTENT.encode("utf-8")))
+        self.assertIsNotNone(doc.created_at)
+
+    def test_incomplete_documents_are_rejected(self):
+        documents = [self._document(i) for i in range(5)]
+        del documents[0]["corpus_id"]
+        documents[1]["url"] = None
+        del documents[2]["url"]
+        documents[3]["url"] = "https://[::1/doc-3"
+
+        report = bulk_insert_documents(self.session, documents)
+
+        self.assertEqual(len(report.inserted_ids), 1)
+        self.assertEqual([r.index for r in report.rejected], [0, 1, 2, 3])
+        self.assertIsInstance(report.rejected[0].error, MissingRequiredField)
+        for rejected in report.rejected[1:]:
+            self.assertIsInstance(rejected.error, InvalidURLScheme)
+
+    def test_copy_lines_escaping(self):
+        row = prepare_document_row(
+            self._document(0, title="Tab\there\nnew line \\ backslash", details=None)
+        )
+        line = "".join(_iter_copy_lines([row]))
+        values = line.rstrip("\n").split("\t")
+
+        self.assertEqual(len(values), len(DOCUMENT_COLUMNS))
+        self.assertEqual(
+            values[DOCUMENT_COLUMNS.index("title")],
+            "Tab\\there\\nnew line \\\\ backslash",
+        )
+        self.assertEqual(values[DOCUMENT_COLUMNS.index("doi")], "\\N")
+        self.assertEqual(values[DOCUMENT_COLUMNS.index("details")], "\\N")
+
+    def test_upsert_documents(self):
+        first_report = upsert_documents(
+            self.session, [self._document(i) for i in range(3)]
+        )
+        self.session.commit()
+        self.assertEqual(len(first_report.inserted_ids), 3)
+        self.assertEqual(first_report.updated_ids, [])
+
+        documents = [self._document(i) for i in range(5)]
+        documents[0]["full_content"] = CONTENT + " Updated."
+        documents[1]["title"] = "Title change without content change"
+        documents[4]["url"] = "ftp://example.com/doc-4"
+        report = upsert_documents(self.session, documents, chunk_size=2)
+        self.session.commit()
+
+        self.assertEqual(report.updated_ids, [first_report.inserted_ids[0]])
+        self.assertCountEqual(report.unchanged_ids, first_report.inserted_ids[1:])
+        self.assertEqual(len(report.inserted_ids), 1)
+        self.assertEqual([r.index for r in report.rejected], [4])
+        self.assertEqual(self.session.query(WeLearnDocument).count(), 4)
+
+        updated = self.session.get(WeLearnDocument, first_report.inserted_ids[0])
+        self.assertEqual(updated.full_content, CLEANED_CONTENT + " Updated.")
+        unchanged = self.session.get(WeLearnDocument, first_report.inserted_ids[1])
+        self.assertEqual(unchanged.title, "Document 1")
+
+    def test_upsert_duplicated_url_in_chunk(self):
+        documents = [
+            self._document(0, title="First"),
+            self._document(0, title="Second"),
+        ]
+        report = upsert_documents(self.session, documents)
+        self.session.commit()
+
+        self.assertEqual(len(report.inserted_ids), 1)
+        doc = self.session.get(WeLearnDocument, report.inserted_ids[0])
+        self.assertEqual(doc.title, "Second")
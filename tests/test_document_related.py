@@ -247,6 +247,43 @@ class TestWeLearnDocument(TestCase):
 
         self.assertEqual(test_doc.trace, expected_trace)
 
+    def test_from_trusted_values_is_equivalent(self):
+        values = dict(
+            title="Test Document",
+            url="https://example.com/test-document",
+            full_content="<p>This is a test document, used for unit testing, please ignore. Thank you!</p>",
+            description="<b>A short description</b> of the test document.",
+            lang="en",
+            doi="10.1000/xyz123",
+        )
+        validated = WeLearnDocument(**values)
+        trusted = WeLearnDocument.from_trusted_values(
+            **{
+                **values,
+                "full_content": validated.full_content,
+                "description": validated.description,
+            }
+        )
+
+        for attribute in values:
+            self.assertEqual(getattr(trusted, attribute), getattr(validated, attribute))
+        self.assertEqual(trusted.trace, validated.trace)
+
+    def test_from_trusted_values_skips_validators(self):
+        test_doc = WeLearnDocument.from_trusted_values(
+            url="http://example.com/test-document",
+            full_content="<p>Short</p>",
+            doi="https://doi.org/10.1000/xyz123",
+            trace=42,
+        )
+        self.assertEqual(test_doc.url, "http://example.com/test-document")
+        self.assertEqual(test_doc.full_content, "<p>Short</p>")
+        self.assertEqual(test_doc.trace, 42)
+
+        # Validators are back once the document is built
+        with self.assertRaises(InvalidURLScheme):
+            test_doc.url = "http://example.com/other-document"
+
     def test_trace_in_db(self):
         engine = create_engine("sqlite://")
         s_maker = sessionmaker(engine)
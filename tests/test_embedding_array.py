@@ -0,0 +1,234 @@
+import uuid
+from unittest import TestCase
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.embedding_array import (
+    HEADER_STRUCT,
+    decode_embedding,
+    encode_embedding,
+    quantize_embedding,
+)
+from welearn_database.data.enumeration import EmbeddingStorage
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import (
+    Category,
+    Corpus,
+    EmbeddingModel,
+)
+from welearn_database.data.models.document_related import (
+    DocumentSlice,
+    WeLearnDocument,
+)
+from welearn_database.modules.embedding_storage import requantize_slice_embeddings
+
+
+class TestEmbeddingCodec(TestCase):
+    def test_round_trip(self):
+        for dtype in (np.float16, np.float32, np.float64):
+            with self.subTest(dtype=dtype):
+                vector = np.arange(10, dtype=dtype)
+                decoded = decode_embedding(encode_embedding(vector))
+                self.assertEqual(decoded.dtype, np.dtype(dtype))
+                np.testing.assert_array_equal(decoded, vector)
+
+    def test_decoded_vector_is_a_read_only_view(self):
+        blob = encode_embedding(np.ones(384, dtype=np.float32))
+        decoded = decode_embedding(blob)
+
+        self.assertIs(decoded.base, blob)
+        self.assertFalse(decoded.flags.writeable)
+        with self.assertRaises(ValueError):
+            decoded[0] = 2.0
+
+    def test_legacy_headerless_blob(self):
+        vector = np.linspace(-1, 1, 768, dtype=np.float32)
+        decoded = decode_embedding(vector.tobytes())
+        np.testing.assert_array_equal(decoded, vector)
+
+    def test_legacy_blob_starting_with_magic(self):
+        blob = encode_embedding(np.ones(4, dtype=np.float32))[: HEADER_STRUCT.size]
+        blob += np.ones(3, dtype=np.float32).tobytes()
+        self.assertEqual(len(decode_embedding(blob)), len(blob) // 4)
+
+    def test_quantize_float16(self):
+        vector = np.random.default_rng(0).normal(size=384).astype(np.float32)
+        blob = quantize_embedding(vector, EmbeddingStorage.FLOAT16)
+        decoded = decode_embedding(blob)
+
+        self.assertEqual(len(blob), HEADER_STRUCT.size + 384 * 2)
+        self.assertEqual(decoded.dtype, np.float16)
+        np.testing.assert_allclose(decoded, vector, rtol=1e-3, atol=1e-3)
+
+    def test_quantize_int8(self):
+        vector = np.random.default_rng(0).normal(size=384).astype(np.float32)
+        blob = quantize_embedding(vector, "int8")
+        decoded = decode_embedding(blob)
+
+        self.assertEqual(len(blob), HEADER_STRUCT.size + 384)
+        self.assertEqual(decoded.dtype, np.float32)
+        self.assertFalse(decoded.flags.writeable)
+        max_error = np.abs(vector).max() / 127 / 2
+        np.testing.assert_allclose(decoded, vector, atol=max_error * 1.01)
+
+    def test_quantize_int8_null_vector(self):
+        decoded = decode_embedding(quantize_embedding(np.zeros(8), "int8"))
+        np.testing.assert_array_equal(decoded, np.zeros(8, dtype=np.float32))
+
+    def test_unsupported_vectors(self):
+        with self.assertRaises(ValueError):
+            encode_embedding(np.ones((2, 2), dtype=np.float32))
+        with self.assertRaises(ValueError):
+            encode_embedding(np.ones(2, dtype=np.int64))
+        with self.assertRaises(ValueError):
+            encode_embedding(np.ones(2, dtype=np.int8))
+
+
+class TestEmbeddingColumn(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        corpus = Corpus(
+            id=uuid.uuid4(),
+            source_name="Corpus Test",
+            is_fix=True,
+            is_active=True,
+            binary_treshold=0.5,
+            category_id=category.id,
+        )
+        self.embedding_model = EmbeddingModel(
+            id=uuid.uuid4(), title="all-minilm-l6-v2", lang="en"
+        )
+        self.session.add_all([corpus, self.embedding_model])
+        self.session.commit()
+        self.document = WeLearnDocument(
+            id=uuid.uuid4(),
+            url="https://example.com/doc",
+            full_content="This is a test document, used for unit testing.",
+            corpus_id=corpus.id,
+        )
+        self.session.add(self.document)
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _add_slice(self, embedding):
+        document_slice = DocumentSlice(
+            id=uuid.uuid4(),
+            document_id=self.document.id,
+            embedding=embedding,
+            body="slice",
+            order_sequence=0,
+            embedding_model_name=self.embedding_model.title,
+            embedding_model_id=self.embedding_model.id,
+        )
+        self.session.add(document_slice)
+        self.session.commit()
+        self.session.expire_all()
+        return self.session.get(DocumentSlice, document_slice.id)
+
+    def test_store_and_load_ndarray(self):
+        vector = np.random.default_rng(0).random(384, dtype=np.float32)
+        slice_from_db = self._add_slice(vector)
+
+        self.assertIsInstance(slice_from_db.embedding, np.ndarray)
+        self.assertEqual(slice_from_db.embedding.dtype, np.float32)
+        np.testing.assert_array_equal(slice_from_db.embedding, vector)
+
+    def test_load_legacy_bytes(self):
+        vector = np.random.default_rng(0).random(384, dtype=np.float32)
+        slice_from_db = self._add_slice(vector.tobytes())
+
+        np.testing.assert_array_equal(slice_from_db.embedding, vector)
+        stored = self.session.execute(
+            text("SELECT embedding FROM document_related.document_slice")
+        ).scalar()
+        self.assertEqual(stored, vector.tobytes())
+
+    def test_requantize_slice_embeddings(self):
+        rng = np.random.default_rng(0)
+        vectors = [rng.normal(size=64).astype(np.float32) for _ in range(5)]
+        for vector in vectors:
+            self._add_slice(vector)
+
+        rewritten = requantize_slice_embeddings(
+            self.session, self.embedding_model.id, EmbeddingStorage.INT8, batch_size=2
+        )
+        self.assertEqual(rewritten, 5)
+        self.session.expire_all()
+
+        self.assertEqual(self.embedding_model.embedding_storage, "int8")
+        stored = self.session.execute(
+            text("SELECT embedding FROM document_related.document_slice")
+        ).scalars()
+        self.assertTrue(all(len(blob) == HEADER_STRUCT.size + 64 for blob in stored))
+
+        loaded = [s.embedding for s in self.session.query(DocumentSlice).all()]
+        for vector in vectors:
+            self.assertTrue(
+                any(np.allclose(vector, embedding, atol=0.05) for embedding in loaded)
+            )
+
+    def test_new_slice_uses_model_storage(self):
+        self.embedding_model.embedding_storage = EmbeddingStorage.INT8
+        self.session.commit()
+        vector = np.random.default_rng(0).normal(size=64).astype(np.float32)
+        slice_from_db = self._add_slice(vector)
+
+        stored = self.session.execute(
+            text("SELECT embedding FROM document_related.document_slice")
+        ).scalar()
+        self.assertEqual(len(stored), HEADER_STRUCT.size + 64)
+        self.assertEqual(slice_from_db.embedding.dtype, np.float32)
+        np.testing.assert_allclose(slice_from_db.embedding, vector, atol=0.05)
+
+    def test_updated_slice_uses_model_storage(self):
+        self.embedding_model.embedding_storage = EmbeddingStorage.FLOAT16
+        self.session.commit()
+        slice_from_db = self._add_slice(np.zeros(64, dtype=np.float32))
+
+        vector = np.random.default_rng(0).normal(size=64).astype(np.float32)
+        slice_from_db.embedding = vector
+        self.session.commit()
+
+        stored = self.session.execute(
+            text("SELECT embedding FROM document_related.document_slice")
+        ).scalar()
+        self.assertEqual(len(stored), HEADER_STRUCT.size + 64 * 2)
+        np.testing.assert_allclose(slice_from_db.embedding, vector, atol=0.01)
+
+    def test_slice_embedding_stays_an_array_after_flush(self):
+        self.embedding_model.embedding_storage = EmbeddingStorage.INT8
+        self.session.commit()
+        vector = np.random.default_rng(0).normal(size=64).astype(np.float32)
+        document_slice = DocumentSlice(
+            id=uuid.uuid4(),
+            document_id=self.document.id,
+            embedding=vector,
+            body="slice",
+            order_sequence=0,
+            embedding_model_name=self.embedding_model.title,
+            embedding_model_id=self.embedding_model.id,
+        )
+        self.session.add(document_slice)
+        self.session.flush()
+
+        self.assertIsInstance(document_slice.embedding, np.ndarray)
+        np.testing.assert_allclose(document_slice.embedding, vector, atol=0.05)
+        self.assertNotIn(document_slice, self.session.dirty)
+        stored = self.session.execute(
+            text("SELECT embedding FROM document_related.document_slice")
+        ).scalar()
+        self.assertEqual(len(stored), HEADER_STRUCT.size + 64)
@@ -0,0 +1,215 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.models import Base
+from welearn_database.data.models.user_related import EndpointRequest, InferredUser
+from welearn_database.data.models.user_related import Session as UserSession
+from welearn_database.modules.endpoint_request_writer import (
+    AsyncEndpointRequestWriter,
+    EndpointRequestWriter,
+)
+
+
+def _user_session_rows() -> tuple[InferredUser, UserSession]:
+    user = InferredUser(id=uuid.uuid4())
+    user_session = UserSession(
+        id=uuid.uuid4(), inferred_user_id=user.id, end_at=datetime(2026, 10, 18)
+    )
+    return user, user_session
+
+
+class TestEndpointRequestWriter(TestCase):
+    def setUp(self):
+        # A single connection shared with the writer thread
+        self.engine = create_engine(
+            "sqlite://",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        user, self.user_session = _user_session_rows()
+        self.session.add(user)
+        self.session.commit()
+        self.session.add(self.user_session)
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _count(self) -> int:
+        with self.s_maker() as session:
+            return session.scalar(select(func.count()).select_from(EndpointRequest))
+
+    def test_flush_by_batch_size_and_on_close(self):
+        writer = EndpointRequestWriter(
+            self.s_maker, batch_size=10, flush_interval_ms=60_000
+        )
+        with writer:
+            for i in range(25):
+                self.assertTrue(
+                    writer.submit(self.user_session.id, f"/api/v1/endpoint_{i}", 200)
+                )
+
+        self.assertEqual(self._count(), 25)
+        self.assertEqual(writer.stats.enqueued, 25)
+        self.assertEqual(writer.stats.flushed, 25)
+        self.assertEqual(writer.stats.batches, 3)
+        self.assertFalse(writer.submit(self.user_session.id, "/api/v1/late", 200))
+        self.assertEqual(writer.stats.dropped, 1)
+
+    def test_flush_by_interval(self):
+        with EndpointRequestWriter(
+            self.s_maker, batch_size=1000, flush_interval_ms=20
+        ) as writer:
+            created_at = datetime(2026, 10, 17, 9, 30)
+            writer.submit(self.user_session.id, "/api/v1/search", 200, "ok", created_at)
+            # Wait on the counters, the test thread must not share the connection with the writer
+            deadline = time.monotonic() + 5
+            while writer.stats.flushed == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            self.assertEqual(writer.stats.flushed, 1)
+            self.assertEqual(self._count(), 1)
+            row = self.session.scalars(select(EndpointRequest)).one()
+            self.assertEqual(row.created_at, created_at)
+            self.assertEqual(row.message, "ok")
+
+    def test_full_queue_drops_rows(self):
+        writer = EndpointRequestWriter(self.s_maker, max_queue_size=2)
+        accepted = [
+            writer.submit(self.user_session.id, "/api/v1/search", 200) for _ in range(3)
+        ]
+        writer.close()
+
+        self.assertEqual(accepted, [True, True, False])
+        self.assertEqual(writer.stats.dropped, 1)
+        self.assertEqual(writer.stats.flushed, 2)
+        self.assertEqual(self._count(), 2)
+
+    def test_concurrent_submits_wait_their_own_timeout(self):
+        # Not started: the queue stays full, as with a stalled writer
+        writer = EndpointRequestWriter(
+            self.s_maker, max_queue_size=1, block_timeout=0.2
+        )
+        writer.submit(self.user_session.id, "/api/v1/search", 200)
+
+        def timed_submit(_) -> tuple[bool, float]:
+            start = time.monotonic()
+            accepted = writer.submit(self.user_session.id, "/api/v1/search", 200)
+            return accepted, time.monotonic() - start
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(timed_submit, range(6)))
+
+        for accepted, duration in results:
+            self.assertFalse(accepted)
+            self.assertGreaterEqual(duration, 0.19)
+            self.assertLess(duration, 0.5)
+        self.assertEqual(writer.stats.dropped, 6)
+        writer.close()
+        self.assertEqual(writer.stats.flushed, 1)
+
+    def test_close_wakes_blocked_submits(self):
+        writer = EndpointRequestWriter(
+            self.s_maker, max_queue_size=1, block_timeout=None
+        )
+        writer.submit(self.user_session.id, "/api/v1/search", 200)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            blocked = executor.submit(
+                writer.submit, self.user_session.id, "/api/v1/search", 200
+            )
+            time.sleep(0.05)
+            writer.close()
+            self.assertFalse(blocked.result(timeout=5))
+        self.assertEqual(writer.stats.flushed, 1)
+
+    def test_failed_batch_is_counted(self):
+        # The session does not exist, the foreign key makes the insert fail
+        with self.engine.begin() as conn:
+            conn.execute(text("PRAGMA foreign_keys = ON"))
+        writer = EndpointRequestWriter(self.s_maker)
+        with writer:
+            writer.submit(uuid.uuid4(), "/api/v1/search", 200)
+
+        self.assertEqual(writer.stats.failed, 1)
+        self.assertEqual(writer.stats.flushed, 0)
+
+
+class TestAsyncEndpointRequestWriter(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with self.engine.begin() as conn:
+            for schema_name in DbSchemaEnum:
+                await conn.execute(text(f"ATTACH ':memory:' AS {schema_name.value}"))
+            await conn.run_sync(Base.metadata.create_all)
+        self.s_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        user, self.user_session = _user_session_rows()
+        async with self.s_maker() as session:
+            session.add(user)
+            await session.commit()
+            session.add(self.user_session)
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def _count(self) -> int:
+        async with self.s_maker() as session:
+            return await session.scalar(
+                select(func.count()).select_from(EndpointRequest)
+            )
+
+    async def test_flush_by_batch_size_and_on_close(self):
+        writer = AsyncEndpointRequestWriter(
+            self.s_maker, batch_size=10, flush_interval_ms=60_000
+        )
+        async with writer:
+            for i in range(25):
+                await writer.submit(self.user_session.id, f"/api/v1/endpoint_{i}", 200)
+
+        self.assertEqual(await self._count(), 25)
+        self.assertEqual(writer.stats.flushed, 25)
+        self.assertEqual(writer.stats.batches, 3)
+
+    async def test_full_queue_drops_rows(self):
+        writer = AsyncEndpointRequestWriter(self.s_maker, max_queue_size=2)
+        accepted = [
+            await writer.submit(self.user_session.id, "/api/v1/search", 200)
+            for _ in range(3)
+        ]
+        await writer.close()
+
+        self.assertEqual(accepted, [True, True, False])
+        self.assertEqual(writer.stats.dropped, 1)
+        self.assertEqual(await self._count(), 2)
+
+    async def test_flush_by_interval(self):
+        async with AsyncEndpointRequestWriter(
+            self.s_maker, batch_size=1000, flush_interval_ms=20
+        ) as writer:
+            for _ in range(3):
+                await writer.submit(self.user_session.id, "/api/v1/search", 200)
+            deadline = time.monotonic() + 5
+            while writer.stats.flushed < 3 and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+            self.assertEqual(writer.stats.flushed, 3)
+            self.assertEqual(writer.stats.batches, 1)
+            self.assertEqual(await self._count(), 3)
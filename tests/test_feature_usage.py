@@ -0,0 +1,213 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.user_related import (
+    EndpointFeature,
+    EndpointRequest,
+    InferredUser,
+    RollupWatermark,
+)
+from welearn_database.data.models.user_related import Session as UserSession
+from welearn_database.data.models.user_related import SessionFeatureUsage
+from welearn_database.modules.feature_usage import (
+    DEFAULT_LAG,
+    WATERMARK_NAME,
+    rebuild_session_feature_usage,
+    update_session_feature_usage,
+)
+
+START = datetime(2026, 10, 17, 8, 0)
+
+
+class TestSessionFeatureUsage(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        self.session.add_all(
+            [
+                EndpointFeature(
+                    endpoint_name="/api/v1/search/by_document", feature_name="search"
+                ),
+                EndpointFeature(
+                    endpoint_name="/api/v1/qna/chat/answer", feature_name="chat"
+                ),
+                EndpointFeature(
+                    endpoint_name="/api/v1/qna/chat/agent", feature_name="chat"
+                ),
+            ]
+        )
+        self.user = InferredUser(id=uuid.uuid4(), created_at=START)
+        self.session.add(self.user)
+        self.session.commit()
+        self.user_sessions = [
+            UserSession(
+                id=uuid.uuid4(),
+                inferred_user_id=self.user.id,
+                created_at=START + timedelta(minutes=i),
+                end_at=START + timedelta(hours=1),
+            )
+            for i in range(2)
+        ]
+        self.session.add_all(self.user_sessions)
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _request(self, user_session, endpoint_name: str, minutes: int):
+        self.session.add(
+            EndpointRequest(
+                id=uuid.uuid4(),
+                session_id=user_session.id,
+                endpoint_name=endpoint_name,
+                http_code=200,
+                created_at=START + timedelta(minutes=minutes),
+            )
+        )
+        self.session.commit()
+
+    def _usage(self) -> dict[tuple, int]:
+        return {
+            (row.session_id, row.feature_name): row.cnt
+            for row in self.session.scalars(select(SessionFeatureUsage))
+        }
+
+    def test_update_counts_every_feature_of_active_sessions(self):
+        first, second = self.user_sessions
+        self._request(first, "/api/v1/qna/chat/answer", 1)
+        self._request(first, "/api/v1/qna/chat/agent", 2)
+        self._request(first, "/api/v1/user/profile", 3)
+
+        updated = update_session_feature_usage(
+            self.session, until=START + timedelta(minutes=10)
+        )
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(
+            self._usage(), {(first.id, "chat"): 2, (first.id, "search"): 0}
+        )
+        row = self.session.get(SessionFeatureUsage, (first.id, "chat"))
+        self.assertEqual(row.inferred_user_id, self.user.id)
+        self.assertEqual(row.session_created_at, first.created_at)
+        self.assertNotIn(second.id, {session_id for session_id, _ in self._usage()})
+
+    def test_update_only_reads_requests_after_the_watermark(self):
+        first, second = self.user_sessions
+        self._request(first, "/api/v1/search/by_document", 1)
+        update_session_feature_usage(self.session, until=START + timedelta(minutes=5))
+
+        self._request(first, "/api/v1/search/by_document", 6)
+        self._request(second, "/api/v1/qna/chat/answer", 7)
+        # Requests after until are left for the next run
+        self._request(second, "/api/v1/qna/chat/answer", 20)
+        update_session_feature_usage(self.session, until=START + timedelta(minutes=10))
+
+        self.assertEqual(
+            self._usage(),
+            {
+                (first.id, "search"): 2,
+                (first.id, "chat"): 0,
+                (second.id, "search"): 0,
+                (second.id, "chat"): 1,
+            },
+        )
+        self.assertEqual(
+            self.session.get(RollupWatermark, WATERMARK_NAME).watermark,
+            START + timedelta(minutes=10),
+        )
+        self.assertEqual(
+            update_session_feature_usage(
+                self.session, until=START + timedelta(minutes=10)
+            ),
+            0,
+        )
+
+    def test_rebuild_after_mapping_change(self):
+        first, _ = self.user_sessions
+        self._request(first, "/api/v1/tutor/syllabus", 1)
+        update_session_feature_usage(self.session, until=START + timedelta(minutes=5))
+        self.assertEqual(
+            self._usage(), {(first.id, "chat"): 0, (first.id, "search"): 0}
+        )
+
+        self.session.add(
+            EndpointFeature(
+                endpoint_name="/api/v1/tutor/syllabus", feature_name="syllabus"
+            )
+        )
+        self.session.commit()
+        rebuild_session_feature_usage(self.session, until=START + timedelta(minutes=5))
+
+        self.assertEqual(
+            self._usage(),
+            {
+                (first.id, "chat"): 0,
+                (first.id, "search"): 0,
+                (first.id, "syllabus"): 1,
+            },
+        )
+
+    def test_update_counts_requests_committed_after_the_watermark(self):
+        first, second = self.user_sessions
+        self._request(first, "/api/v1/search/by_document", 1)
+        update_session_feature_usage(self.session, until=START + timedelta(minutes=5))
+
+        # Created before the watermark, committed after the previous run
+        self._request(first, "/api/v1/search/by_document", 4)
+        self._request(first, "/api/v1/qna/chat/answer", 6)
+        update_session_feature_usage(self.session, until=START + timedelta(minutes=10))
+
+        self.assertEqual(
+            self._usage(), {(first.id, "search"): 2, (first.id, "chat"): 1}
+        )
+
+        # Older than the window, in a session without newer requests: left to rebuild_session_feature_usage
+        self._request(second, "/api/v1/search/by_document", 2)
+        update_session_feature_usage(
+            self.session,
+            until=START + timedelta(minutes=20),
+            window=timedelta(minutes=5),
+        )
+        self.assertEqual(
+            self._usage(), {(first.id, "search"): 2, (first.id, "chat"): 1}
+        )
+
+    def test_update_defaults_until_to_the_database_clock(self):
+        first, _ = self.user_sessions
+        db_now = self.session.scalar(select(func.localtimestamp()))
+        for created_at in (db_now - 2 * DEFAULT_LAG, db_now):
+            self.session.add(
+                EndpointRequest(
+                    id=uuid.uuid4(),
+                    session_id=first.id,
+                    endpoint_name="/api/v1/search/by_document",
+                    http_code=200,
+                    created_at=created_at,
+                )
+            )
+        self.session.commit()
+
+        update_session_feature_usage(self.session)
+
+        # The request within lag of the database clock is left for the next run
+        self.assertEqual(
+            self._usage(), {(first.id, "search"): 1, (first.id, "chat"): 0}
+        )
+        watermark = self.session.scalar(
+            select(RollupWatermark.watermark).where(
+                RollupWatermark.name == WATERMARK_NAME
+            )
+        )
+        self.assertGreaterEqual(watermark, db_now - DEFAULT_LAG)
+        self.assertLess(watermark, db_now)
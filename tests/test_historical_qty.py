@@ -0,0 +1,126 @@
+import uuid
+from datetime import datetime
+from unittest import TestCase
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.enumeration import Step
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import (
+    HistoricalQtyDocumentInQdrant,
+    HistoricalQtyDocumentInQdrantPerCorpus,
+    HistoricalQtyDocumentPerCorpus,
+    WeLearnDocument,
+)
+from welearn_database.modules.historical_qty import snapshot_historical_qty
+from welearn_database.modules.process_state import record_transitions
+
+
+class TestSnapshotHistoricalQty(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        self.corpora = [
+            Corpus(
+                id=uuid.uuid4(),
+                source_name=f"corpus_{i}",
+                is_fix=True,
+                is_active=True,
+                binary_treshold=0.5,
+                category_id=category.id,
+            )
+            for i in range(3)
+        ]
+        self.session.add_all(self.corpora)
+        self.session.commit()
+
+        # corpus_0: 4 documents, 3 in Qdrant, corpus_1: 2 documents, none in Qdrant,
+        # corpus_2: 1 document without any state
+        self.documents = {corpus.source_name: [] for corpus in self.corpora}
+        for corpus, quantity in zip(self.corpora, [4, 2, 1]):
+            for i in range(quantity):
+                document = WeLearnDocument(
+                    id=uuid.uuid4(),
+                    url=f"https://example.com/{corpus.source_name}/doc-{i}",
+                    full_content="This is a test document, used for unit testing.",
+                    corpus_id=corpus.id,
+                )
+                self.session.add(document)
+                self.documents[corpus.source_name].append(document.id)
+        self.session.commit()
+
+        record_transitions(
+            self.session,
+            self.documents["corpus_0"] + self.documents["corpus_1"],
+            Step.URL_RETRIEVED,
+        )
+        record_transitions(
+            self.session, self.documents["corpus_0"][:3], Step.DOCUMENT_IN_QDRANT
+        )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _rows(self, model) -> list:
+        return self.session.scalars(select(model)).all()
+
+    def test_snapshot_historical_qty(self):
+        created_at = datetime(2026, 10, 17, 8, 30)
+        snapshot = snapshot_historical_qty(self.session, created_at)
+
+        self.assertEqual(snapshot.per_corpus, {"corpus_0": 4, "corpus_1": 2})
+        self.assertEqual(snapshot.in_qdrant_per_corpus, {"corpus_0": 3})
+        self.assertEqual(snapshot.in_qdrant, 3)
+
+        per_corpus = self._rows(HistoricalQtyDocumentPerCorpus)
+        self.assertEqual(
+            {row.source_name: row.count for row in per_corpus},
+            {"corpus_0": 4, "corpus_1": 2},
+        )
+        in_qdrant_per_corpus = self._rows(HistoricalQtyDocumentInQdrantPerCorpus)
+        self.assertEqual(
+            {row.source_name: row.count for row in in_qdrant_per_corpus},
+            {"corpus_0": 3},
+        )
+        in_qdrant = self._rows(HistoricalQtyDocumentInQdrant)
+        self.assertEqual([row.count for row in in_qdrant], [3])
+        self.assertEqual(
+            {
+                row.created_at
+                for row in [*per_corpus, *in_qdrant_per_corpus, *in_qdrant]
+            },
+            {created_at},
+        )
+
+    def test_snapshot_is_idempotent_per_day(self):
+        snapshot_historical_qty(self.session, datetime(2026, 10, 16, 23, 0))
+        snapshot_historical_qty(self.session, datetime(2026, 10, 17, 8, 0))
+        record_transitions(
+            self.session, self.documents["corpus_1"], Step.DOCUMENT_IN_QDRANT
+        )
+        snapshot_historical_qty(self.session, datetime(2026, 10, 17, 20, 0))
+
+        in_qdrant = sorted(
+            self._rows(HistoricalQtyDocumentInQdrant), key=lambda r: r.created_at
+        )
+        self.assertEqual(
+            [(row.created_at, row.count) for row in in_qdrant],
+            [
+                (datetime(2026, 10, 16, 23, 0), 3),
+                (datetime(2026, 10, 17, 20, 0), 5),
+            ],
+        )
+        self.assertEqual(len(self._rows(HistoricalQtyDocumentPerCorpus)), 4)
+        self.assertEqual(len(self._rows(HistoricalQtyDocumentInQdrantPerCorpus)), 3)
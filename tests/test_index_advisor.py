@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    UniqueConstraint,
+)
+
+from welearn_database.data.models import Base
+from welearn_database.modules.index_advisor import find_unindexed_foreign_keys
+
+
+class TestIndexAdvisor(TestCase):
+    def test_hot_foreign_keys_are_indexed(self):
+        unindexed = {
+            (fk.table, fk.columns) for fk in find_unindexed_foreign_keys(Base.metadata)
+        }
+
+        for table, column in [
+            ("document_related.process_state", "document_id"),
+            ("document_related.document_slice", "document_id"),
+            ("document_related.sdg", "slice_id"),
+            ("user_related.returned_document", "message_id"),
+            ("user_related.endpoint_request", "session_id"),
+            ("user_related.chat_message", "inferred_user_id"),
+        ]:
+            self.assertNotIn((table, (column,)), unindexed)
+
+    def test_find_unindexed_foreign_keys(self):
+        metadata = MetaData()
+        Table("parent", metadata, Column("id", Integer, primary_key=True))
+        Table(
+            "other_parent",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("key", Integer, primary_key=True),
+        )
+        Table(
+            "child",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("indexed_id", ForeignKey("parent.id"), index=True),
+            Column("unique_id", ForeignKey("parent.id")),
+            Column("trailing_id", ForeignKey("parent.id")),
+            Column("plain_id", ForeignKey("parent.id")),
+            Column("other_id", Integer),
+            Column("other_key", Integer),
+            UniqueConstraint("unique_id", "plain_id"),
+            Index("child_other_trailing_idx", "other_key", "other_id", "trailing_id"),
+            ForeignKeyConstraint(
+                ["other_id", "other_key"], ["other_parent.id", "other_parent.key"]
+            ),
+        )
+
+        unindexed = find_unindexed_foreign_keys(metadata)
+
+        self.assertEqual(
+            [(fk.table, fk.columns, fk.referred_table) for fk in unindexed],
+            [
+                ("child", ("plain_id",), "parent"),
+                ("child", ("trailing_id",), "parent"),
+            ],
+        )
+        self.assertEqual(
+            unindexed[0].suggestion(),
+            "CREATE INDEX CONCURRENTLY child_plain_id_idx ON child (plain_id);",
+        )
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest import TestCase
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import CorpusNameEmbeddingModelLang
+from welearn_database.data.models.document_related import (
+    MaterializedViewRefresh,
+    QtyDocumentInQdrantPerCorpus,
+    QtyDocumentPerCorpus,
+)
+from welearn_database.modules.materialized_views import (
+    read_only_tables,
+    stale_views,
+    unique_index_ddl,
+)
+
+
+class TestMaterializedViews(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_read_only_tables(self):
+        tables = read_only_tables()
+
+        for model in [
+            QtyDocumentPerCorpus,
+            QtyDocumentInQdrantPerCorpus,
+            CorpusNameEmbeddingModelLang,
+        ]:
+            self.assertIn(model.__table__, tables)
+        self.assertNotIn(MaterializedViewRefresh.__table__, tables)
+
+    def test_unique_index_ddl(self):
+        self.assertEqual(
+            unique_index_ddl(CorpusNameEmbeddingModelLang.__table__),
+            "CREATE UNIQUE INDEX IF NOT EXISTS corpus_name_embedding_model_lang_unique_idx "
+            "ON corpus_related.corpus_name_embedding_model_lang (corpus_id, lang)",
+        )
+
+    def test_stale_views(self):
+        now = datetime(2026, 10, 17, 12, 0)
+        fresh = "document_related.qty_document_per_corpus"
+        old = "document_related.qty_document_in_qdrant_per_corpus"
+        never = "corpus_related.corpus_name_embedding_model_lang"
+        self.session.add_all(
+            [
+                MaterializedViewRefresh(
+                    id=uuid.uuid4(),
+                    view_name=fresh,
+                    refreshed_at=now - timedelta(hours=3),
+                    duration_seconds=1.5,
+                    concurrently=False,
+                ),
+                MaterializedViewRefresh(
+                    id=uuid.uuid4(),
+                    view_name=fresh,
+                    refreshed_at=now - timedelta(minutes=5),
+                    duration_seconds=0.2,
+                    concurrently=True,
+                ),
+                MaterializedViewRefresh(
+                    id=uuid.uuid4(),
+                    view_name=old,
+                    refreshed_at=now - timedelta(hours=2),
+                    duration_seconds=0.3,
+                    concurrently=True,
+                ),
+            ]
+        )
+        self.session.commit()
+
+        self.assertEqual(
+            stale_views(self.session, [fresh, old, never], timedelta(hours=1), now=now),
+            [old, never],
+        )
+        self.assertEqual(
+            stale_views(self.session, [fresh, old, never], timedelta(0), now=now),
+            [fresh, old, never],
+        )
@@ -0,0 +1,129 @@
+from datetime import date
+from unittest import TestCase
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.user_related import EndpointRequest
+from welearn_database.modules.partitions import (
+    MonthlyPartition,
+    add_months,
+    maintain_partitions,
+    plan_partitions,
+)
+
+TABLE = EndpointRequest.__table__
+
+
+class TestMonthlyPartition(TestCase):
+    def test_add_months(self):
+        self.assertEqual(add_months(date(2026, 11, 1), 2), date(2027, 1, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -13), date(2024, 12, 1))
+
+    def test_ddl(self):
+        partition = MonthlyPartition(
+            "user_related", "endpoint_request", date(2026, 12, 1)
+        )
+
+        self.assertEqual(partition.name, "endpoint_request_y2026m12")
+        self.assertEqual(
+            partition.create_ddl(),
+            "CREATE TABLE IF NOT EXISTS user_related.endpoint_request_y2026m12 "
+            "PARTITION OF user_related.endpoint_request "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+        )
+        self.assertEqual(
+            partition.detach_ddl(),
+            "ALTER TABLE user_related.endpoint_request "
+            "DETACH PARTITION user_related.endpoint_request_y2026m12",
+        )
+
+    def test_from_name(self):
+        self.assertEqual(
+            MonthlyPartition.from_name(
+                "user_related", "endpoint_request", "endpoint_request_y2026m03"
+            ),
+            MonthlyPartition("user_related", "endpoint_request", date(2026, 3, 1)),
+        )
+        for name in ["endpoint_request_default", "other_table_y2026m03"]:
+            self.assertIsNone(
+                MonthlyPartition.from_name("user_related", "endpoint_request", name)
+            )
+
+
+class TestPlanPartitions(TestCase):
+    def _names(self, partitions: list[MonthlyPartition]) -> list[str]:
+        return [partition.name for partition in partitions]
+
+    def test_creates_missing_months_ahead(self):
+        plan = plan_partitions(
+            TABLE,
+            ["endpoint_request_default", "endpoint_request_y2026m10"],
+            date(2026, 10, 17),
+            months_ahead=3,
+        )
+
+        self.assertEqual(
+            self._names(plan.to_create),
+            [
+                "endpoint_request_y2026m11",
+                "endpoint_request_y2026m12",
+                "endpoint_request_y2027m01",
+            ],
+        )
+        self.assertEqual(plan.to_detach, [])
+
+    def test_first_month_covers_existing_rows(self):
+        plan = plan_partitions(
+            TABLE, [], date(2026, 10, 17), months_ahead=0, first_month=date(2026, 8, 23)
+        )
+
+        self.assertEqual(
+            self._names(plan.to_create),
+            [
+                "endpoint_request_y2026m08",
+                "endpoint_request_y2026m09",
+                "endpoint_request_y2026m10",
+            ],
+        )
+
+    def test_detaches_partitions_past_retention(self):
+        attached = [
+            f"endpoint_request_y{month:%Y}m{month:%m}"
+            for month in (add_months(date(2026, 1, 1), i) for i in range(13))
+        ]
+
+        plan = plan_partitions(
+            TABLE, attached, date(2026, 10, 17), months_ahead=3, retention_months=6
+        )
+
+        self.assertEqual(
+            self._names(plan.to_detach),
+            [
+                "endpoint_request_y2026m01",
+                "endpoint_request_y2026m02",
+                "endpoint_request_y2026m03",
+            ],
+        )
+        self.assertEqual(plan.to_create, [])
+
+
+class TestMaintainPartitions(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_nothing_to_do_without_partitioning(self):
+        plan = maintain_partitions(self.session, retention_months=6)
+
+        self.assertEqual(plan.to_create, [])
+        self.assertEqual(plan.to_detach, [])
@@ -0,0 +1,232 @@
+import uuid
+from unittest import TestCase
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.enumeration import Step
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import (
+    DocumentLatestState,
+    ProcessState,
+    WeLearnDocument,
+)
+from welearn_database.exceptions import InvalidStepTransition
+from welearn_database.modules.process_state import (
+    backfill_document_latest_state,
+    record_transitions,
+)
+
+
+class TestBackfillDocumentLatestState(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        corpus = Corpus(
+            id=uuid.uuid4(),
+            source_name="Corpus Test",
+            is_fix=True,
+            is_active=True,
+            binary_treshold=0.5,
+            category_id=category.id,
+        )
+        self.session.add(corpus)
+        self.session.commit()
+        self.documents = [
+            WeLearnDocument(
+                id=uuid.uuid4(),
+                url=f"https://example.com/doc-{i}",
+                full_content="This is a test document, used for unit testing.",
+                corpus_id=corpus.id,
+            )
+            for i in range(3)
+        ]
+        self.session.add_all(self.documents)
+        self.session.commit()
+        self.operation_order = 0
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _add_state(self, document: WeLearnDocument, step: Step) -> ProcessState:
+        self.operation_order += 1
+        state = ProcessState(
+            id=uuid.uuid4(),
+            document_id=document.id,
+            title=step.value.lower(),
+            operation_order=self.operation_order,
+        )
+        self.session.add(state)
+        self.session.commit()
+        return state
+
+    def _latest_states(self) -> dict:
+        return {
+            row.document_id: row
+            for row in self.session.scalars(select(DocumentLatestState))
+        }
+
+    def test_backfill_keeps_latest_state_per_document(self):
+        doc_a, doc_b, doc_c = self.documents
+        self._add_state(doc_a, Step.URL_RETRIEVED)
+        self._add_state(doc_b, Step.URL_RETRIEVED)
+        last_a = self._add_state(doc_a, Step.DOCUMENT_SCRAPED)
+        last_b = self._add_state(doc_b, Step.DOCUMENT_IS_IRRETRIEVABLE)
+
+        row_count = backfill_document_latest_state(self.session)
+        self.session.commit()
+
+        self.assertEqual(row_count, 2)
+        latest = self._latest_states()
+        self.assertNotIn(doc_c.id, latest)
+        self.assertEqual(latest[doc_a.id].process_state_id, last_a.id)
+        self.assertEqual(latest[doc_a.id].title, Step.DOCUMENT_SCRAPED.value)
+        self.assertEqual(latest[doc_a.id].operation_order, last_a.operation_order)
+        self.assertEqual(latest[doc_b.id].process_state_id, last_b.id)
+        self.assertEqual(latest[doc_b.id].title, Step.DOCUMENT_IS_IRRETRIEVABLE.value)
+
+    def test_backfill_updates_only_newer_states(self):
+        doc_a, doc_b, _ = self.documents
+        self._add_state(doc_a, Step.URL_RETRIEVED)
+        self._add_state(doc_b, Step.URL_RETRIEVED)
+        backfill_document_latest_state(self.session)
+        self.session.commit()
+
+        last_a = self._add_state(doc_a, Step.DOCUMENT_SCRAPED)
+        row_count = backfill_document_latest_state(self.session)
+        self.session.commit()
+
+        self.assertEqual(row_count, 1)
+        latest = self._latest_states()
+        self.assertEqual(latest[doc_a.id].process_state_id, last_a.id)
+        self.assertEqual(latest[doc_b.id].title, Step.URL_RETRIEVED.value)
+
+    def test_backfill_restricted_to_documents(self):
+        doc_a, doc_b, _ = self.documents
+        self._add_state(doc_a, Step.URL_RETRIEVED)
+        self._add_state(doc_b, Step.URL_RETRIEVED)
+
+        backfill_document_latest_state(self.session, document_ids=[doc_b.id])
+        self.session.commit()
+
+        self.assertEqual(list(self._latest_states()), [doc_b.id])
+
+
+class TestRecordTransitions(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        corpus = Corpus(
+            id=uuid.uuid4(),
+            source_name="Corpus Test",
+            is_fix=True,
+            is_active=True,
+            binary_treshold=0.5,
+            category_id=category.id,
+        )
+        self.session.add(corpus)
+        self.session.commit()
+        self.documents = [
+            WeLearnDocument(
+                id=uuid.uuid4(),
+                url=f"https://example.com/doc-{i}",
+                full_content="This is a test document, used for unit testing.",
+                corpus_id=corpus.id,
+            )
+            for i in range(5)
+        ]
+        self.session.add_all(self.documents)
+        self.session.commit()
+        self.document_ids = [document.id for document in self.documents]
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_record_transitions(self):
+        first_range = record_transitions(
+            self.session, self.document_ids, Step.URL_RETRIEVED
+        )
+        second_range = record_transitions(
+            self.session, self.document_ids[:2], Step.DOCUMENT_SCRAPED
+        )
+        self.session.commit()
+
+        self.assertEqual(first_range, (1, 5))
+        self.assertEqual(second_range, (6, 7))
+        states = self.session.scalars(
+            select(ProcessState).order_by(ProcessState.operation_order)
+        ).all()
+        self.assertEqual([s.operation_order for s in states], list(range(1, 8)))
+        self.assertEqual(
+            [s.document_id for s in states],
+            self.document_ids + self.document_ids[:2],
+        )
+        latest = {
+            row.document_id: row.title
+            for row in self.session.scalars(select(DocumentLatestState))
+        }
+        self.assertEqual(
+            latest,
+            {
+                doc_id: (
+                    Step.DOCUMENT_SCRAPED.value if i < 2 else Step.URL_RETRIEVED.value
+                )
+                for i, doc_id in enumerate(self.document_ids)
+            },
+        )
+
+    def test_record_transitions_deduplicates_and_skips_empty(self):
+        self.assertIsNone(record_transitions(self.session, [], Step.URL_RETRIEVED))
+        operation_range = record_transitions(
+            self.session,
+            [self.document_ids[0], self.document_ids[0]],
+            Step.URL_RETRIEVED,
+        )
+        self.session.commit()
+
+        self.assertEqual(operation_range, (1, 1))
+        self.assertEqual(len(self.session.scalars(select(ProcessState)).all()), 1)
+
+    def test_record_transitions_validates_previous_steps(self):
+        record_transitions(
+            self.session,
+            self.document_ids[:2],
+            Step.URL_RETRIEVED,
+            allowed_previous_steps=[None],
+        )
+        self.session.commit()
+
+        with self.assertRaises(InvalidStepTransition):
+            record_transitions(
+                self.session,
+                self.document_ids,
+                Step.DOCUMENT_SCRAPED,
+                allowed_previous_steps=[Step.URL_RETRIEVED],
+            )
+        self.assertEqual(len(self.session.scalars(select(ProcessState)).all()), 2)
+
+        operation_range = record_transitions(
+            self.session,
+            self.document_ids[:2],
+            Step.DOCUMENT_SCRAPED,
+            allowed_previous_steps=[Step.URL_RETRIEVED],
+        )
+        self.assertEqual(operation_range, (3, 4))
@@ -0,0 +1,179 @@
+import random
+import uuid
+from unittest import TestCase
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.enumeration import PipelineStage, Step
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import WeLearnDocument
+from welearn_database.exceptions import InvalidStepTransition
+from welearn_database.modules.process_state import record_transitions
+from welearn_database.modules.state_machine import (
+    ALLOWED_PREVIOUS_STEPS,
+    PIPELINE,
+    classify_by_stage,
+    is_transition_allowed,
+    ready_for_stage_query,
+)
+
+
+class TestTransitionTables(TestCase):
+    def test_pipeline_transitions(self):
+        self.assertTrue(is_transition_allowed(None, Step.URL_RETRIEVED))
+        self.assertTrue(
+            is_transition_allowed(Step.URL_RETRIEVED, Step.DOCUMENT_SCRAPED)
+        )
+        self.assertTrue(
+            is_transition_allowed("document_scraped", "document_vectorized")
+        )
+        self.assertTrue(
+            is_transition_allowed(
+                Step.DOCUMENT_KEYWORDS_EXTRACTED, Step.DOCUMENT_IN_QDRANT
+            )
+        )
+        self.assertFalse(is_transition_allowed(None, Step.DOCUMENT_SCRAPED))
+        self.assertFalse(
+            is_transition_allowed(Step.URL_RETRIEVED, Step.DOCUMENT_IN_QDRANT)
+        )
+        self.assertFalse(
+            is_transition_allowed(Step.DOCUMENT_VECTORIZED, Step.DOCUMENT_SCRAPED)
+        )
+
+    def test_global_steps_reachable_from_any_state(self):
+        for step in Step:
+            self.assertTrue(is_transition_allowed(step, Step.URL_RETRIEVED))
+            self.assertTrue(is_transition_allowed(step, Step.KEPT_FOR_TRACE))
+
+    def test_allowed_previous_steps_match_transition_table(self):
+        for step, previous_steps in ALLOWED_PREVIOUS_STEPS.items():
+            for previous in [None, *Step]:
+                self.assertEqual(
+                    previous in previous_steps,
+                    is_transition_allowed(previous, step),
+                )
+
+
+class TestClassifyByStage(TestCase):
+    def test_classify_matches_pipeline_definition(self):
+        rng = random.Random(42)
+        steps = [rng.choice([None, *Step]) for _ in range(1000)]
+        document_ids = [uuid.uuid4() for _ in steps]
+
+        buckets = classify_by_stage(document_ids, steps)
+
+        expected = {stage: [] for stage in PipelineStage}
+        for document_id, step in zip(document_ids, steps):
+            for stage, definition in PIPELINE.items():
+                if step in definition.consumes:
+                    expected[stage].append(document_id)
+        self.assertEqual(buckets, expected)
+
+    def test_classify_accepts_database_values(self):
+        document_ids = [uuid.uuid4(), uuid.uuid4(), uuid.uuid4()]
+        buckets = classify_by_stage(
+            document_ids, ["document_scraped", "document_in_qdrant", "url_retrieved"]
+        )
+
+        self.assertEqual(buckets[PipelineStage.VECTORIZE], [document_ids[0]])
+        self.assertEqual(buckets[PipelineStage.SCRAPE], [document_ids[2]])
+        self.assertEqual(buckets[PipelineStage.LOAD_QDRANT], [])
+
+    def test_classify_rejects_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            classify_by_stage([uuid.uuid4()], [Step.URL_RETRIEVED, None])
+
+
+class TestReadyForStage(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        self.corpora = [
+            Corpus(
+                id=uuid.uuid4(),
+                source_name=f"Corpus {i}",
+                is_fix=True,
+                is_active=True,
+                binary_treshold=0.5,
+                category_id=category.id,
+            )
+            for i in range(2)
+        ]
+        self.session.add_all(self.corpora)
+        self.session.commit()
+        self.documents = [
+            WeLearnDocument(
+                id=uuid.uuid4(),
+                url=f"https://example.com/doc-{i}",
+                full_content="This is a test document, used for unit testing.",
+                corpus_id=self.corpora[i % 2].id,
+            )
+            for i in range(6)
+        ]
+        self.session.add_all(self.documents)
+        self.session.commit()
+        self.document_ids = [document.id for document in self.documents]
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def test_ready_for_stage(self):
+        record_transitions(
+            self.session, self.document_ids, Step.URL_RETRIEVED, validate=True
+        )
+        record_transitions(
+            self.session,
+            self.document_ids[:4],
+            Step.DOCUMENT_SCRAPED,
+            validate=True,
+        )
+        self.session.commit()
+
+        self.assertEqual(
+            list(self.session.scalars(ready_for_stage_query(PipelineStage.SCRAPE))),
+            self.document_ids[4:],
+        )
+        self.assertEqual(
+            list(self.session.scalars(ready_for_stage_query(PipelineStage.VECTORIZE))),
+            self.document_ids[:4],
+        )
+        self.assertEqual(
+            list(
+                self.session.scalars(
+                    ready_for_stage_query(
+                        PipelineStage.VECTORIZE,
+                        corpus_id=self.corpora[1].id,
+                        limit=1,
+                    )
+                )
+            ),
+            [self.document_ids[1]],
+        )
+
+    def test_record_transitions_validates_against_pipeline(self):
+        with self.assertRaises(InvalidStepTransition):
+            record_transitions(
+                self.session, self.document_ids, Step.DOCUMENT_SCRAPED, validate=True
+            )
+
+        record_transitions(
+            self.session, self.document_ids, Step.URL_RETRIEVED, validate=True
+        )
+        with self.assertRaises(InvalidStepTransition):
+            record_transitions(
+                self.session,
+                self.document_ids,
+                Step.DOCUMENT_VECTORIZED,
+                validate=True,
+            )
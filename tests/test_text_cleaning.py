@@ -0,0 +1,188 @@
+import random
+from html import unescape
+from html.parser import HTMLParser
+from threading import Thread
+from unittest import TestCase
+from unittest.mock import patch
+
+from welearn_database.data.models.document_related import WeLearnDocument
+from welearn_database.exceptions import ContentIsTooShort
+from welearn_database.modules.text_cleaning import (
+    CleanedText,
+    clean_text,
+    clean_texts,
+    has_html_markup,
+)
+
+
+class _ReferenceTagRemover(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.result = []
+
+    def handle_data(self, data):
+        self.result.append(data)
+
+
+def reference_clean_text(content):
+    """
+    clean_text as implemented before the fast path, one parser per call.
+    """
+    if not isinstance(content, str):
+        return content
+    remover = _ReferenceTagRemover()
+    remover.feed(content + "\n")
+    txt = unescape("".join(remover.result))
+    return " ".join(txt.split()).strip()
+
+
+DIFFERENTIAL_CORPUS = [
+    "",
+    " ",
+    "\n\t\r",
+    "Plain text without any markup.",
+    "  Leading and trailing whitespace  ",
+    "Multiple   spaces\tand\ttabs\nand\r\nnew lines",
+    "Unicode whitespace non breaking em space　ideographic",
+    "Accents é à ü and emoji 🎓 stay untouched",
+    "<p>Simple paragraph</p>",
+    "<div><p>Nested <b>tags</b></p> and <br/> self closing</div>",
+    "Entities &amp; &lt;b&gt; &eacute; &#233; &#x00E9;",
+    "Double escaped &amp;lt;p&amp;gt;",
+    "Dangling ampersand & alone",
+    "Ampersand at the very end &",
+    "Unfinished entity &amp",
+    "a < b and c > d",
+    "<unclosed tag",
+    "text <!-- comment --> text",
+    "<script>var a = '<b>';</script> after script",
+    "<style>p { color: red; }</style>styled",
+    "<![CDATA[some cdata]]> after",
+    "<?xml version='1.0'?><root>xml</root>",
+    "<a href='https://example.com?a=1&b=2'>link</a>",
+    "Text with\x00null\x0bvertical tab\x0cform feed",
+]
+
+
+class TestCleanText(TestCase):
+    def test_differential_corpus(self):
+        for text in DIFFERENTIAL_CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(clean_text(text), reference_clean_text(text))
+
+    def test_differential_random(self):
+        rng = random.Random(42)
+        alphabet = list("abc é\t\n\r <>/&;#x0123pb!- ") + [
+            "<p>",
+            "</p>",
+            "&amp;",
+            "&lt;",
+            "&#233;",
+            "<br/>",
+            "<!--",
+            "-->",
+        ]
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+            with self.subTest(text=text):
+                self.assertEqual(clean_text(text), reference_clean_text(text))
+
+    def test_parser_reuse_does_not_leak_state(self):
+        self.assertEqual(clean_text("<unclosed tag"), "")
+        self.assertEqual(clean_text("<p>next call</p>"), "next call")
+        self.assertEqual(clean_text("<script>never closed"), "")
+        self.assertEqual(clean_text("<b>after script</b>"), "after script")
+
+    def test_threads_use_their_own_parser(self):
+        results = {}
+
+        def worker(i):
+            results[i] = [
+                clean_text(f"<p>thread {i} &amp; {j}</p>") for j in range(200)
+            ]
+
+        threads = [Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(8):
+            self.assertEqual(results[i], [f"thread {i} & {j}" for j in range(200)])
+
+    def test_has_html_markup(self):
+        self.assertFalse(has_html_markup("plain text"))
+        self.assertTrue(has_html_markup("a <b> tag"))
+        self.assertTrue(has_html_markup("an &amp; entity"))
+
+    def test_not_a_string(self):
+        self.assertIsNone(clean_text(None))
+        self.assertEqual(clean_text(12), 12)
+
+
+class TestCleanTexts(TestCase):
+    def test_process_pool_preserves_order(self):
+        texts = [f"<p>Document   {i} &amp; content</p>" for i in range(500)] + [None]
+        results = list(clean_texts(texts, workers=2, chunksize=7))
+
+        self.assertEqual(results, [clean_text(text) for text in texts])
+        self.assertTrue(all(isinstance(r, CleanedText) for r in results[:-1]))
+        self.assertIsNone(results[-1])
+
+    def test_single_worker(self):
+        texts = ["<b>one</b>", "two  ", "&lt;three&gt;"]
+        self.assertEqual(
+            list(clean_texts(texts, workers=1, chunksize=2)), ["one", "two", "<three>"]
+        )
+
+    def test_input_is_consumed_lazily(self):
+        consumed = []
+
+        def generate():
+            for i in range(10_000):
+                consumed.append(i)
+                yield f"text {i}"
+
+        results = clean_texts(generate(), workers=2, chunksize=10)
+        self.assertEqual(next(results), "text 0")
+        # At most 2 chunks per worker are submitted ahead
+        self.assertLessEqual(len(consumed), 2 * 2 * 10 + 10)
+        results.close()
+
+    def test_pre_cleaned_content_is_not_cleaned_again(self):
+        content, description = clean_texts(
+            [
+                "<p>This is a test document, used for unit testing, please ignore.</p>",
+                "<i>A short description</i>",
+            ],
+            workers=1,
+        )
+        with patch(
+            "welearn_database.modules.document_validation.clean_text"
+        ) as mock_clean_text:
+            doc = WeLearnDocument(
+                url="https://example.com/test-document",
+                full_content=content,
+                description=description,
+            )
+        mock_clean_text.assert_not_called()
+
+        reference = WeLearnDocument(
+            url="https://example.com/test-document",
+            full_content="<p>This is a test document, used for unit testing, please ignore.</p>",
+            description="<i>A short description</i>",
+        )
+        self.assertIs(type(doc.full_content), str)
+        self.assertEqual(doc.full_content, reference.full_content)
+        self.assertEqual(doc.description, reference.description)
+        self.assertEqual(doc.trace, reference.trace)
+
+    def test_length_is_checked_on_cleaned_content(self):
+        # Long enough before cleaning, too short after
+        raw = "<div><p><b>Too short</b></p></div>"
+        (cleaned,) = clean_texts([raw], workers=1)
+        for full_content in [raw, cleaned]:
+            with self.assertRaises(ContentIsTooShort):
+                WeLearnDocument(
+                    url="https://example.com/test-document", full_content=full_content
+                )
@@ -0,0 +1,181 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from tests.helpers import handle_schema_with_sqlite
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import (
+    Category,
+    Corpus,
+    EmbeddingModel,
+)
+from welearn_database.data.models.document_related import (
+    DocumentSlice,
+    WeLearnDocument,
+)
+from welearn_database.modules.vector_search import SliceEmbeddingIndex
+
+DIMENSION = 16
+
+
+class TestSliceEmbeddingIndex(TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        handle_schema_with_sqlite(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        self.corpora = [
+            Corpus(
+                id=uuid.uuid4(),
+                source_name=f"Corpus {i}",
+                is_fix=True,
+                is_active=True,
+                binary_treshold=0.5,
+                category_id=category.id,
+            )
+            for i in range(2)
+        ]
+        self.embedding_model = EmbeddingModel(
+            id=uuid.uuid4(), title="all-minilm-l6-v2", lang="en"
+        )
+        self.other_model = EmbeddingModel(
+            id=uuid.uuid4(), title="other-model", lang="en"
+        )
+        self.session.add_all([*self.corpora, self.embedding_model, self.other_model])
+        self.session.commit()
+
+        self.documents = [
+            WeLearnDocument(
+                id=uuid.uuid4(),
+                url=f"https://example.com/doc-{i}",
+                full_content="This is a test document, used for unit testing.",
+                lang="en" if i < 3 else "fr",
+                corpus_id=self.corpora[i % 2].id,
+            )
+            for i in range(4)
+        ]
+        self.session.add_all(self.documents)
+        self.session.commit()
+
+        # One slice per axis, slice i is document i % 4
+        self.slices = [self._add_slice(i) for i in range(8)]
+        self._add_slice(0, embedding_model=self.other_model)
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        Base.metadata.drop_all(self.engine)
+
+    def _add_slice(self, axis, embedding_model=None):
+        embedding = np.zeros(DIMENSION, dtype=np.float32)
+        embedding[axis] = 2.0
+        document_slice = DocumentSlice(
+            id=uuid.uuid4(),
+            document_id=self.documents[axis % 4].id,
+            embedding=embedding,
+            body=f"slice {axis}",
+            order_sequence=axis,
+            embedding_model_name="model",
+            embedding_model_id=(embedding_model or self.embedding_model).id,
+        )
+        self.session.add(document_slice)
+        return document_slice
+
+    def test_search(self):
+        index = SliceEmbeddingIndex(self.embedding_model.id)
+        index.build(self.session)
+        self.assertEqual(len(index), 8)
+
+        queries = np.zeros((2, DIMENSION), dtype=np.float32)
+        queries[0, 3] = 1.0
+        queries[0, 5] = 0.5
+        queries[1, 6] = 3.0
+        results = index.search(queries, k=2)
+
+        self.assertEqual(
+            [m.slice_id for m in results[0]], [self.slices[3].id, self.slices[5].id]
+        )
+        self.assertEqual(results[0][0].document_id, self.documents[3].id)
+        self.assertAlmostEqual(results[0][0].score, 1 / np.sqrt(1.25), places=5)
+        self.assertEqual(results[1][0].slice_id, self.slices[6].id)
+        self.assertAlmostEqual(results[1][0].score, 1.0, places=5)
+        self.assertGreater(index.build_time, 0)
+        self.assertGreater(index.query_latency, 0)
+
+    def test_filters(self):
+        index = SliceEmbeddingIndex(
+            self.embedding_model.id, corpus_id=self.corpora[0].id, lang="en"
+        )
+        index.build(self.session)
+        # Documents 0 and 2 are in corpus 0 and in english
+        self.assertCountEqual(
+            index.slice_ids,
+            [self.slices[i].id for i in (0, 2, 4, 6)],
+        )
+
+    def test_refresh(self):
+        index = SliceEmbeddingIndex(self.embedding_model.id)
+        index.build(self.session)
+
+        new_slice = self._add_slice(9)
+        self.session.delete(self.slices[0])
+        self.session.commit()
+        index.refresh(self.session)
+
+        self.assertEqual(len(index), 8)
+        self.assertNotIn(self.slices[0].id, index.slice_ids)
+        query = np.zeros(DIMENSION, dtype=np.float32)
+        query[9] = 1.0
+        self.assertEqual(index.search(query, k=1)[0][0].slice_id, new_slice.id)
+        self.assertEqual(index.matrix.shape, (8, DIMENSION))
+
+    def test_refresh_reloads_revectorized_slices(self):
+        index = SliceEmbeddingIndex(self.embedding_model.id)
+        index.build(self.session)
+
+        embedding = np.zeros(DIMENSION, dtype=np.float32)
+        embedding[12] = 1.0
+        self.slices[1].embedding = embedding
+        self.session.commit()
+        index.refresh(self.session)
+
+        self.assertEqual(len(index), 8)
+        self.assertEqual(len(set(index.slice_ids)), 8)
+        query = np.zeros(DIMENSION, dtype=np.float32)
+        query[12] = 1.0
+        match = index.search(query, k=1)[0][0]
+        self.assertEqual(match.slice_id, self.slices[1].id)
+        self.assertAlmostEqual(match.score, 1.0, places=5)
+
+    def test_refresh_loads_late_committed_slices_by_chunks(self):
+        index = SliceEmbeddingIndex(self.embedding_model.id, refresh_lag=timedelta(0))
+        index.build(self.session)
+
+        # Written by transactions started long before the build
+        late_slices = [self._add_slice(i) for i in range(9, 14)]
+        for document_slice in late_slices:
+            document_slice.updated_at = datetime(2020, 1, 1)
+        self.session.commit()
+        with patch("welearn_database.modules.vector_search.ID_CHUNK_SIZE", 2):
+            index.refresh(self.session)
+
+        self.assertEqual(len(index), 13)
+        self.assertEqual(
+            set(index.slice_ids[-5:]),
+            {document_slice.id for document_slice in late_slices},
+        )
+
+    def test_empty_index(self):
+        index = SliceEmbeddingIndex(uuid.uuid4())
+        index.build(self.session)
+        self.assertEqual(index.search(np.ones(DIMENSION), k=5), [[]])
@@ -0,0 +1,226 @@
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import TestCase
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from welearn_database.data.enumeration import DbSchemaEnum, Step
+from welearn_database.data.models import Base
+from welearn_database.data.models.corpus_related import Category, Corpus
+from welearn_database.data.models.document_related import (
+    DocumentClaim,
+    ProcessState,
+    WeLearnDocument,
+)
+from welearn_database.modules.process_state import backfill_document_latest_state
+from welearn_database.modules.work_queue import (
+    claim_documents,
+    extend_leases,
+    purge_expired_claims,
+    release_documents,
+)
+
+DOCUMENT_COUNT = 120
+
+
+class TestWorkQueue(TestCase):
+    def setUp(self):
+        # Schemas are attached from files so that every thread gets its own connection to the same data
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'main.db')}",
+            connect_args={"timeout": 30, "check_same_thread": False},
+        )
+
+        @event.listens_for(self.engine, "connect")
+        def attach_schemas(dbapi_connection, _):
+            for schema_name in DbSchemaEnum:
+                path = os.path.join(self.tmp_dir.name, f"{schema_name.value}.db")
+                dbapi_connection.execute(
+                    f"ATTACH DATABASE '{path}' AS {schema_name.value}"
+                )
+
+        Base.metadata.create_all(self.engine)
+        self.s_maker = sessionmaker(self.engine)
+        self.session = self.s_maker()
+
+        category = Category(id=uuid.uuid4(), title="Category Test")
+        self.session.add(category)
+        self.session.commit()
+        corpus = Corpus(
+            id=uuid.uuid4(),
+            source_name="Corpus Test",
+            is_fix=True,
+            is_active=True,
+            binary_treshold=0.5,
+            category_id=category.id,
+        )
+        self.session.add(corpus)
+        self.session.commit()
+
+        self.documents = [
+            WeLearnDocument(
+                id=uuid.uuid4(),
+                url=f"https://example.com/doc-{i}",
+                full_content="This is a test document, used for unit testing.",
+                corpus_id=corpus.id,
+            )
+            for i in range(DOCUMENT_COUNT)
+        ]
+        self.session.add_all(self.documents)
+        self.session.add_all(
+            ProcessState(
+                id=uuid.uuid4(),
+                document_id=document.id,
+                # Every fourth document is not ready for the vectorizer
+                title=(
+                    Step.URL_RETRIEVED.value
+                    if i % 4 == 0
+                    else Step.DOCUMENT_SCRAPED.value
+                ),
+                operation_order=i + 1,
+            )
+            for i, document in enumerate(self.documents)
+        )
+        self.session.commit()
+        backfill_document_latest_state(self.session)
+        self.session.commit()
+        self.scraped_ids = {
+            document.id for i, document in enumerate(self.documents) if i % 4 != 0
+        }
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_claim_oldest_documents_of_step(self):
+        claimed = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-1", batch_size=5
+        )
+
+        expected = [
+            document.id
+            for document in self.documents
+            if document.id in self.scraped_ids
+        ][:5]
+        self.assertEqual(claimed, expected)
+        claims = self.session.scalars(select(DocumentClaim)).all()
+        self.assertEqual({c.worker_id for c in claims}, {"worker-1"})
+        self.assertEqual({c.step for c in claims}, {Step.DOCUMENT_SCRAPED.value})
+
+    def test_claimed_documents_are_skipped(self):
+        first = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-1", batch_size=50
+        )
+        second = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-2", batch_size=50
+        )
+
+        self.assertEqual(len(first), 50)
+        self.assertEqual(len(second), len(self.scraped_ids) - 50)
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(
+            claim_documents(self.session, Step.DOCUMENT_SCRAPED, "worker-3"), []
+        )
+
+    def test_expired_lease_can_be_claimed_again(self):
+        first = claim_documents(
+            self.session,
+            Step.DOCUMENT_SCRAPED,
+            "worker-1",
+            batch_size=3,
+            lease_seconds=-1,
+        )
+        second = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-2", batch_size=3
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(
+            set(
+                self.session.scalars(
+                    select(DocumentClaim.worker_id).where(
+                        DocumentClaim.document_id.in_(second)
+                    )
+                )
+            ),
+            {"worker-2"},
+        )
+
+    def test_leases_follow_the_database_clock(self):
+        claimed = claim_documents(
+            self.session,
+            Step.DOCUMENT_SCRAPED,
+            "worker-1",
+            batch_size=2,
+            lease_seconds=120,
+        )
+        database_now = self.session.scalar(select(func.localtimestamp()))
+
+        for claim in self.session.scalars(
+            select(DocumentClaim).where(DocumentClaim.document_id.in_(claimed))
+        ):
+            self.assertLessEqual(claim.claimed_at, database_now)
+            self.assertEqual(
+                claim.lease_expires_at - claim.claimed_at, timedelta(seconds=120)
+            )
+
+    def test_release_documents(self):
+        claimed = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-1", batch_size=4
+        )
+
+        self.assertEqual(release_documents(self.session, "worker-2", claimed), 0)
+        self.assertEqual(release_documents(self.session, "worker-1", claimed[:2]), 2)
+        self.session.commit()
+
+        reclaimed = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-2", batch_size=4
+        )
+        self.assertEqual(reclaimed[:2], claimed[:2])
+
+    def test_extend_and_purge_leases(self):
+        active = claim_documents(
+            self.session, Step.DOCUMENT_SCRAPED, "worker-2", batch_size=2
+        )
+        expired = claim_documents(
+            self.session,
+            Step.DOCUMENT_SCRAPED,
+            "worker-1",
+            batch_size=2,
+            lease_seconds=-1,
+        )
+        self.assertFalse(set(expired) & set(active))
+
+        self.assertEqual(extend_leases(self.session, "worker-1", expired), 0)
+        self.assertEqual(extend_leases(self.session, "worker-2", active), 2)
+        self.assertEqual(purge_expired_claims(self.session), 2)
+        self.session.commit()
+        self.assertEqual(
+            set(self.session.scalars(select(DocumentClaim.document_id))), set(active)
+        )
+
+    def test_concurrent_workers_never_claim_twice(self):
+        def drain(worker_id: str) -> list[uuid.UUID]:
+            session = self.s_maker()
+            claimed = []
+            try:
+                while batch := claim_documents(
+                    session, Step.DOCUMENT_SCRAPED, worker_id, batch_size=7
+                ):
+                    claimed.extend(batch)
+            finally:
+                session.close()
+            return claimed
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(drain, [f"worker-{i}" for i in range(8)]))
+
+        all_claimed = [doc_id for result in results for doc_id in result]
+        self.assertEqual(len(all_claimed), len(set(all_claimed)))
+        self.assertEqual(set(all_claimed), self.scraped_ids)
@@ -1,4 +1,5 @@
 import os
+import re
 from logging.config import fileConfig
 
 from alembic import context
@@ -57,11 +58,24 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+# Indexes declared on the models, the other indexes of the database are left out of autogenerate
+MODEL_INDEX_NAMES = {
+    index.name for table in target_metadata.tables.values() for index in table.indexes
+}
+
+# Partitions of a model table (see modules.partitions) are managed outside of the migrations
+MODEL_TABLE_NAMES = {table.name for table in target_metadata.tables.values()}
+PARTITION_NAME = re.compile(r"^(?P<table>\w+)_(y\d{4}m\d{2}|default)$")
+
+
 def include_name(name, type_, parent_names):
     if type_ == "schema" and name in EXCLUDE_SCHEMAS_NAMES:
         return False
     elif type_ == "index":
-        return False
+        return name in MODEL_INDEX_NAMES
+    elif type_ == "table":
+        partition = PARTITION_NAME.match(name)
+        return partition is None or partition["table"] not in MODEL_TABLE_NAMES
 
     return True
 
@@ -0,0 +1,45 @@
+"""embedding storage
+
+Revision ID: 3780a7aa58c2
+Revises: 6d4346fad6f4
+Create Date: 2026-10-17 09:12:31.418502
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from welearn_database.data.enumeration import EmbeddingStorage
+
+# revision identifiers, used by Alembic.
+revision: str = "3780a7aa58c2"
+down_revision: Union[str, None] = "6d4346fad6f4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    enum_string = ",".join([f"'{i.value}'" for i in EmbeddingStorage])
+    op.execute(f"CREATE TYPE corpus_related.embedding_storage AS ENUM ({enum_string});")
+    op.add_column(
+        "embedding_model",
+        sa.Column(
+            "embedding_storage",
+            postgresql.ENUM(
+                *(e.value for e in EmbeddingStorage),
+                name="embedding_storage",
+                schema="corpus_related",
+            ),
+            server_default=EmbeddingStorage.FLOAT32.value,
+            nullable=False,
+        ),
+        schema="corpus_related",
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("embedding_model", "embedding_storage", schema="corpus_related")
+    op.execute("DROP TYPE corpus_related.embedding_storage;")
@@ -0,0 +1,160 @@
+"""partition endpoint request
+
+Revision ID: a7c3e91b52d4
+Revises: e35725c3ef7c
+Create Date: 2026-10-17 19:21:07.118342
+
+"""
+
+from datetime import date
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e91b52d4"
+down_revision: Union[str, None] = "e35725c3ef7c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, session_id, endpoint_name, http_code, message, created_at"
+
+# Naming and horizon of modules.partitions at this revision, inlined so that later changes do not alter the migration
+MONTHS_AHEAD = 3
+
+# Columns of revision e354666f951d, the primary key of a partitioned table must hold the partition key
+TABLE_DDL = """
+CREATE TABLE user_related.endpoint_request (
+    id uuid DEFAULT gen_random_uuid() NOT NULL,
+    session_id uuid NOT NULL,
+    endpoint_name varchar NOT NULL,
+    http_code integer NOT NULL,
+    message varchar,
+    created_at timestamp DEFAULT NOW() NOT NULL,
+    CONSTRAINT endpoint_request_pkey PRIMARY KEY ({primary_key}),
+    CONSTRAINT endpoint_request_session_id_fkey FOREIGN KEY (session_id)
+        REFERENCES user_related.session (id)
+){partition_by};
+"""
+
+# Views reading user_related.endpoint_request, as created in revision 4c7161819e5a
+DEPENDENT_VIEWS = {
+    "grafana.endpoint_request": """
+CREATE OR REPLACE VIEW grafana.endpoint_request
+AS SELECT endpoint_request.id,
+    endpoint_request.session_id,
+    endpoint_request.endpoint_name,
+    endpoint_request.http_code,
+    endpoint_request.message,
+    endpoint_request.created_at
+   FROM user_related.endpoint_request;
+    """,
+    "grafana.qty_endpoints_per_user": """
+CREATE OR REPLACE VIEW grafana.qty_endpoints_per_user
+AS SELECT iu.*::user_related.inferred_user AS iu,
+    count(1) AS count
+   FROM user_related.endpoint_request er
+     JOIN user_related.session s ON s.id = er.session_id
+     JOIN user_related.inferred_user iu ON iu.id = s.inferred_user_id
+  GROUP BY iu.id;
+    """,
+    "grafana.qty_session_endpoint_per_user": """
+CREATE OR REPLACE VIEW grafana.qty_session_endpoint_per_user
+AS SELECT s.inferred_user_id,
+    s.host,
+    count(DISTINCT s.id) AS count_sessions,
+    count(er.id) AS count_endpoints
+   FROM user_related.session s
+     LEFT JOIN user_related.endpoint_request er ON s.id = er.session_id
+  GROUP BY s.inferred_user_id, s.host;
+    """,
+}
+
+
+def _rename_table(old: str, new: str) -> None:
+    op.execute(f"ALTER TABLE user_related.{old} RENAME TO {new};")
+    op.execute(
+        f"ALTER TABLE user_related.{new} RENAME CONSTRAINT {old}_pkey TO {new}_pkey;"
+    )
+    op.execute(
+        f"ALTER TABLE user_related.{new} "
+        f"RENAME CONSTRAINT {old}_session_id_fkey TO {new}_session_id_fkey;"
+    )
+    op.execute(
+        f"ALTER INDEX user_related.{old}_session_id_idx "
+        f"RENAME TO {new}_session_id_idx;"
+    )
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _monthly_partitions_ddl(first_month: date | None) -> list[str]:
+    # One partition per month, from the oldest request through MONTHS_AHEAD months after the current one
+    current = date.today().replace(day=1)
+    month = date(first_month.year, first_month.month, 1) if first_month else current
+    statements = []
+    while month <= _add_months(current, MONTHS_AHEAD):
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS user_related.endpoint_request_y{month:%Y}m{month:%m} "
+            "PARTITION OF user_related.endpoint_request "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+        month = _add_months(month, 1)
+    return statements
+
+
+def _swap_table(old: str, primary_key: str, partition_by: str) -> None:
+    # The table is locked for the copy, run it in a maintenance window
+    for view_name in DEPENDENT_VIEWS:
+        op.execute(f"DROP VIEW IF EXISTS {view_name};")
+    _rename_table("endpoint_request", old)
+    op.execute(TABLE_DDL.format(primary_key=primary_key, partition_by=partition_by))
+    op.create_index(
+        "endpoint_request_session_id_idx",
+        "endpoint_request",
+        ["session_id"],
+        schema="user_related",
+    )
+
+
+def _copy_rows_and_drop(old: str) -> None:
+    op.execute(f"""
+        INSERT INTO user_related.endpoint_request ({COLUMNS})
+        SELECT {COLUMNS} FROM user_related.{old};
+        """)
+    op.execute(f"DROP TABLE user_related.{old};")
+    for view_ddl in DEPENDENT_VIEWS.values():
+        op.execute(view_ddl)
+
+
+def upgrade() -> None:
+    _swap_table(
+        "endpoint_request_legacy",
+        primary_key="id, created_at",
+        partition_by=" PARTITION BY RANGE (created_at)",
+    )
+    # Catches the rows outside of the monthly partitions, stays empty as long as they are pre-created
+    op.execute(
+        "CREATE TABLE user_related.endpoint_request_default "
+        "PARTITION OF user_related.endpoint_request DEFAULT;"
+    )
+    first_month = (
+        op.get_bind()
+        .execute(
+            sa.text("SELECT min(created_at) FROM user_related.endpoint_request_legacy")
+        )
+        .scalar()
+    )
+    for partition_ddl in _monthly_partitions_ddl(first_month):
+        op.execute(partition_ddl)
+    _copy_rows_and_drop("endpoint_request_legacy")
+
+
+def downgrade() -> None:
+    # Partitions detached by maintain_partitions are left untouched
+    _swap_table("endpoint_request_partitioned", primary_key="id", partition_by="")
+    _copy_rows_and_drop("endpoint_request_partitioned")
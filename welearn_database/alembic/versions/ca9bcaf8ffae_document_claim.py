@@ -0,0 +1,88 @@
+"""document claim
+
+Revision ID: ca9bcaf8ffae
+Revises: e4d5bd6fd8ee
+Create Date: 2026-10-17 13:26:54.804117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from welearn_database.data.enumeration import Step
+
+# revision identifiers, used by Alembic.
+revision: str = "ca9bcaf8ffae"
+down_revision: Union[str, None] = "e4d5bd6fd8ee"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_claim",
+        sa.Column("document_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "step",
+            postgresql.ENUM(
+                *(e.value.lower() for e in Step),
+                name="step",
+                schema="document_related",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("worker_id", sa.String(), nullable=False),
+        sa.Column("claimed_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.Column("lease_expires_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["document_id"],
+            ["document_related.welearn_document.id"],
+            name="document_claim_document_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("document_id"),
+        schema="document_related",
+    )
+    op.create_index(
+        "document_claim_worker_id_idx",
+        "document_claim",
+        ["worker_id"],
+        schema="document_related",
+    )
+
+    # Claims pick the oldest documents of a step, the index serves both the filter and the order
+    op.drop_index(
+        "document_latest_state_title_idx",
+        table_name="document_latest_state",
+        schema="document_related",
+    )
+    op.create_index(
+        "document_latest_state_title_operation_order_idx",
+        "document_latest_state",
+        ["title", "operation_order"],
+        schema="document_related",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "document_latest_state_title_operation_order_idx",
+        table_name="document_latest_state",
+        schema="document_related",
+    )
+    op.create_index(
+        "document_latest_state_title_idx",
+        "document_latest_state",
+        ["title"],
+        schema="document_related",
+    )
+    op.drop_index(
+        "document_claim_worker_id_idx",
+        table_name="document_claim",
+        schema="document_related",
+    )
+    op.drop_table("document_claim", schema="document_related")
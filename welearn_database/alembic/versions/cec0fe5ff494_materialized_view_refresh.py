@@ -0,0 +1,72 @@
+"""materialized view refresh
+
+Revision ID: cec0fe5ff494
+Revises: d9810ad653a1
+Create Date: 2026-10-17 16:48:12.560831
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "cec0fe5ff494"
+down_revision: Union[str, None] = "d9810ad653a1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Unique indexes required by REFRESH MATERIALIZED VIEW CONCURRENTLY, on the model primary keys
+UNIQUE_INDEXES = [
+    ("qty_document_per_corpus", "document_related", ["source_name"]),
+    ("qty_document_in_qdrant_per_corpus", "document_related", ["source_name"]),
+    ("corpus_name_embedding_model_lang", "corpus_related", ["corpus_id", "lang"]),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "materialized_view_refresh",
+        sa.Column(
+            "id",
+            sa.Uuid(),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("view_name", sa.String(), nullable=False),
+        sa.Column("refreshed_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.Column("duration_seconds", sa.Float(), nullable=False),
+        sa.Column("concurrently", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        schema="document_related",
+    )
+    op.create_index(
+        "materialized_view_refresh_view_name_refreshed_at_idx",
+        "materialized_view_refresh",
+        ["view_name", "refreshed_at"],
+        schema="document_related",
+    )
+    for view, schema, columns in UNIQUE_INDEXES:
+        op.create_index(
+            f"{view}_unique_idx",
+            view,
+            columns,
+            unique=True,
+            schema=schema,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    for view, schema, _ in UNIQUE_INDEXES:
+        op.drop_index(
+            f"{view}_unique_idx", table_name=view, schema=schema, if_exists=True
+        )
+    op.drop_index(
+        "materialized_view_refresh_view_name_refreshed_at_idx",
+        table_name="materialized_view_refresh",
+        schema="document_related",
+    )
+    op.drop_table("materialized_view_refresh", schema="document_related")
@@ -0,0 +1,78 @@
+"""foreign key indexes
+
+Revision ID: d9810ad653a1
+Revises: ca9bcaf8ffae
+Create Date: 2026-10-17 15:02:48.377210
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9810ad653a1"
+down_revision: Union[str, None] = "ca9bcaf8ffae"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column, schema)
+FOREIGN_KEY_INDEXES = [
+    (
+        "process_state_document_id_idx",
+        "process_state",
+        "document_id",
+        "document_related",
+    ),
+    (
+        "document_slice_document_id_idx",
+        "document_slice",
+        "document_id",
+        "document_related",
+    ),
+    ("sdg_slice_id_idx", "sdg", "slice_id", "document_related"),
+    (
+        "returned_document_message_id_idx",
+        "returned_document",
+        "message_id",
+        "user_related",
+    ),
+    (
+        "endpoint_request_session_id_idx",
+        "endpoint_request",
+        "session_id",
+        "user_related",
+    ),
+    (
+        "chat_message_inferred_user_id_idx",
+        "chat_message",
+        "inferred_user_id",
+        "user_related",
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, column, schema in FOREIGN_KEY_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                schema=schema,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, schema in FOREIGN_KEY_INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                schema=schema,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,206 @@
+"""session feature usage
+
+Revision ID: e35725c3ef7c
+Revises: cec0fe5ff494
+Create Date: 2026-10-17 18:02:41.377215
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e35725c3ef7c"
+down_revision: Union[str, None] = "cec0fe5ff494"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Formerly inlined as a VALUES list in grafana.used_feature_per_session
+ENDPOINT_FEATURES = [
+    ("/api/v1/search/by_document", "search"),
+    ("/api/v1/qna/chat/answer", "chat"),
+    ("/api/v1/qna/chat/agent", "chat"),
+    ("/api/v1/tutor/syllabus", "syllabus"),
+    ("/api/v1/user/bookmarks/:document_id", "bookmark"),
+    ("/api/v1/user/:user_id/bookmarks/:document_id", "bookmark"),
+]
+
+WATERMARK_NAME = "session_feature_usage"
+# DEFAULT_LAG of modules.feature_usage: rows created just before the migration may not be committed yet
+ROLLUP_CUTOFF = "LOCALTIMESTAMP - INTERVAL '1 minute'"
+
+ROLLUP_VIEW = """
+CREATE VIEW grafana.used_feature_per_session
+AS SELECT sfu.inferred_user_id,
+    sfu.session_id,
+    sfu.feature_name,
+    sfu.cnt,
+    sfu.cnt > 0 AS is_feature_used,
+    sfu.session_created_at
+   FROM user_related.session_feature_usage sfu
+  ORDER BY sfu.session_created_at;
+"""
+
+# Same definition as revision 6d4346fad6f4
+CROSS_JOIN_VIEW = """
+CREATE VIEW grafana.used_feature_per_session
+AS WITH matching_features_endpoint AS (
+SELECT
+	endpoint_name,
+	feature_name
+FROM
+	(
+VALUES
+	('/api/v1/search/by_document', 'search'),
+	('/api/v1/qna/chat/answer', 'chat'),
+	('/api/v1/qna/chat/agent', 'chat'),
+	('/api/v1/tutor/syllabus', 'syllabus'),
+	('/api/v1/user/bookmarks/' || ':' || 'document_id', 'bookmark'),
+	('/api/v1/user/' || ':' || 'user_id' || '/bookmarks/' || ':' || 'document_id', 'bookmark')
+	) AS t(endpoint_name, feature_name)
+),
+session_feature_pair AS (
+SELECT
+	DISTINCT
+	er.session_id,
+	mfe.feature_name
+FROM
+	user_related.endpoint_request er
+CROSS JOIN matching_features_endpoint mfe
+ORDER BY
+	er.session_id
+),
+actual_count AS (
+SELECT
+	er.session_id,
+	mfe.feature_name,
+	COUNT(1) AS cnt
+FROM
+	user_related.endpoint_request er
+INNER JOIN
+	user_related."session" s ON
+	s.id = er.session_id
+INNER JOIN
+	matching_features_endpoint mfe ON
+	mfe.endpoint_name = er.endpoint_name
+GROUP BY
+	er.session_id,
+	mfe.feature_name
+)
+SELECT
+	s.inferred_user_id,
+	sfp.session_id,
+	sfp.feature_name,
+	COALESCE(ac.cnt, 0) AS cnt,
+	COALESCE(ac.cnt, 0) > 0 AS is_feature_used,
+	s.created_at AS session_created_at
+FROM
+	session_feature_pair sfp
+LEFT JOIN actual_count ac ON
+	ac.feature_name = sfp.feature_name
+	AND ac.session_id = sfp.session_id
+INNER JOIN user_related."session" s ON
+	s.id = sfp.session_id
+ORDER BY
+	session_created_at
+"""
+
+
+def upgrade() -> None:
+    endpoint_feature = op.create_table(
+        "endpoint_feature",
+        sa.Column("endpoint_name", sa.String(), nullable=False),
+        sa.Column("feature_name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("endpoint_name"),
+        schema="user_related",
+    )
+    op.bulk_insert(
+        endpoint_feature,
+        [
+            {"endpoint_name": endpoint_name, "feature_name": feature_name}
+            for endpoint_name, feature_name in ENDPOINT_FEATURES
+        ],
+    )
+    op.create_table(
+        "session_feature_usage",
+        sa.Column("session_id", sa.Uuid(), nullable=False),
+        sa.Column("feature_name", sa.String(), nullable=False),
+        sa.Column("inferred_user_id", sa.Uuid(), nullable=False),
+        sa.Column("session_created_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.Column("cnt", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["session_id"],
+            ["user_related.session.id"],
+            name="session_feature_usage_session_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("session_id", "feature_name"),
+        schema="user_related",
+    )
+    op.create_index(
+        "session_feature_usage_session_created_at_idx",
+        "session_feature_usage",
+        ["session_created_at"],
+        schema="user_related",
+    )
+    op.create_table(
+        "rollup_watermark",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("watermark", postgresql.TIMESTAMP(), nullable=False),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("name"),
+        schema="user_related",
+    )
+
+    # Initial rollup, update_session_feature_usage carries on from the watermark;
+    # LOCALTIMESTAMP is the start of the migration transaction, so both statements use the same cutoff
+    op.execute(f"""
+        INSERT INTO user_related.session_feature_usage
+            (session_id, feature_name, inferred_user_id, session_created_at, cnt)
+        SELECT er.session_id,
+            f.feature_name,
+            s.inferred_user_id,
+            s.created_at,
+            COUNT(ef.endpoint_name)
+        FROM user_related.endpoint_request er
+        JOIN user_related."session" s ON s.id = er.session_id
+        CROSS JOIN (SELECT DISTINCT feature_name FROM user_related.endpoint_feature) f
+        LEFT JOIN user_related.endpoint_feature ef
+            ON ef.endpoint_name = er.endpoint_name AND ef.feature_name = f.feature_name
+        WHERE er.created_at <= {ROLLUP_CUTOFF}
+        GROUP BY er.session_id, f.feature_name, s.inferred_user_id, s.created_at;
+        """)
+    op.execute(f"""
+        INSERT INTO user_related.rollup_watermark (name, watermark)
+        VALUES ('{WATERMARK_NAME}', {ROLLUP_CUTOFF});
+        """)
+
+    op.execute("DROP VIEW IF EXISTS grafana.used_feature_per_session;")
+    op.execute(ROLLUP_VIEW)
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS grafana.used_feature_per_session;")
+    op.execute(CROSS_JOIN_VIEW)
+    op.drop_table("rollup_watermark", schema="user_related")
+    op.drop_index(
+        "session_feature_usage_session_created_at_idx",
+        table_name="session_feature_usage",
+        schema="user_related",
+    )
+    op.drop_table("session_feature_usage", schema="user_related")
+    op.drop_table("endpoint_feature", schema="user_related")
@@ -0,0 +1,146 @@
+"""document latest state
+
+Revision ID: e4d5bd6fd8ee
+Revises: 3780a7aa58c2
+Create Date: 2026-10-17 10:41:07.215936
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from welearn_database.data.enumeration import Step
+
+# revision identifiers, used by Alembic.
+revision: str = "e4d5bd6fd8ee"
+down_revision: Union[str, None] = "3780a7aa58c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LATEST_STATE_VIEW = """
+CREATE OR REPLACE VIEW grafana.{view_name}
+AS SELECT ls.process_state_id AS id,
+    ls.document_id,
+    wd.corpus_id,
+    wd.lang,
+    ls.title,
+    ls.created_at,
+    ls.operation_order
+   FROM document_related.document_latest_state ls
+     JOIN document_related.welearn_document wd ON ls.document_id = wd.id;
+"""
+
+HISTORY_VIEW = """
+CREATE OR REPLACE VIEW grafana.{view_name}
+AS SELECT DISTINCT ON (ps.document_id) ps.id,
+    ps.document_id,
+    wd.corpus_id,
+    wd.lang,
+    ps.title,
+    ps.created_at,
+    ps.operation_order
+   FROM document_related.process_state ps
+     JOIN document_related.welearn_document wd ON ps.document_id = wd.id
+  ORDER BY ps.document_id, ps.operation_order DESC;
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_latest_state",
+        sa.Column("document_id", sa.Uuid(), nullable=False),
+        sa.Column("process_state_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "title",
+            postgresql.ENUM(
+                *(e.value.lower() for e in Step),
+                name="step",
+                schema="document_related",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("operation_order", sa.BIGINT(), nullable=False),
+        sa.Column("created_at", postgresql.TIMESTAMP(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["document_id"],
+            ["document_related.welearn_document.id"],
+            name="document_latest_state_document_id_fkey",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("document_id"),
+        schema="document_related",
+    )
+    op.create_index(
+        "document_latest_state_title_idx",
+        "document_latest_state",
+        ["title"],
+        schema="document_related",
+    )
+
+    # Writers wait until the trigger exists (the lock is held until the migration commits),
+    # otherwise states inserted between the backfill snapshot and the trigger creation would be missed
+    op.execute("LOCK TABLE document_related.process_state IN SHARE ROW EXCLUSIVE MODE;")
+    op.execute("""
+        INSERT INTO document_related.document_latest_state
+            (document_id, process_state_id, title, operation_order, created_at)
+        SELECT DISTINCT ON (ps.document_id)
+            ps.document_id, ps.id, ps.title, ps.operation_order, ps.created_at
+        FROM document_related.process_state ps
+        ORDER BY ps.document_id, ps.operation_order DESC;
+        """)
+
+    # Statement level trigger: one upsert per INSERT statement, whatever the number of rows
+    op.execute("""
+        CREATE OR REPLACE FUNCTION document_related.update_document_latest_state()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            INSERT INTO document_related.document_latest_state
+                (document_id, process_state_id, title, operation_order, created_at)
+            SELECT DISTINCT ON (ns.document_id)
+                ns.document_id, ns.id, ns.title, ns.operation_order, ns.created_at
+            FROM new_states ns
+            ORDER BY ns.document_id, ns.operation_order DESC
+            ON CONFLICT (document_id) DO UPDATE SET
+                process_state_id = EXCLUDED.process_state_id,
+                title = EXCLUDED.title,
+                operation_order = EXCLUDED.operation_order,
+                created_at = EXCLUDED.created_at
+            WHERE EXCLUDED.operation_order > document_latest_state.operation_order;
+            RETURN NULL;
+        END;
+        $$;
+        """)
+    op.execute("""
+        CREATE TRIGGER process_state_update_latest_state
+        AFTER INSERT ON document_related.process_state
+        REFERENCING NEW TABLE AS new_states
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION document_related.update_document_latest_state();
+        """)
+
+    # Same columns as before, so the materialized views built on top of them are kept
+    op.execute(LATEST_STATE_VIEW.format(view_name="document_latest_state"))
+    op.execute(LATEST_STATE_VIEW.format(view_name="test_document_latest_state"))
+
+
+def downgrade() -> None:
+    op.execute(HISTORY_VIEW.format(view_name="document_latest_state"))
+    op.execute(HISTORY_VIEW.format(view_name="test_document_latest_state"))
+    op.execute(
+        "DROP TRIGGER IF EXISTS process_state_update_latest_state "
+        "ON document_related.process_state;"
+    )
+    op.execute("DROP FUNCTION IF EXISTS document_related.update_document_latest_state;")
+    op.drop_index(
+        "document_latest_state_title_idx",
+        table_name="document_latest_state",
+        schema="document_related",
+    )
+    op.drop_table("document_latest_state", schema="document_related")
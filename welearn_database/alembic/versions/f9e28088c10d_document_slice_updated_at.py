@@ -0,0 +1,55 @@
+"""document slice updated at
+
+Revision ID: f9e28088c10d
+Revises: a7c3e91b52d4
+Create Date: 2026-10-17 21:47:12.503618
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "f9e28088c10d"
+down_revision: Union[str, None] = "a7c3e91b52d4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NOW() is not volatile, existing rows get the migration time without rewriting the table
+    op.add_column(
+        "document_slice",
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+        schema="document_related",
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "document_slice_embedding_model_id_updated_at_idx",
+            "document_slice",
+            ["embedding_model_id", "updated_at"],
+            schema="document_related",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "document_slice_embedding_model_id_updated_at_idx",
+            table_name="document_slice",
+            schema="document_related",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("document_slice", "updated_at", schema="document_related")
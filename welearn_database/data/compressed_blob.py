@@ -0,0 +1,168 @@
+import logging
+import lzma
+import struct
+import zlib
+
+from welearn_database.data.enumeration import BlobCompression
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, pip install welearn-database[zstd]
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Header layout: magic, compression code
+HEADER_STRUCT = struct.Struct("<4sB")
+HEADER_MAGIC = b"WLCB"
+
+COMPRESSION_CODES = {
+    BlobCompression.NONE: 0,
+    BlobCompression.ZLIB: 1,
+    BlobCompression.LZMA: 2,
+    BlobCompression.ZSTD: 3,
+}
+CODE_COMPRESSIONS = {code: name for name, code in COMPRESSION_CODES.items()}
+
+# Below this size the header costs more than compression saves
+MIN_COMPRESSED_SIZE = 64
+
+_DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (zlib.error, lzma.LZMAError)
+if zstandard is not None:
+    _DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+
+def available_compression(compression: BlobCompression | str) -> BlobCompression:
+    """
+    Return the compression if it can be used here, zlib when zstd is requested but zstandard is missing.
+    :param compression: The requested compression.
+    :return: The compression to use.
+    """
+    compression = BlobCompression(compression)
+    if compression == BlobCompression.ZSTD and zstandard is None:
+        logger.warning("zstandard is not installed, blobs are compressed with zlib")
+        return BlobCompression.ZLIB
+    return compression
+
+
+def compress_blob(
+    value: bytes,
+    compression: BlobCompression | str = BlobCompression.ZLIB,
+    level: int | None = None,
+) -> bytes:
+    """
+    Compress a blob and prefix it with its compression format.
+    Small or incompressible blobs are stored uncompressed, still with the header.
+    :param value: The bytes to store.
+    :param compression: The compression algorithm.
+    :param level: The compression level (lzma preset), the algorithm default when None.
+    :return: The bytes to store.
+    """
+    compression = BlobCompression(compression)
+    value = bytes(value)
+    data = value
+    if compression != BlobCompression.NONE and len(value) >= MIN_COMPRESSED_SIZE:
+        data = _compress(value, compression, level)
+        if len(data) >= len(value):
+            compression, data = BlobCompression.NONE, value
+    else:
+        compression = BlobCompression.NONE
+    return HEADER_STRUCT.pack(HEADER_MAGIC, COMPRESSION_CODES[compression]) + data
+
+
+def decompress_blob(value: bytes) -> bytes:
+    """
+    Return the original bytes of a stored blob.
+    Blobs written before compression was introduced are returned as is.
+    :param value: The stored bytes.
+    :return: The original bytes.
+    """
+    compression = blob_compression(value)
+    if compression is None:
+        return value
+    data = bytes(value[HEADER_STRUCT.size :])
+    if compression == BlobCompression.NONE:
+        return data
+    try:
+        return _decompress(data, compression)
+    except _DECOMPRESSION_ERRORS:
+        # A legacy blob starting with the magic bytes
+        return value
+
+
+def blob_compression(value: bytes) -> BlobCompression | None:
+    """
+    Return the compression announced by the header, None for legacy uncompressed blobs.
+    """
+    if len(value) < HEADER_STRUCT.size or value[:4] != HEADER_MAGIC:
+        return None
+    return CODE_COMPRESSIONS.get(value[4])
+
+
+def _compress(value: bytes, compression: BlobCompression, level: int | None) -> bytes:
+    match compression:
+        case BlobCompression.ZLIB:
+            return zlib.compress(value, -1 if level is None else level)
+        case BlobCompression.LZMA:
+            return lzma.compress(value, preset=level)
+        case BlobCompression.ZSTD:
+            if zstandard is None:
+                raise ValueError("zstd compression requires the zstandard package")
+            return zstandard.ZstdCompressor(
+                level=3 if level is None else level
+            ).compress(value)
+    raise ValueError(f"Unsupported compression {compression}")
+
+
+def _decompress(data: bytes, compression: BlobCompression) -> bytes:
+    match compression:
+        case BlobCompression.ZLIB:
+            return zlib.decompress(data)
+        case BlobCompression.LZMA:
+            return lzma.decompress(data)
+        case BlobCompression.ZSTD:
+            if zstandard is None:
+                raise ValueError(
+                    "Blob is zstd compressed, install the zstandard package"
+                )
+            return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unsupported compression {compression}")
+
+
+class CompressedSerializer:
+    """
+    Wrap a LangGraph serializer (dumps_typed / loads_typed) so that the blobs it produces are compressed.
+    The checkpoint tables of agent_related are owned by LangGraph, which reads and writes their blob columns itself:
+    compression is opted into by giving this serializer to the saver, e.g.
+    PostgresSaver(conn, serde=CompressedSerializer(JsonPlusSerializer())), never by the models of this package.
+    Blobs written before are still read, headerless blobs being returned as is.
+    """
+
+    def __init__(
+        self,
+        serde,
+        compression: BlobCompression | str = BlobCompression.ZLIB,
+        level: int | None = None,
+    ):
+        """
+        :param serde: The LangGraph serializer to wrap.
+        :param compression: The compression of the written blobs.
+        :param level: The compression level, the algorithm default when None.
+        """
+        self.serde = serde
+        self.compression = available_compression(compression)
+        self.level = level
+
+    def dumps_typed(self, obj) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        return type_, compress_blob(data, self.compression, self.level)
+
+    def loads_typed(self, data: tuple[str, bytes]):
+        type_, blob = data
+        return self.serde.loads_typed((type_, decompress_blob(blob)))
+
+    def __getattr__(self, name):
+        # Other serializer methods (dumps, loads...) are left uncompressed
+        if name == "serde":
+            raise AttributeError(name)
+        return getattr(self.serde, name)
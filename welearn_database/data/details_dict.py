@@ -1,6 +1,25 @@
+import json
 from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from typing import Any
+from uuid import UUID
 
 from sqlalchemy import types
+from sqlalchemy.sql.elements import Null
+
+try:
+    import orjson
+except ImportError:  # optional dependency, pip install welearn-database[orjson]
+    orjson = None
+
+
+def _json_default(value):
+    # Types orjson serializes natively, written the same way
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
 class DetailsDict(types.TypeDecorator):
@@ -15,16 +34,51 @@ class DetailsDict(types.TypeDecorator):
     def _is_dataclass_instance(obj):
         return is_dataclass(obj) and not isinstance(obj, type)
 
-    def _inner_serialize_dataclass(self, value):
+    @classmethod
+    def _inner_serialize_dataclass(cls, value):
         match value:
             case list():
-                return [self._inner_serialize_dataclass(item) for item in value]
+                return [cls._inner_serialize_dataclass(item) for item in value]
             case dict():
-                return {k: self._inner_serialize_dataclass(v) for k, v in value.items()}
-        if self._is_dataclass_instance(value):
+                return {k: cls._inner_serialize_dataclass(v) for k, v in value.items()}
+        if cls._is_dataclass_instance(value):
             return asdict(value)
         return value
 
     def process_bind_param(self, value, dialect):
         # Serialize recursively without mutating the original object stored on the ORM instance.
         return self._inner_serialize_dataclass(value)
+
+    def bind_processor(self, dialect):
+        # Details are written by serialize_details in one pass instead of walked, then dumped by the dialect
+        impl_processor = self.impl_instance.bind_processor(dialect)
+
+        def process(value):
+            if value is None or value is types.JSON.NULL or isinstance(value, Null):
+                return impl_processor(value)
+            return serialize_details(value)
+
+        return process
+
+
+def serialize_details(value: Any) -> str:
+    """
+    Serialize details to compact JSON, dataclass instances, datetimes and UUIDs included.
+    orjson is used when installed, in a single pass; otherwise dataclasses are converted first and the stdlib json
+    writes the same bytes (except NaN and the exponent notation of very large or small floats),
+    so that rows do not depend on which serializer wrote them.
+    :param value: The details to serialize.
+    :return: The JSON text.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except orjson.JSONEncodeError:
+            # Non-str keys, integers above 64 bits... are left to the stdlib json
+            pass
+    return json.dumps(
+        DetailsDict._inner_serialize_dataclass(value),
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=_json_default,
+    )
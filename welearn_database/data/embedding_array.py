@@ -0,0 +1,138 @@
+import struct
+
+import numpy as np
+from sqlalchemy import types
+
+from welearn_database.data.enumeration import EmbeddingStorage
+
+# Header layout: magic, format version, dtype code, reserved, dimension, int8 scale
+# 16 bytes so that the vector data stays aligned for every supported dtype
+HEADER_STRUCT = struct.Struct("<4sBBHIf")
+HEADER_MAGIC = b"WLEA"
+HEADER_VERSION = 1
+
+DTYPE_CODES = {
+    np.dtype(np.float32): 1,
+    np.dtype(np.float16): 2,
+    np.dtype(np.int8): 3,
+    np.dtype(np.float64): 4,
+}
+CODE_DTYPES = {code: dtype for dtype, code in DTYPE_CODES.items()}
+INT8 = np.dtype(np.int8)
+INT8_MAX = 127
+
+
+def encode_embedding(vector: np.ndarray) -> bytes:
+    """
+    Serialize a 1-D vector with its header (dtype and dimension) followed by its contiguous data.
+    :param vector: The vector to serialize, its dtype must be float16, float32 or float64.
+    :return: The bytes to store.
+    """
+    vector = np.ascontiguousarray(vector)
+    if vector.dtype == INT8:
+        raise ValueError("int8 embeddings need a scale, use quantize_embedding")
+    return _pack(vector)
+
+
+def quantize_embedding(vector: np.ndarray, storage: EmbeddingStorage | str) -> bytes:
+    """
+    Serialize a vector in the given storage format.
+    int8 vectors are scaled per vector so that the largest absolute component maps to 127.
+    :param vector: The float vector to serialize.
+    :param storage: The storage format, usually EmbeddingModel.embedding_storage.
+    :return: The bytes to store.
+    """
+    storage = EmbeddingStorage(storage)
+    vector = np.asarray(vector, dtype=np.float32)
+    if storage == EmbeddingStorage.FLOAT16:
+        return _pack(vector.astype(np.float16))
+    if storage == EmbeddingStorage.INT8:
+        max_abs = float(np.max(np.abs(vector), initial=0.0))
+        scale = max_abs / INT8_MAX if max_abs > 0 else 1.0
+        quantized = np.clip(np.rint(vector / scale), -INT8_MAX, INT8_MAX)
+        return _pack(quantized.astype(INT8), scale)
+    return _pack(vector)
+
+
+def _pack(vector: np.ndarray, scale: float = 0.0) -> bytes:
+    vector = np.ascontiguousarray(vector)
+    if vector.ndim != 1:
+        raise ValueError(f"Embedding must be a 1-D vector, got shape {vector.shape}")
+    dtype_code = DTYPE_CODES.get(vector.dtype)
+    if dtype_code is None:
+        raise ValueError(f"Embedding dtype {vector.dtype} is not supported")
+    header = HEADER_STRUCT.pack(
+        HEADER_MAGIC, HEADER_VERSION, dtype_code, 0, vector.shape[0], scale
+    )
+    return header + vector.tobytes()
+
+
+def decode_embedding(
+    value: bytes, legacy_dtype: np.dtype = np.dtype(np.float32)
+) -> np.ndarray:
+    """
+    Build a read-only vector over the stored bytes, without copying them.
+    int8 vectors are the exception, they are dequantized to a new (read-only) float32 vector.
+    Blobs written before the header was introduced are read as raw legacy_dtype data.
+    :param value: The stored bytes.
+    :param legacy_dtype: The dtype of headerless blobs.
+    :return: A read-only 1-D vector.
+    """
+    dtype = _read_header(value)
+    if dtype is None:
+        vector = np.frombuffer(value, dtype=legacy_dtype)
+    else:
+        vector = np.frombuffer(value, dtype=dtype, offset=HEADER_STRUCT.size)
+        if dtype == INT8:
+            scale = HEADER_STRUCT.unpack_from(value)[-1]
+            vector = vector.astype(np.float32) * np.float32(scale)
+            vector.flags.writeable = False
+    if not isinstance(value, bytes):
+        # np.frombuffer on a mutable buffer (bytearray, memoryview) is writable
+        vector.flags.writeable = False
+    return vector
+
+
+def _read_header(value: bytes) -> np.dtype | None:
+    """
+    Return the dtype announced by the header, None for legacy headerless blobs.
+    """
+    if value[:4] != HEADER_MAGIC or len(value) < HEADER_STRUCT.size:
+        return None
+    _, version, dtype_code, _, dimension, _ = HEADER_STRUCT.unpack_from(value)
+    dtype = CODE_DTYPES.get(dtype_code)
+    # A legacy blob starting with the magic bytes would not match the announced size
+    if (
+        version != HEADER_VERSION
+        or dtype is None
+        or len(value) != HEADER_STRUCT.size + dimension * dtype.itemsize
+    ):
+        return None
+    return dtype
+
+
+class EmbeddingArray(types.TypeDecorator):
+    """
+    Store NumPy vectors as a small header (dtype, dimension) followed by the contiguous vector data.
+    Fetched values are read-only NumPy views over the fetched buffer.
+    Raw bytes are stored as is, so existing writers keep working.
+    """
+
+    impl = types.LargeBinary
+    cache_ok = True
+
+    def __init__(self, legacy_dtype: str = "float32", *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.legacy_dtype = np.dtype(legacy_dtype)
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, (bytes, bytearray, memoryview)):
+            return value
+        if not isinstance(value, np.ndarray):
+            value = np.asarray(value, dtype=np.float32)
+        return encode_embedding(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_embedding(value, self.legacy_dtype)
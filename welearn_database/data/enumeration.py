@@ -14,6 +14,14 @@ class Step(Enum):
     DOCUMENT_IS_IRRETRIEVABLE = "document_is_irretrievable"
 
 
+class PipelineStage(StrEnum):
+    SCRAPE = auto()
+    VECTORIZE = auto()
+    CLASSIFY = auto()
+    EXTRACT_KEYWORDS = auto()
+    LOAD_QDRANT = auto()
+
+
 class Counter(Enum):
     HIT = auto()
 
@@ -40,6 +48,19 @@ class ExternalIdType(StrEnum):
     QID = auto()
 
 
+class EmbeddingStorage(StrEnum):
+    FLOAT32 = auto()
+    FLOAT16 = auto()
+    INT8 = auto()
+
+
+class BlobCompression(StrEnum):
+    NONE = auto()
+    ZLIB = auto()
+    LZMA = auto()
+    ZSTD = auto()
+
+
 class FilterType(StrEnum):
     SDG = auto()
     SOURCE = auto()
@@ -2,10 +2,10 @@ from datetime import datetime
 from uuid import UUID
 
 from sqlalchemy import ForeignKey, UniqueConstraint, func, types
-from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.dialects.postgresql import ENUM, TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from welearn_database.data.enumeration import DbSchemaEnum
+from welearn_database.data.enumeration import DbSchemaEnum, EmbeddingStorage
 
 from . import Base
 
@@ -49,6 +49,16 @@ class EmbeddingModel(Base):
     )
     title: Mapped[str]
     lang: Mapped[str]
+    embedding_storage: Mapped[str] = mapped_column(
+        ENUM(
+            *(e.value for e in EmbeddingStorage),
+            name="embedding_storage",
+            schema=schema_name,
+        ),
+        nullable=False,
+        default=EmbeddingStorage.FLOAT32.value,
+        server_default=EmbeddingStorage.FLOAT32.value,
+    )
 
 
 class BiClassifierModel(Base):
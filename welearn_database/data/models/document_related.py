@@ -1,26 +1,34 @@
-import re
 from datetime import datetime
+from itertools import chain
 from typing import Any
-from urllib.parse import urlparse
 from uuid import UUID
-from zlib import adler32
 
+import numpy as np
 from sqlalchemy import (
     ForeignKey,
+    Index,
     Integer,
-    LargeBinary,
     UniqueConstraint,
+    event,
     func,
+    inspect,
     types,
 )
 from sqlalchemy.dialects.postgresql import ARRAY, ENUM, TIMESTAMP
-from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, validates
+from sqlalchemy.orm.attributes import set_committed_value
 
 from welearn_database.data.details_dict import DetailsDict
+from welearn_database.data.embedding_array import (
+    EmbeddingArray,
+    decode_embedding,
+    quantize_embedding,
+)
 from welearn_database.data.enumeration import (
     ContextType,
     Counter,
     DbSchemaEnum,
+    EmbeddingStorage,
     ExternalIdType,
     Step,
 )
@@ -31,9 +39,15 @@ from welearn_database.data.models.corpus_related import (
     EmbeddingModel,
     NClassifierModel,
 )
-from welearn_database.exceptions import ContentIsTooShort, InvalidDOI, InvalidURLScheme
-from welearn_database.modules.text_cleaning import clean_text
-from welearn_database.regular_expression import DOI_VALIDATION_REGEX
+from welearn_database.modules.document_validation import (
+    check_doi,
+    check_url,
+    clean_description,
+    clean_full_content,
+    compute_trace,
+    trusted_values,
+    values_are_trusted,
+)
 
 schema_name = DbSchemaEnum.DOCUMENT_RELATED.value
 
@@ -107,6 +121,21 @@ class WeLearnDocument(Base):
 
     corpus: Mapped["Corpus"] = relationship("Corpus")
 
+    @classmethod
+    def from_trusted_values(cls, **kwargs) -> "WeLearnDocument":
+        """
+        Build a document from values already validated and cleaned upstream, the validators are skipped.
+        trace is computed from full_content, unless it is given.
+        :param kwargs: The document attributes.
+        :return: The new document.
+        """
+        trace = kwargs.pop("trace", None)
+        with trusted_values():
+            document = cls(**kwargs)
+        if trace is not None:
+            document.trace = trace
+        return document
+
     @validates("url")
     def validate_url(self, key, value):
         """
@@ -116,11 +145,9 @@ class WeLearnDocument(Base):
         :return:  The validated URL if it is valid.
         :raises InvalidURLScheme: If the URL scheme is not accepted or the URL is malformed
         """
-        parsed_url = urlparse(url=value)
-        accepted_scheme = ["https"]
-        if parsed_url.scheme not in accepted_scheme or len(parsed_url.netloc) == 0:
-            raise InvalidURLScheme("There is an error on the URL form : %s", value)
-        return value
+        if values_are_trusted():
+            return value
+        return check_url(value)
 
     @validates("full_content")
     def validate_full_content(self, key, value):
@@ -131,15 +158,10 @@ class WeLearnDocument(Base):
         :return:  The validated full content if it meets the length requirement.
         :raises ValueError: If the full content is too short.
         """
-        if not value:
-            self.trace = None
+        if values_are_trusted():
+            self.trace = compute_trace(value)
             return value
-        cleaned = clean_text(value)
-        if len(value) < 25:
-            raise ContentIsTooShort(f"Content is too short : {len(value)}")
-
-        # Hash compute and db storage
-        self.trace = adler32(cleaned.encode("utf-8"))
+        cleaned, self.trace = clean_full_content(value)
         return cleaned
 
     @validates("description")
@@ -150,19 +172,16 @@ class WeLearnDocument(Base):
         :param value: The value of the description to validate.
         :return: The cleaned description text. If the value is None or empty, it returns the value as is.
         """
-        if not value:
+        if values_are_trusted():
             return value
-        return clean_text(value)
+        return clean_description(value)
 
     @validates("doi")
     def validate_doi(self, key, value):
         """"""
-        if not value:
+        if values_are_trusted():
             return value
-
-        if not re.match(DOI_VALIDATION_REGEX, value):
-            raise InvalidDOI(f"DOI is not valid : {value}")
-        return value
+        return check_doi(value)
 
 
 class ProcessState(Base):
@@ -177,7 +196,10 @@ class ProcessState(Base):
     """
 
     __tablename__ = "process_state"
-    __table_args__ = {"schema": schema_name}
+    __table_args__ = (
+        Index("process_state_document_id_idx", "document_id"),
+        {"schema": schema_name},
+    )
 
     id: Mapped[UUID] = mapped_column(
         types.Uuid, primary_key=True, nullable=False, server_default=GEN_RANDOM_UUID
@@ -209,6 +231,92 @@ class ProcessState(Base):
     document: Mapped["WeLearnDocument"] = relationship()
 
 
+class DocumentLatestState(Base):
+    """
+    This class represents the latest process state of each document.
+    The table is kept current by a trigger on process_state, see backfill_document_latest_state to rebuild it.
+    :cvar document_id: The identifier of the document.
+    :cvar process_state_id: The identifier of the latest ProcessState of the document.
+    :cvar title: The latest processing step, represented as an enumeration.
+    :cvar operation_order: The operation order of the latest ProcessState.
+    :cvar created_at: The timestamp when the latest ProcessState was created.
+    :cvar document: The relationship to the WeLearnDocument object.
+    """
+
+    __tablename__ = "document_latest_state"
+    __table_args__ = (
+        Index(
+            "document_latest_state_title_operation_order_idx",
+            "title",
+            "operation_order",
+        ),
+        {"schema": schema_name},
+    )
+
+    document_id: Mapped[UUID] = mapped_column(
+        types.Uuid,
+        ForeignKey(
+            f"{DbSchemaEnum.DOCUMENT_RELATED.value}.welearn_document.id",
+            name="document_latest_state_document_id_fkey",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+        nullable=False,
+    )
+    process_state_id: Mapped[UUID] = mapped_column(types.Uuid, nullable=False)
+    title: Mapped[str] = mapped_column(
+        ENUM(*(e.value.lower() for e in Step), name="step", schema="document_related"),
+        nullable=False,
+    )
+    operation_order: Mapped[int] = mapped_column(types.BIGINT, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+    )
+    document: Mapped["WeLearnDocument"] = relationship()
+
+
+class DocumentClaim(Base):
+    """
+    This class represents the lease taken by a pipeline worker on a document, see the work_queue module.
+    :cvar document_id: The identifier of the claimed document.
+    :cvar step: The step the document was in when it was claimed.
+    :cvar worker_id: The identifier of the worker holding the lease.
+    :cvar claimed_at: The timestamp when the lease was taken.
+    :cvar lease_expires_at: The timestamp after which another worker can claim the document.
+    """
+
+    __tablename__ = "document_claim"
+    __table_args__ = (
+        Index("document_claim_worker_id_idx", "worker_id"),
+        {"schema": schema_name},
+    )
+
+    document_id: Mapped[UUID] = mapped_column(
+        types.Uuid,
+        ForeignKey(
+            f"{DbSchemaEnum.DOCUMENT_RELATED.value}.welearn_document.id",
+            name="document_claim_document_id_fkey",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+        nullable=False,
+    )
+    step: Mapped[str] = mapped_column(
+        ENUM(*(e.value.lower() for e in Step), name="step", schema="document_related"),
+        nullable=False,
+    )
+    worker_id: Mapped[str] = mapped_column(nullable=False)
+    claimed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+    )
+    lease_expires_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+    )
+
+
 class Keyword(Base):
     __tablename__ = "keyword"
     __table_args__ = (
@@ -331,7 +439,15 @@ class ErrorDataQuality(Base):
 
 class DocumentSlice(Base):
     __tablename__ = "document_slice"
-    __table_args__ = {"schema": schema_name}
+    __table_args__ = (
+        Index("document_slice_document_id_idx", "document_id"),
+        Index(
+            "document_slice_embedding_model_id_updated_at_idx",
+            "embedding_model_id",
+            "updated_at",
+        ),
+        {"schema": schema_name},
+    )
 
     id: Mapped[UUID] = mapped_column(
         types.Uuid, primary_key=True, nullable=False, server_default=GEN_RANDOM_UUID
@@ -344,7 +460,7 @@ class DocumentSlice(Base):
         ),
         nullable=False,
     )
-    embedding: Mapped[bytes | None] = mapped_column(LargeBinary)
+    embedding: Mapped[np.ndarray | None] = mapped_column(EmbeddingArray)
     body: Mapped[str | None]
     order_sequence: Mapped[int]
     embedding_model_name: Mapped[str]
@@ -354,11 +470,63 @@ class DocumentSlice(Base):
         ForeignKey(f"{DbSchemaEnum.CORPUS_RELATED.value}.embedding_model.id"),
         nullable=False,
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+        default=func.localtimestamp(),
+        server_default=NOW,
+        onupdate=func.localtimestamp(),
+    )
 
     document: Mapped["WeLearnDocument"] = relationship()
     embedding_model: Mapped["EmbeddingModel"] = relationship()
 
 
+_QUANTIZED_SLICES_KEY = "welearn_database.quantized_slices"
+
+
+@event.listens_for(Session, "before_flush")
+def _store_slice_embeddings(session: Session, flush_context, instances) -> None:
+    """
+    Write the new or changed embeddings of DocumentSlice in the storage format of their embedding model.
+    Vectors given as bytes are considered already encoded and are stored as is.
+    The encoded instances are kept in session.info for _restore_slice_embeddings.
+    """
+    quantized = session.info[_QUANTIZED_SLICES_KEY] = []
+    for obj in chain(session.new, session.dirty):
+        if not isinstance(obj, DocumentSlice) or not isinstance(
+            obj.embedding, np.ndarray
+        ):
+            continue
+        if (
+            obj not in session.new
+            and not inspect(obj).attrs.embedding.history.has_changes()
+        ):
+            continue
+        embedding_model = obj.embedding_model or session.get(
+            EmbeddingModel, obj.embedding_model_id
+        )
+        if embedding_model is None:
+            continue
+        storage = EmbeddingStorage(
+            embedding_model.embedding_storage or EmbeddingStorage.FLOAT32
+        )
+        if storage != EmbeddingStorage.FLOAT32:
+            obj.embedding = quantize_embedding(obj.embedding, storage)
+            quantized.append(obj)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _restore_slice_embeddings(session: Session, flush_context) -> None:
+    """
+    Put back on the instances encoded by _store_slice_embeddings the vector as it is stored,
+    so reading DocumentSlice.embedding after a flush gives an array and not the encoded bytes.
+    """
+    for obj in session.info.pop(_QUANTIZED_SLICES_KEY, []):
+        if isinstance(obj.embedding, bytes):
+            set_committed_value(obj, "embedding", decode_embedding(obj.embedding))
+
+
 class AnalyticCounter(Base):
     __tablename__ = "analytic_counter"
     __table_args__ = {"schema": schema_name}
@@ -394,7 +562,10 @@ class AnalyticCounter(Base):
 
 class Sdg(Base):
     __tablename__ = "sdg"
-    __table_args__ = {"schema": schema_name}
+    __table_args__ = (
+        Index("sdg_slice_id_idx", "slice_id"),
+        {"schema": schema_name},
+    )
 
     id: Mapped[UUID] = mapped_column(
         types.Uuid,
@@ -454,7 +625,7 @@ class ContextDocument(Base):
         default=func.localtimestamp(),
         server_default=NOW,
     )
-    embedding: Mapped[bytes] = mapped_column(LargeBinary)
+    embedding: Mapped[np.ndarray] = mapped_column(EmbeddingArray)
 
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=False),
@@ -538,6 +709,40 @@ class HistoricalQtyDocumentInQdrant(Base):
     )
 
 
+class MaterializedViewRefresh(Base):
+    """
+    This class represents one refresh of a materialized view, see the materialized_views module.
+    :cvar view_name: The schema qualified name of the refreshed view.
+    :cvar refreshed_at: The timestamp when the refresh started.
+    :cvar duration_seconds: How long the refresh took.
+    :cvar concurrently: Whether readers were kept unblocked (REFRESH ... CONCURRENTLY).
+    """
+
+    __tablename__ = "materialized_view_refresh"
+    __table_args__ = (
+        Index(
+            "materialized_view_refresh_view_name_refreshed_at_idx",
+            "view_name",
+            "refreshed_at",
+        ),
+        {"schema": schema_name},
+    )
+
+    id = mapped_column(
+        types.Uuid,
+        primary_key=True,
+        server_default=GEN_RANDOM_UUID,
+        nullable=False,
+    )
+    view_name: Mapped[str] = mapped_column(nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+    )
+    duration_seconds: Mapped[float] = mapped_column(types.Float, nullable=False)
+    concurrently: Mapped[bool] = mapped_column(nullable=False)
+
+
 # Views
 class QtyDocumentInQdrant(Base):
     __tablename__ = "qty_document_in_qdrant"
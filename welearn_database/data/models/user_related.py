@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, func, types
+from sqlalchemy import ForeignKey, Index, func, types
 from sqlalchemy.dialects.postgresql import ENUM, TIMESTAMP
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -80,7 +80,10 @@ class Bookmark(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_message"
-    __table_args__ = {"schema": DbSchemaEnum.USER_RELATED.value}
+    __table_args__ = (
+        Index("chat_message_inferred_user_id_idx", "inferred_user_id"),
+        {"schema": DbSchemaEnum.USER_RELATED.value},
+    )
 
     id: Mapped[UUID] = mapped_column(
         types.Uuid, primary_key=True, nullable=False, server_default="gen_random_uuid()"
@@ -119,7 +122,10 @@ class ChatMessage(Base):
 
 class ReturnedDocument(Base):
     __tablename__ = "returned_document"
-    __table_args__ = {"schema": DbSchemaEnum.USER_RELATED.value}
+    __table_args__ = (
+        Index("returned_document_message_id_idx", "message_id"),
+        {"schema": DbSchemaEnum.USER_RELATED.value},
+    )
 
     id: Mapped[UUID] = mapped_column(
         types.Uuid, primary_key=True, nullable=False, server_default="gen_random_uuid()"
@@ -227,8 +233,13 @@ class InferredUser(Base):
 
 
 class EndpointRequest(Base):
+    # Range-partitioned by month on created_at in PostgreSQL, where the primary key is (id, created_at);
+    # the random id still identifies the rows for the ORM. See modules.partitions.
     __tablename__ = "endpoint_request"
-    __table_args__ = {"schema": "user_related"}
+    __table_args__ = (
+        Index("endpoint_request_session_id_idx", "session_id"),
+        {"schema": "user_related"},
+    )
     id: Mapped[UUID] = mapped_column(
         types.Uuid, primary_key=True, nullable=False, server_default="gen_random_uuid()"
     )
@@ -249,6 +260,81 @@ class EndpointRequest(Base):
     session = relationship("Session", foreign_keys=[session_id])
 
 
+class EndpointFeature(Base):
+    """
+    Maps an API endpoint to the product feature it belongs to.
+    :cvar endpoint_name: The endpoint as logged in endpoint_request.
+    :cvar feature_name: The feature reported in the dashboards, e.g. 'search' or 'chat'.
+    """
+
+    __tablename__ = "endpoint_feature"
+    __table_args__ = {"schema": schema_name}
+
+    endpoint_name: Mapped[str] = mapped_column(primary_key=True)
+    feature_name: Mapped[str] = mapped_column(nullable=False)
+
+
+class SessionFeatureUsage(Base):
+    """
+    Rollup of endpoint_request: how many times each feature was used in a session.
+    Every session with a request has one row per feature, with a count of 0 for the unused ones.
+    Maintained incrementally by modules.feature_usage.
+    :cvar session_id: The session.
+    :cvar feature_name: The feature, from endpoint_feature.
+    :cvar inferred_user_id: The user of the session, copied from session.
+    :cvar session_created_at: The creation date of the session, copied from session.
+    :cvar cnt: Number of requests to the endpoints of the feature.
+    :cvar updated_at: Last time the count was updated.
+    """
+
+    __tablename__ = "session_feature_usage"
+    __table_args__ = (
+        Index("session_feature_usage_session_created_at_idx", "session_created_at"),
+        {"schema": schema_name},
+    )
+
+    session_id: Mapped[UUID] = mapped_column(
+        types.Uuid,
+        ForeignKey("user_related.session.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    feature_name: Mapped[str] = mapped_column(primary_key=True)
+    inferred_user_id: Mapped[UUID] = mapped_column(types.Uuid, nullable=False)
+    session_created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False), nullable=False
+    )
+    cnt: Mapped[int] = mapped_column(types.BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+        default=func.localtimestamp(),
+        server_default="NOW()",
+    )
+
+
+class RollupWatermark(Base):
+    """
+    Progress of an incremental rollup over an append-only table.
+    :cvar name: The name of the rollup.
+    :cvar watermark: Rows created up to this timestamp are already rolled up.
+    :cvar updated_at: Last time the rollup ran.
+    """
+
+    __tablename__ = "rollup_watermark"
+    __table_args__ = {"schema": schema_name}
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=False),
+        nullable=False,
+        default=func.localtimestamp(),
+        server_default="NOW()",
+    )
+
+
 class FilterUsedInQuery(Base):
     __tablename__ = "filter_used_in_query"
     __table_args__ = {"schema": DbSchemaEnum.USER_RELATED.value}
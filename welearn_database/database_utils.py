@@ -1,26 +1,139 @@
 import logging
 import os
+from threading import Lock
 
-from sqlalchemy import URL, create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import URL, Engine, Table, create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
 
 logger = logging.getLogger(__name__)
 
+# Sync drivers are swapped for their asyncio counterpart, other drivers are used as is
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
 
-def create_db_session():
-    engine = create_sqlalchemy_engine()
-    session_made = sessionmaker(engine)
+_engines: dict[tuple, Engine] = {}
+_session_makers: dict[tuple, sessionmaker] = {}
+_async_engines: dict[tuple, AsyncEngine] = {}
+_async_session_makers: dict[tuple, async_sessionmaker] = {}
+_registry_lock = Lock()
+
+
+def create_db_session() -> Session:
+    """
+    Create a session bound to the process-wide engine.
+    The engine and its connection pool are shared between every session created here.
+    :return: A new session.
+    """
+    key = _registry_key(_create_url(), _get_engine_options())
+    with _registry_lock:
+        session_made = _session_makers.get(key)
+        if session_made is None:
+            session_made = sessionmaker(_get_or_create_engine(key))
+            _session_makers[key] = session_made
+    return session_made()
+
+
+def create_sqlalchemy_engine() -> Engine:
+    """
+    Return the engine matching the current PG_* environment variables.
+    Engines are cached by URL and pool options, so repeated calls reuse the same pool.
+    :return: The shared engine.
+    """
+    key = _registry_key(_create_url(), _get_engine_options())
+    with _registry_lock:
+        return _get_or_create_engine(key)
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    Dispose every cached engine and forget the registered session makers.
+    Forked worker processes must call it with close=False before their first use of the database: the pooled
+    connections inherited from the parent are then dropped without being closed, as closing them would also
+    end them for the parent.
+    :param close: Close the pooled connections, False in a forked child.
+    """
+    with _registry_lock:
+        for engine in _engines.values():
+            engine.dispose(close=close)
+        _engines.clear()
+        _session_makers.clear()
+
+
+def create_async_db_session() -> AsyncSession:
+    """
+    Create an AsyncSession bound to the process-wide async engine.
+    Objects are not expired on commit, so their attributes can be read without awaiting a refresh.
+    :return: A new async session.
+    """
+    key = _registry_key(_create_url(is_async=True), _get_engine_options())
+    with _registry_lock:
+        session_made = _async_session_makers.get(key)
+        if session_made is None:
+            session_made = async_sessionmaker(
+                _get_or_create_async_engine(key), expire_on_commit=False
+            )
+            _async_session_makers[key] = session_made
     return session_made()
 
 
-def create_sqlalchemy_engine():
+def create_async_sqlalchemy_engine() -> AsyncEngine:
+    """
+    Return the async engine matching the current PG_* environment variables.
+    PG_DRIVER is mapped to its asyncio driver (e.g. postgresql+psycopg2 -> postgresql+asyncpg),
+    an already async driver such as postgresql+psycopg is kept.
+    :return: The shared async engine.
+    """
+    key = _registry_key(_create_url(is_async=True), _get_engine_options())
+    with _registry_lock:
+        return _get_or_create_async_engine(key)
+
+
+async def dispose_async_engines(close: bool = True) -> None:
+    """
+    Dispose every cached async engine and forget the registered async session makers.
+    :param close: Close the pooled connections, False in a forked child, see dispose_engines.
+    """
+    with _registry_lock:
+        engines = list(_async_engines.values())
+        _async_engines.clear()
+        _async_session_makers.clear()
+    for engine in engines:
+        await engine.dispose(close=close)
+
+
+def dialect_insert(session: Session, table: Table):
+    """
+    Build an INSERT supporting ON CONFLICT for the session backend (PostgreSQL, or SQLite for tests).
+    :param session: The session the statement will be executed with.
+    :param table: The table to insert into.
+    :return: A dialect specific Insert construct.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def _create_url(is_async: bool = False) -> URL:
     pg_driver = os.getenv("PG_DRIVER", "postgresql+psycopg2")
+    if is_async:
+        pg_driver = ASYNC_DRIVERS.get(pg_driver, pg_driver)
     pg_user = os.getenv("PG_USER")
     pg_password = os.getenv("PG_PASSWORD")
     pg_host = os.getenv("PG_HOST")
     pg_port = os.getenv("PG_PORT")
     pg_db = os.getenv("PG_DB")
-    url_object = URL.create(
+    return URL.create(
         drivername=pg_driver,
         username=pg_user,
         password=pg_password,
@@ -28,5 +141,49 @@ def create_sqlalchemy_engine():
         port=pg_port,
         database=pg_db,
     )
-    engine = create_engine(url_object)
+
+
+def _get_engine_options() -> dict:
+    """
+    Read the pool options from the environment.
+    pool_size and max_overflow are only forwarded when set, as some pools (e.g. SQLite in memory) refuse them.
+    :return: Keyword arguments for create_engine
+    """
+    options: dict = {
+        "pool_pre_ping": os.getenv("PG_POOL_PRE_PING", "false").lower()
+        in ("1", "true", "yes"),
+        "pool_recycle": int(os.getenv("PG_POOL_RECYCLE", "-1")),
+    }
+    pool_size = os.getenv("PG_POOL_SIZE")
+    if pool_size:
+        options["pool_size"] = int(pool_size)
+    max_overflow = os.getenv("PG_MAX_OVERFLOW")
+    if max_overflow:
+        options["max_overflow"] = int(max_overflow)
+    return options
+
+
+def _registry_key(url: URL, options: dict) -> tuple:
+    return url.render_as_string(hide_password=False), tuple(sorted(options.items()))
+
+
+def _get_or_create_engine(key: tuple) -> Engine:
+    # Caller must hold _registry_lock
+    engine = _engines.get(key)
+    if engine is None:
+        url, options = key
+        logger.info("Creating a new SQLAlchemy engine with options %s", options)
+        engine = create_engine(url, **dict(options))
+        _engines[key] = engine
+    return engine
+
+
+def _get_or_create_async_engine(key: tuple) -> AsyncEngine:
+    # Caller must hold _registry_lock
+    engine = _async_engines.get(key)
+    if engine is None:
+        url, options = key
+        logger.info("Creating a new async SQLAlchemy engine with options %s", options)
+        engine = create_async_engine(url, **dict(options))
+        _async_engines[key] = engine
     return engine
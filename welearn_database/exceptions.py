@@ -35,6 +35,15 @@ class ContentIsTooShort(WeLearnDatabaseException):
         super().__init__(msg, *args)
 
 
+class MissingRequiredField(WeLearnDatabaseException):
+    """
+    A field required to store the document is missing or None
+    """
+
+    def __init__(self, msg="A required field is missing", *args):
+        super().__init__(msg, *args)
+
+
 class EarlyEnumerationVerificationError(WeLearnDatabaseException):
     """
     SQLAlchemy detect an enumeration value that is not in the list of accepted values
@@ -44,3 +53,12 @@ class EarlyEnumerationVerificationError(WeLearnDatabaseException):
         self, msg="Enumeration value is not in the list of accepted values", *args
     ):
         super().__init__(msg, *args)
+
+
+class InvalidStepTransition(WeLearnDatabaseException):
+    """
+    A document is moved to a step that cannot follow its current step
+    """
+
+    def __init__(self, msg="Step transition is not allowed", *args):
+        super().__init__(msg, *args)
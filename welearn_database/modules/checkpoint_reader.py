@@ -0,0 +1,334 @@
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Iterable
+
+from sqlalchemy import Select, String, and_, cast, func, select, true
+from sqlalchemy.orm import Session
+
+from welearn_database.data.models.agent_related import CheckpointBlobs, Checkpoints
+from welearn_database.modules.checkpoint_storage import channel_versions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 1024
+
+CheckpointKey = tuple[str, str, str]
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a checkpoint cache.
+    :cvar hits: Lookups answered from the cache.
+    :cvar misses: Lookups loaded from the database.
+    :cvar evictions: Entries dropped to stay under the maximum size.
+    :cvar invalidations: Entries dropped because their thread was written.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+@dataclass(frozen=True)
+class CheckpointSnapshot:
+    """
+    A checkpoint with the blobs of its channels. Instances are shared by the cache and must not be modified.
+    :cvar thread_id: The thread of the checkpoint.
+    :cvar checkpoint_ns: The namespace of the checkpoint.
+    :cvar checkpoint_id: The checkpoint id.
+    :cvar parent_checkpoint_id: The previous checkpoint of the thread, None for the first one.
+    :cvar type_: The serialization type of the checkpoint.
+    :cvar checkpoint: The checkpoint document.
+    :cvar metadata: The checkpoint metadata.
+    :cvar blobs: The (type, blob) of each channel listed in channel_versions, by channel name.
+    """
+
+    thread_id: str
+    checkpoint_ns: str
+    checkpoint_id: str
+    parent_checkpoint_id: str | None
+    type_: str | None
+    checkpoint: dict[str, Any]
+    metadata: dict[str, Any]
+    blobs: dict[str, tuple[str, bytes | None]] = field(default_factory=dict)
+
+    @property
+    def key(self) -> CheckpointKey:
+        return self.thread_id, self.checkpoint_ns, self.checkpoint_id
+
+
+class CheckpointReader:
+    """
+    Read-through cache of checkpoints and their blobs, bounded to max_size entries evicted in LRU order.
+    Entries are keyed by (thread_id, checkpoint_ns, checkpoint_id). The id of the latest checkpoint of a thread is
+    always read from the database, so checkpoints written by other processes are seen; get_latest reads it in the
+    same query as the checkpoint and its blobs, which are only returned when they are not cached already.
+    Writers of this process call invalidate for the threads they write, as a checkpoint or a blob can be rewritten
+    under the same key. The reader can be shared between threads.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param max_size: Maximum number of cached checkpoints.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._max_size = max_size
+        self._entries: OrderedDict[CheckpointKey, CheckpointSnapshot] = OrderedDict()
+        # The cached checkpoint ids of each (thread_id, checkpoint_ns)
+        self._threads: dict[tuple[str, str], set[str]] = {}
+        self._lock = Lock()
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_latest(
+        self, session: Session, thread_id: str, checkpoint_ns: str = ""
+    ) -> CheckpointSnapshot | None:
+        """
+        Return the latest checkpoint of a thread with its blobs, in a single query whether it is cached or not.
+        :param session: The session used to reach the database.
+        :param thread_id: The thread of the checkpoint.
+        :param checkpoint_ns: The namespace of the checkpoint.
+        :return: The checkpoint, None when the thread has none.
+        """
+        with self._lock:
+            cached_ids = list(self._threads.get((thread_id, checkpoint_ns), ()))
+        checkpoint_id, snapshot = load_latest_checkpoint(
+            session, thread_id, checkpoint_ns, cached_ids
+        )
+        if checkpoint_id is None:
+            return None
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        if snapshot is None:
+            with self._lock:
+                snapshot = self._entries.get(key)
+                if snapshot is not None:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return snapshot
+            # Dropped by another thread since the query, loaded again
+            return self.get(session, thread_id, checkpoint_ns, checkpoint_id)
+        with self._lock:
+            self.stats.misses += 1
+            self._add(key, snapshot)
+        return snapshot
+
+    def get(
+        self,
+        session: Session,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+    ) -> CheckpointSnapshot | None:
+        """
+        Return a checkpoint with its blobs, from the cache when present.
+        :param session: The session used to reach the database.
+        :param thread_id: The thread of the checkpoint.
+        :param checkpoint_ns: The namespace of the checkpoint.
+        :param checkpoint_id: The checkpoint id.
+        :return: The checkpoint, None when it does not exist.
+        """
+        key = (thread_id, checkpoint_ns, checkpoint_id)
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return snapshot
+            self.stats.misses += 1
+
+        snapshot = load_checkpoint(session, thread_id, checkpoint_ns, checkpoint_id)
+        if snapshot is not None:
+            with self._lock:
+                self._add(key, snapshot)
+        return snapshot
+
+    def invalidate(
+        self,
+        thread_id: str,
+        checkpoint_ns: str = "",
+        checkpoint_id: str | None = None,
+    ) -> int:
+        """
+        Drop the cached checkpoints of a thread, to call when the thread is written.
+        :param thread_id: The written thread.
+        :param checkpoint_ns: The written namespace.
+        :param checkpoint_id: Drop only this checkpoint, every checkpoint of the thread when None (blob writes).
+        :return: The number of dropped entries.
+        """
+        with self._lock:
+            if checkpoint_id is not None:
+                checkpoint_ids = [checkpoint_id]
+            else:
+                checkpoint_ids = list(self._threads.get((thread_id, checkpoint_ns), ()))
+            dropped = sum(
+                self._drop((thread_id, checkpoint_ns, checkpoint_id))
+                for checkpoint_id in checkpoint_ids
+            )
+            self.stats.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        """
+        Drop every cached checkpoint.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._threads.clear()
+
+    def _add(self, key: CheckpointKey, snapshot: CheckpointSnapshot) -> None:
+        # Caller must hold _lock
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        self._threads.setdefault(key[:2], set()).add(key[2])
+        while len(self._entries) > self._max_size:
+            self._drop(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _drop(self, key: CheckpointKey) -> bool:
+        # Caller must hold _lock
+        if self._entries.pop(key, None) is None:
+            return False
+        checkpoint_ids = self._threads[key[:2]]
+        checkpoint_ids.discard(key[2])
+        if not checkpoint_ids:
+            del self._threads[key[:2]]
+        return True
+
+
+def load_checkpoint(
+    session: Session,
+    thread_id: str,
+    checkpoint_ns: str,
+    checkpoint_id: str,
+) -> CheckpointSnapshot | None:
+    """
+    Load a checkpoint and the blobs of its channel_versions in a single query.
+    :param session: The session used to reach the database.
+    :param thread_id: The thread of the checkpoint.
+    :param checkpoint_ns: The namespace of the checkpoint.
+    :param checkpoint_id: The checkpoint id.
+    :return: The checkpoint, None when it does not exist.
+    """
+    checkpoints = Checkpoints.__table__
+    query = _with_blobs(
+        session, select(*_checkpoint_columns()).select_from(checkpoints)
+    ).where(
+        checkpoints.c.thread_id == thread_id,
+        checkpoints.c.checkpoint_ns == checkpoint_ns,
+        checkpoints.c.checkpoint_id == checkpoint_id,
+    )
+    rows = session.execute(query).all()
+    if not rows:
+        return None
+    return _snapshot(thread_id, checkpoint_ns, checkpoint_id, rows)
+
+
+def load_latest_checkpoint(
+    session: Session,
+    thread_id: str,
+    checkpoint_ns: str,
+    skipped_ids: Iterable[str] = (),
+) -> tuple[str | None, CheckpointSnapshot | None]:
+    """
+    Find the latest checkpoint of a thread and load it with its blobs in a single query, unless it is skipped.
+    :param session: The session used to reach the database.
+    :param thread_id: The thread of the checkpoint.
+    :param checkpoint_ns: The namespace of the checkpoint.
+    :param skipped_ids: Checkpoint ids not to load, e.g. the ones already cached.
+    :return: The latest checkpoint id, None when the thread has none, and the checkpoint, None when skipped.
+    """
+    checkpoints = Checkpoints.__table__
+    latest = (
+        select(func.max(checkpoints.c.checkpoint_id).label("checkpoint_id"))
+        .where(
+            checkpoints.c.thread_id == thread_id,
+            checkpoints.c.checkpoint_ns == checkpoint_ns,
+        )
+        .subquery("latest")
+    )
+    # Always one row for the latest id, the checkpoint columns are NULL when it is skipped
+    query = _with_blobs(
+        session,
+        select(
+            latest.c.checkpoint_id.label("latest_id"),
+            checkpoints.c.checkpoint_id.label("loaded_id"),
+            *_checkpoint_columns(),
+        )
+        .select_from(latest)
+        .outerjoin(
+            checkpoints,
+            and_(
+                checkpoints.c.thread_id == thread_id,
+                checkpoints.c.checkpoint_ns == checkpoint_ns,
+                checkpoints.c.checkpoint_id == latest.c.checkpoint_id,
+                checkpoints.c.checkpoint_id.not_in(list(skipped_ids)),
+            ),
+        ),
+    )
+    rows = session.execute(query).all()
+    checkpoint_id = rows[0].latest_id
+    if rows[0].loaded_id is None:
+        return checkpoint_id, None
+    return checkpoint_id, _snapshot(thread_id, checkpoint_ns, checkpoint_id, rows)
+
+
+def _checkpoint_columns() -> list:
+    checkpoints = Checkpoints.__table__
+    return [
+        checkpoints.c.parent_checkpoint_id,
+        checkpoints.c.type,
+        checkpoints.c.checkpoint,
+        checkpoints.c.metadata,
+    ]
+
+
+def _with_blobs(session: Session, query: Select) -> Select:
+    # One row per channel, the checkpoint columns are repeated on each of them;
+    # outer joins keep checkpoints without channels and channels without a stored blob
+    checkpoints = Checkpoints.__table__
+    blobs = CheckpointBlobs.__table__
+    versions = channel_versions(session)
+    return (
+        query.add_columns(
+            blobs.c.channel,
+            blobs.c.type.label("blob_type"),
+            blobs.c.blob,
+        )
+        .outerjoin(versions, true())
+        .outerjoin(
+            blobs,
+            and_(
+                blobs.c.thread_id == checkpoints.c.thread_id,
+                blobs.c.checkpoint_ns == checkpoints.c.checkpoint_ns,
+                blobs.c.channel == versions.c.key,
+                blobs.c.version == cast(versions.c.value, String),
+            ),
+        )
+    )
+
+
+def _snapshot(
+    thread_id: str, checkpoint_ns: str, checkpoint_id: str, rows: list
+) -> CheckpointSnapshot:
+    first = rows[0]
+    return CheckpointSnapshot(
+        thread_id=thread_id,
+        checkpoint_ns=checkpoint_ns,
+        checkpoint_id=checkpoint_id,
+        parent_checkpoint_id=first.parent_checkpoint_id,
+        type_=first.type,
+        checkpoint=first.checkpoint,
+        metadata=first.metadata,
+        blobs={
+            row.channel: (row.blob_type, row.blob)
+            for row in rows
+            if row.channel is not None
+        },
+    )
@@ -0,0 +1,226 @@
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import (
+    String,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    true,
+    tuple_,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import TableValuedAlias
+
+from welearn_database.data.models.agent_related import (
+    CheckpointBlobs,
+    Checkpoints,
+    CheckpointWrites,
+)
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_NAMESPACE = "welearn_database.checkpoint_prune"
+DEFAULT_KEEP_LAST = 10
+
+
+@dataclass
+class PruneResult:
+    """
+    Rows deleted by a checkpoint pruning run.
+    :cvar threads: Number of (thread_id, checkpoint_ns) pruned.
+    :cvar checkpoints: Deleted checkpoints.
+    :cvar writes: Deleted checkpoint writes.
+    :cvar blobs: Deleted checkpoint blobs.
+    """
+
+    threads: int = 0
+    checkpoints: int = 0
+    writes: int = 0
+    blobs: int = 0
+
+
+def channel_versions(session: Session) -> TableValuedAlias:
+    """
+    Return the (key, value) rows of the channel_versions of a checkpoint, e.g. {"messages": "00002.0.42"},
+    to join with Checkpoints: a checkpoint refers to the blob of each channel at the listed version.
+    :param session: The session used to reach the database, its dialect picks the JSON function.
+    :return: A table valued function with key and value columns.
+    """
+    checkpoints = Checkpoints.__table__
+    if session.get_bind().dialect.name == "postgresql":
+        return func.jsonb_each_text(
+            checkpoints.c.checkpoint["channel_versions"]
+        ).table_valued("key", "value")
+    return func.json_each(checkpoints.c.checkpoint, "$.channel_versions").table_valued(
+        "key", "value"
+    )
+
+
+def thread_lock_key(thread_id, checkpoint_ns) -> ColumnElement:
+    """
+    Return the key of the transaction-level advisory lock of a (thread_id, checkpoint_ns) on PostgreSQL,
+    taken by prune_checkpoints and by the checkpoint writers so that a thread is never pruned while written.
+    :param thread_id: The thread, a column or a bound value.
+    :param checkpoint_ns: The namespace, a column or a bound value.
+    :return: The lock key expression.
+    """
+    return func.hashtext(
+        literal(ADVISORY_LOCK_NAMESPACE + ":") + thread_id + ":" + checkpoint_ns
+    )
+
+
+def prune_checkpoints(
+    session: Session,
+    keep_last: int = DEFAULT_KEEP_LAST,
+    batch_size: int = 100,
+) -> PruneResult:
+    """
+    Keep only the last keep_last checkpoints of every (thread_id, checkpoint_ns), following the
+    parent_checkpoint_id chain back from the latest checkpoint; forks off that chain are deleted too.
+    The writes of deleted checkpoints and the blobs no remaining checkpoint refers to are deleted with them.
+    Threads are pruned batch by batch, each batch in its own committed transaction, so the job can be
+    interrupted and resumed. On PostgreSQL, each thread of a batch is locked with a transaction-level
+    advisory lock (see thread_lock_key) and threads locked by another node or by a writer are skipped, so
+    several nodes can prune at once and a step is never written to a thread while it is pruned.
+    :param session: The session used to reach the database.
+    :param keep_last: Number of checkpoints kept per thread, at least 1.
+    :param batch_size: Number of threads pruned per transaction.
+    :return: The number of pruned threads and deleted rows.
+    """
+    if keep_last < 1:
+        raise ValueError("keep_last must be at least 1")
+    checkpoints = Checkpoints.__table__
+    thread_key = tuple_(checkpoints.c.thread_id, checkpoints.c.checkpoint_ns)
+
+    result = PruneResult()
+    last_key = None
+    while True:
+        candidates = (
+            select(checkpoints.c.thread_id, checkpoints.c.checkpoint_ns)
+            .group_by(checkpoints.c.thread_id, checkpoints.c.checkpoint_ns)
+            .having(func.count() > keep_last)
+            .order_by(checkpoints.c.thread_id, checkpoints.c.checkpoint_ns)
+            .limit(batch_size)
+        )
+        if last_key is not None:
+            candidates = candidates.where(thread_key > tuple_(*last_key))
+        candidates = candidates.subquery()
+        locked = literal(True)
+        if session.get_bind().dialect.name == "postgresql":
+            locked = func.pg_try_advisory_xact_lock(
+                thread_lock_key(candidates.c.thread_id, candidates.c.checkpoint_ns)
+            )
+        rows = session.execute(
+            select(candidates.c.thread_id, candidates.c.checkpoint_ns, locked)
+        ).all()
+        if not rows:
+            session.commit()
+            break
+        last_key = max((thread_id, ns) for thread_id, ns, _ in rows)
+        # Threads locked by another node or being written are left for later
+        threads = [(thread_id, ns) for thread_id, ns, is_locked in rows if is_locked]
+        if threads:
+            _prune_threads(session, threads, keep_last, result)
+        session.commit()
+        logger.info(
+            "%s checkpoint threads pruned, %s checkpoints, %s writes and %s blobs deleted",
+            result.threads,
+            result.checkpoints,
+            result.writes,
+            result.blobs,
+        )
+    return result
+
+
+def _prune_threads(
+    session: Session, threads: list[tuple], keep_last: int, result: PruneResult
+) -> None:
+    checkpoints = Checkpoints.__table__
+    writes = CheckpointWrites.__table__
+    blobs = CheckpointBlobs.__table__
+
+    # The chain of the latest checkpoint, down to keep_last checkpoints
+    latest = checkpoints.alias("latest")
+    anchor = select(
+        checkpoints.c.thread_id,
+        checkpoints.c.checkpoint_ns,
+        checkpoints.c.checkpoint_id,
+        checkpoints.c.parent_checkpoint_id,
+        literal(1).label("depth"),
+    ).where(
+        tuple_(checkpoints.c.thread_id, checkpoints.c.checkpoint_ns).in_(threads),
+        checkpoints.c.checkpoint_id
+        == select(func.max(latest.c.checkpoint_id))
+        .where(
+            latest.c.thread_id == checkpoints.c.thread_id,
+            latest.c.checkpoint_ns == checkpoints.c.checkpoint_ns,
+        )
+        .scalar_subquery(),
+    )
+    kept = anchor.cte("kept", recursive=True)
+    parent = checkpoints.alias("parent")
+    kept = kept.union_all(
+        select(
+            parent.c.thread_id,
+            parent.c.checkpoint_ns,
+            parent.c.checkpoint_id,
+            parent.c.parent_checkpoint_id,
+            kept.c.depth + 1,
+        ).where(
+            parent.c.thread_id == kept.c.thread_id,
+            parent.c.checkpoint_ns == kept.c.checkpoint_ns,
+            parent.c.checkpoint_id == kept.c.parent_checkpoint_id,
+            kept.c.depth < keep_last,
+        )
+    )
+    # Counted from RETURNING, drivers do not all report the rowcount of a WITH ... DELETE
+    deleted = session.execute(
+        delete(checkpoints)
+        .where(
+            tuple_(checkpoints.c.thread_id, checkpoints.c.checkpoint_ns).in_(threads),
+            ~exists().where(
+                kept.c.thread_id == checkpoints.c.thread_id,
+                kept.c.checkpoint_ns == checkpoints.c.checkpoint_ns,
+                kept.c.checkpoint_id == checkpoints.c.checkpoint_id,
+            ),
+        )
+        .returning(checkpoints.c.checkpoint_id)
+    ).all()
+    result.checkpoints += len(deleted)
+
+    result.writes += session.execute(
+        delete(writes).where(
+            tuple_(writes.c.thread_id, writes.c.checkpoint_ns).in_(threads),
+            ~exists().where(
+                checkpoints.c.thread_id == writes.c.thread_id,
+                checkpoints.c.checkpoint_ns == writes.c.checkpoint_ns,
+                checkpoints.c.checkpoint_id == writes.c.checkpoint_id,
+            ),
+        )
+    ).rowcount
+
+    versions = channel_versions(session)
+    referenced = (
+        select(literal(1))
+        .select_from(checkpoints)
+        .join(versions, true())
+        .where(
+            checkpoints.c.thread_id == blobs.c.thread_id,
+            checkpoints.c.checkpoint_ns == blobs.c.checkpoint_ns,
+            versions.c.key == blobs.c.channel,
+            cast(versions.c.value, String) == blobs.c.version,
+        )
+        .exists()
+    )
+    result.blobs += session.execute(
+        delete(blobs).where(
+            tuple_(blobs.c.thread_id, blobs.c.checkpoint_ns).in_(threads),
+            ~referenced,
+        )
+    ).rowcount
+    result.threads += len(threads)
@@ -0,0 +1,168 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import Session
+
+from welearn_database.data.models.agent_related import (
+    CheckpointBlobs,
+    Checkpoints,
+    CheckpointWrites,
+)
+from welearn_database.database_utils import dialect_insert
+from welearn_database.modules.checkpoint_reader import CheckpointReader
+from welearn_database.modules.checkpoint_storage import thread_lock_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckpointStep:
+    """
+    Everything an agent step persists: its checkpoint, the blobs of the channels it changed and its pending writes.
+    :cvar thread_id: The thread of the checkpoint.
+    :cvar checkpoint_id: The checkpoint id.
+    :cvar checkpoint: The checkpoint document.
+    :cvar checkpoint_ns: The namespace of the checkpoint.
+    :cvar parent_checkpoint_id: The previous checkpoint of the thread, None for the first one.
+    :cvar type_: The serialization type of the checkpoint.
+    :cvar metadata: The checkpoint metadata.
+    :cvar blobs: (channel, version, type, blob) of the new channel versions.
+    :cvar writes: (task_id, idx, channel, type, blob) of the pending writes of the checkpoint.
+    :cvar task_path: The task path of the writes.
+    """
+
+    thread_id: str
+    checkpoint_id: str
+    checkpoint: dict[str, Any]
+    checkpoint_ns: str = ""
+    parent_checkpoint_id: str | None = None
+    type_: str | None = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    blobs: list[tuple[str, str, str, bytes | None]] = field(default_factory=list)
+    writes: list[tuple[str, int, str, str | None, bytes]] = field(default_factory=list)
+    task_path: str = ""
+
+
+def write_checkpoint_steps(
+    session: Session,
+    steps: Iterable[CheckpointStep],
+    reader: CheckpointReader | None = None,
+) -> None:
+    """
+    Persist agent steps in one transaction, with one executemany per table, sent as multi-row inserts.
+    Blobs are immutable once written for a (thread_id, checkpoint_ns, channel, version), so already stored ones are
+    skipped (ON CONFLICT DO NOTHING); checkpoints and writes rewritten under the same key are updated,
+    as the LangGraph saver does. On PostgreSQL, the written threads are locked against prune_checkpoints
+    until the commit, as a step may refer to blobs of older checkpoints the pruner would delete.
+    :param session: The session used to reach the database, committed by the function.
+    :param steps: The steps to persist.
+    :param reader: The checkpoint cache of this process, the rewritten checkpoints are dropped from it.
+    """
+    # Rows are deduplicated by primary key: a multi-row upsert cannot update the same row twice
+    checkpoints: dict[tuple, dict[str, Any]] = {}
+    blobs: dict[tuple, dict[str, Any]] = {}
+    writes: dict[tuple, dict[str, Any]] = {}
+    for step in steps:
+        thread_key = (step.thread_id, step.checkpoint_ns)
+        checkpoints[(*thread_key, step.checkpoint_id)] = {
+            "thread_id": step.thread_id,
+            "checkpoint_ns": step.checkpoint_ns,
+            "checkpoint_id": step.checkpoint_id,
+            "parent_checkpoint_id": step.parent_checkpoint_id,
+            "type": step.type_,
+            "checkpoint": step.checkpoint,
+            "metadata": step.metadata,
+        }
+        for channel, version, type_, blob in step.blobs:
+            blobs.setdefault(
+                (*thread_key, channel, version),
+                {
+                    "thread_id": step.thread_id,
+                    "checkpoint_ns": step.checkpoint_ns,
+                    "channel": channel,
+                    "version": version,
+                    "type": type_,
+                    "blob": blob,
+                },
+            )
+        for task_id, idx, channel, type_, blob in step.writes:
+            writes[(*thread_key, step.checkpoint_id, task_id, idx)] = {
+                "thread_id": step.thread_id,
+                "checkpoint_ns": step.checkpoint_ns,
+                "checkpoint_id": step.checkpoint_id,
+                "task_id": task_id,
+                "idx": idx,
+                "channel": channel,
+                "type": type_,
+                "blob": blob,
+                "task_path": step.task_path,
+            }
+    if not checkpoints:
+        return
+
+    if session.get_bind().dialect.name == "postgresql":
+        # Sorted, so that writers of the same threads take their locks in the same order
+        for thread_id, checkpoint_ns in sorted({key[:2] for key in checkpoints}):
+            session.execute(
+                select(
+                    func.pg_advisory_xact_lock(
+                        thread_lock_key(literal(thread_id), literal(checkpoint_ns))
+                    )
+                )
+            )
+    # Blobs first, so that a checkpoint is never visible without the blobs it refers to
+    if blobs:
+        session.execute(
+            dialect_insert(session, CheckpointBlobs.__table__).on_conflict_do_nothing(),
+            list(blobs.values()),
+        )
+    stmt = dialect_insert(session, Checkpoints.__table__)
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=list(Checkpoints.__table__.primary_key.columns),
+            set_={
+                "checkpoint": stmt.excluded.checkpoint,
+                "metadata": stmt.excluded.metadata,
+            },
+        ),
+        list(checkpoints.values()),
+    )
+    if writes:
+        stmt = dialect_insert(session, CheckpointWrites.__table__)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=list(CheckpointWrites.__table__.primary_key.columns),
+                set_={
+                    "channel": stmt.excluded.channel,
+                    "type": stmt.excluded.type,
+                    "blob": stmt.excluded.blob,
+                },
+            ),
+            list(writes.values()),
+        )
+    session.commit()
+
+    # Blobs are never rewritten, only the cached checkpoints can be stale
+    if reader is not None:
+        for key in checkpoints:
+            reader.invalidate(*key)
+    logger.debug(
+        "%s checkpoints, %s blobs and %s writes written",
+        len(checkpoints),
+        len(blobs),
+        len(writes),
+    )
+
+
+def write_checkpoint_step(
+    session: Session, step: CheckpointStep, reader: CheckpointReader | None = None
+) -> None:
+    """
+    Persist an agent step in one transaction, see write_checkpoint_steps.
+    :param session: The session used to reach the database, committed by the function.
+    :param step: The step to persist.
+    :param reader: The checkpoint cache of this process, the rewritten checkpoint is dropped from it.
+    """
+    write_checkpoint_steps(session, [step], reader)
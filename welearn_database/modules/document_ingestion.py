@@ -0,0 +1,294 @@
+import io
+import logging
+import uuid
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import func, insert, literal, literal_column, select
+from sqlalchemy.orm import Session
+
+from welearn_database.data.details_dict import serialize_details
+from welearn_database.data.models.document_related import WeLearnDocument
+from welearn_database.database_utils import dialect_insert
+from welearn_database.exceptions import MissingRequiredField, WeLearnDatabaseException
+from welearn_database.modules.document_validation import (
+    check_doi,
+    check_url,
+    clean_description,
+    clean_full_content,
+)
+
+logger = logging.getLogger(__name__)
+
+# Columns filled by the ingestion API, created_at and updated_at are left to the database defaults
+DOCUMENT_COLUMNS = (
+    "id",
+    "doi",
+    "external_id",
+    "external_id_type",
+    "url",
+    "title",
+    "lang",
+    "description",
+    "full_content",
+    "details",
+    "trace",
+    "corpus_id",
+)
+
+
+@dataclass
+class RejectedDocument:
+    """
+    A document refused by the validation pass.
+    :cvar index: Position of the document in the input iterable.
+    :cvar document: The document as given by the caller.
+    :cvar error: The validation error (InvalidURLScheme, InvalidDOI, ContentIsTooShort, MissingRequiredField...).
+    """
+
+    index: int
+    document: dict[str, Any]
+    error: WeLearnDatabaseException
+
+
+@dataclass
+class BulkInsertReport:
+    """
+    Outcome of a bulk insertion.
+    :cvar inserted_ids: Identifiers of the inserted documents, in input order.
+    :cvar rejected: Documents refused by the validation pass.
+    """
+
+    inserted_ids: list[uuid.UUID] = field(default_factory=list)
+    rejected: list[RejectedDocument] = field(default_factory=list)
+
+
+@dataclass
+class UpsertReport:
+    """
+    Outcome of an upsert by URL.
+    :cvar inserted_ids: Identifiers of the documents that did not exist yet.
+    :cvar updated_ids: Identifiers of the existing documents whose trace changed.
+    :cvar unchanged_ids: Identifiers of the existing documents left untouched.
+    :cvar rejected: Documents refused by the validation pass.
+    """
+
+    inserted_ids: list[uuid.UUID] = field(default_factory=list)
+    updated_ids: list[uuid.UUID] = field(default_factory=list)
+    unchanged_ids: list[uuid.UUID] = field(default_factory=list)
+    rejected: list[RejectedDocument] = field(default_factory=list)
+
+
+def prepare_document_row(document: dict[str, Any]) -> dict[str, Any]:
+    """
+    Apply the WeLearnDocument validators to a plain dict and build the matching table row.
+    :param document: Document fields, keys are WeLearnDocument attribute names.
+    :return: A row with every column of DOCUMENT_COLUMNS, id is generated when missing.
+    :raises WeLearnDatabaseException: If the document does not pass validation or has no corpus_id
+    """
+    if document.get("corpus_id") is None:
+        raise MissingRequiredField("The document has no corpus_id")
+    full_content, trace = clean_full_content(document.get("full_content"))
+    row = {
+        "id": document.get("id") or uuid.uuid4(),
+        "doi": check_doi(document.get("doi")),
+        "external_id": document.get("external_id"),
+        "external_id_type": document.get("external_id_type"),
+        "url": check_url(document.get("url")),
+        "title": document.get("title"),
+        "lang": document.get("lang"),
+        "description": clean_description(document.get("description")),
+        "full_content": full_content,
+        "details": document.get("details"),
+        "trace": trace,
+        "corpus_id": document["corpus_id"],
+    }
+    return row
+
+
+def prepare_document_rows(
+    documents: Iterable[dict[str, Any]], start_index: int = 0
+) -> tuple[list[dict[str, Any]], list[RejectedDocument]]:
+    """
+    Validate and clean a batch of documents without aborting on invalid ones.
+    :param documents: Documents as plain dicts.
+    :param start_index: Index of the first document, used to report rejects.
+    :return: The valid rows and the rejected documents.
+    """
+    rows = []
+    rejected = []
+    for index, document in enumerate(documents, start=start_index):
+        try:
+            rows.append(prepare_document_row(document))
+        except WeLearnDatabaseException as e:
+            rejected.append(RejectedDocument(index=index, document=document, error=e))
+    return rows, rejected
+
+
+def bulk_insert_documents(
+    session: Session,
+    documents: Iterable[dict[str, Any]],
+    batch_size: int = 5000,
+) -> BulkInsertReport:
+    """
+    Validate and insert documents in batches, bypassing the ORM unit of work.
+    Rows are streamed with COPY on PostgreSQL (psycopg2) and sent as a batched INSERT on other backends.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :param documents: Documents as plain dicts, keys are WeLearnDocument attribute names.
+    :param batch_size: Number of documents validated and sent per round trip.
+    :return: The inserted ids and the rejected documents.
+    """
+    report = BulkInsertReport()
+    use_copy = _supports_copy(session)
+    iterator = iter(documents)
+    start_index = 0
+    while batch := list(islice(iterator, batch_size)):
+        rows, rejected = prepare_document_rows(batch, start_index=start_index)
+        start_index += len(batch)
+        report.rejected.extend(rejected)
+        if not rows:
+            continue
+        if use_copy:
+            _copy_rows(session, rows)
+        else:
+            session.execute(insert(WeLearnDocument.__table__), rows)
+        report.inserted_ids.extend(row["id"] for row in rows)
+
+    logger.info(
+        "%s documents inserted, %s rejected",
+        len(report.inserted_ids),
+        len(report.rejected),
+    )
+    return report
+
+
+def _supports_copy(session: Session) -> bool:
+    dialect = session.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg2"
+
+
+def _copy_value(value: Any) -> str:
+    """
+    Render a value for the PostgreSQL COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _iter_copy_lines(rows: list[dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        values = dict(row)
+        if values["details"] is not None:
+            values["details"] = serialize_details(values["details"])
+        yield "\t".join(_copy_value(values[column]) for column in DOCUMENT_COLUMNS)
+        yield "\n"
+
+
+def _copy_rows(session: Session, rows: list[dict[str, Any]]) -> None:
+    table = WeLearnDocument.__table__
+    buffer = io.StringIO("".join(_iter_copy_lines(rows)))
+    cursor = session.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table.schema}.{table.name} ({', '.join(DOCUMENT_COLUMNS)}) "
+            "FROM STDIN",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def upsert_documents(
+    session: Session,
+    documents: Iterable[dict[str, Any]],
+    chunk_size: int = 1000,
+) -> UpsertReport:
+    """
+    Insert documents or update the existing ones sharing the same URL (welearn_document_url_key),
+    in one INSERT ... ON CONFLICT statement per chunk. On backends other than PostgreSQL,
+    inserted and updated rows are told apart with an extra lookup of the chunk URLs.
+    An existing row is only rewritten when its trace changed. When a URL appears several times
+    in the same chunk, the last occurrence wins.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :param documents: Documents as plain dicts, keys are WeLearnDocument attribute names.
+    :param chunk_size: Number of documents sent per statement.
+    :return: The inserted, updated and unchanged ids and the rejected documents.
+    """
+    report = UpsertReport()
+    iterator = iter(documents)
+    start_index = 0
+    while batch := list(islice(iterator, chunk_size)):
+        rows, rejected = prepare_document_rows(batch, start_index=start_index)
+        start_index += len(batch)
+        report.rejected.extend(rejected)
+        rows_by_url = {row["url"]: row for row in rows}
+        if rows_by_url:
+            _upsert_chunk(session, list(rows_by_url.values()), report)
+
+    logger.info(
+        "%s documents inserted, %s updated, %s unchanged, %s rejected",
+        len(report.inserted_ids),
+        len(report.updated_ids),
+        len(report.unchanged_ids),
+        len(report.rejected),
+    )
+    return report
+
+
+def _upsert_chunk(
+    session: Session, rows: list[dict[str, Any]], report: UpsertReport
+) -> None:
+    table = WeLearnDocument.__table__
+    stmt = dialect_insert(session, table)
+    if session.get_bind().dialect.name == "postgresql":
+        conflict_target = {"constraint": "welearn_document_url_key"}
+        # xmax is only set on rows touched by the update branch
+        is_inserted = literal_column("xmax = 0")
+        existing_urls = None
+    else:
+        conflict_target = {"index_elements": [table.c.url]}
+        is_inserted = literal(False)
+        existing_urls = set(
+            session.scalars(
+                select(table.c.url).where(table.c.url.in_([r["url"] for r in rows]))
+            )
+        )
+
+    update_columns = {
+        column: stmt.excluded[column]
+        for column in DOCUMENT_COLUMNS
+        if column not in ("id", "url")
+    }
+    update_columns["updated_at"] = func.localtimestamp()
+    stmt = stmt.values(rows).on_conflict_do_update(
+        **conflict_target,
+        set_=update_columns,
+        where=table.c.trace.is_distinct_from(stmt.excluded.trace),
+    )
+    stmt = stmt.returning(table.c.id, table.c.url, is_inserted)
+
+    touched_urls = set()
+    for doc_id, url, inserted in session.execute(stmt):
+        touched_urls.add(url)
+        if existing_urls is not None:
+            inserted = url not in existing_urls
+        if inserted:
+            report.inserted_ids.append(doc_id)
+        else:
+            report.updated_ids.append(doc_id)
+
+    unchanged_urls = [row["url"] for row in rows if row["url"] not in touched_urls]
+    if unchanged_urls:
+        report.unchanged_ids.extend(
+            session.scalars(select(table.c.id).where(table.c.url.in_(unchanged_urls)))
+        )
@@ -0,0 +1,116 @@
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from urllib.parse import urlparse
+from zlib import adler32
+
+from welearn_database.exceptions import ContentIsTooShort, InvalidDOI, InvalidURLScheme
+from welearn_database.modules.text_cleaning import CleanedText, clean_text
+from welearn_database.regular_expression import DOI_VALIDATION_REGEX
+
+ACCEPTED_URL_SCHEMES = ["https"]
+MIN_CONTENT_LENGTH = 25
+
+_trusted_values: ContextVar[bool] = ContextVar("trusted_values", default=False)
+
+
+@contextmanager
+def trusted_values() -> Iterator[None]:
+    """
+    Within this context, WeLearnDocument validators store values as is: no URL/DOI check,
+    no cleaning, no length check. Only the trace is still computed from the full content.
+    Meant for pipelines that already validated and cleaned the documents upstream.
+    """
+    token = _trusted_values.set(True)
+    try:
+        yield
+    finally:
+        _trusted_values.reset(token)
+
+
+def values_are_trusted() -> bool:
+    """
+    Tell if the current context is within trusted_values.
+    """
+    return _trusted_values.get()
+
+
+def compute_trace(content: str | None) -> int | None:
+    """
+    Compute the trace stored next to a cleaned full content.
+    :param content: The cleaned full content.
+    :return: The adler32 of the UTF-8 content, None when there is no content.
+    """
+    if not content:
+        return None
+    return adler32(content.encode("utf-8"))
+
+
+def check_url(value: str) -> str:
+    """
+    Ensure the URL has an accepted scheme (https) and a network location.
+    :param value: The URL to validate.
+    :return: The URL, unchanged.
+    :raises InvalidURLScheme: If the URL is missing, not a string, malformed or its scheme is not accepted
+    """
+    if not isinstance(value, str):
+        raise InvalidURLScheme("The URL is not a string : %s", value)
+    try:
+        parsed_url = urlparse(url=value)
+    except ValueError as e:
+        # e.g. an invalid IPv6 network location
+        raise InvalidURLScheme("There is an error on the URL form : %s", value) from e
+    if parsed_url.scheme not in ACCEPTED_URL_SCHEMES or len(parsed_url.netloc) == 0:
+        raise InvalidURLScheme("There is an error on the URL form : %s", value)
+    return value
+
+
+def check_doi(value: str | None) -> str | None:
+    """
+    Ensure the DOI is a bare DOI identifier (without doi.org prefix).
+    :param value: The DOI to validate.
+    :return: The DOI, unchanged.
+    :raises InvalidDOI: If the DOI does not match DOI_VALIDATION_REGEX
+    """
+    if not value:
+        return value
+
+    if not re.match(DOI_VALIDATION_REGEX, value):
+        raise InvalidDOI(f"DOI is not valid : {value}")
+    return value
+
+
+def clean_full_content(value: str | None) -> tuple[str | None, int | None]:
+    """
+    Clean the full content and compute its trace.
+    A CleanedText is not cleaned again. The length is checked on the cleaned content in both cases,
+    so that a content is accepted or rejected whether it was cleaned upstream or not.
+    :param value: The raw full content, or a CleanedText.
+    :return: The cleaned content and its adler32 trace, trace is None when there is no content.
+    :raises ContentIsTooShort: If the cleaned content is shorter than MIN_CONTENT_LENGTH
+    """
+    if not value:
+        return value, None
+    if isinstance(value, CleanedText):
+        cleaned = str(value)
+    else:
+        cleaned = clean_text(value)
+    if len(cleaned) < MIN_CONTENT_LENGTH:
+        raise ContentIsTooShort(f"Content is too short : {len(cleaned)}")
+
+    # Hash compute and db storage
+    return cleaned, compute_trace(cleaned)
+
+
+def clean_description(value: str | None) -> str | None:
+    """
+    Clean the description, a CleanedText is kept as is.
+    :param value: The raw description, or a CleanedText.
+    :return: The cleaned description. If the value is None or empty, it returns the value as is.
+    """
+    if not value:
+        return value
+    if isinstance(value, CleanedText):
+        return str(value)
+    return clean_text(value)
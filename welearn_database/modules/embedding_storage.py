@@ -0,0 +1,68 @@
+import logging
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from welearn_database.data.embedding_array import quantize_embedding
+from welearn_database.data.enumeration import EmbeddingStorage
+from welearn_database.data.models.corpus_related import EmbeddingModel
+from welearn_database.data.models.document_related import DocumentSlice
+
+logger = logging.getLogger(__name__)
+
+
+def requantize_slice_embeddings(
+    session: Session,
+    embedding_model_id: UUID,
+    storage: EmbeddingStorage | str,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Rewrite every slice embedding of an embedding model in the given storage format,
+    then record the format on the embedding model.
+    Slices are walked by id and each batch is committed, so the job can be interrupted and resumed.
+    :param session: The session used to reach the database.
+    :param embedding_model_id: The embedding model whose slices are rewritten.
+    :param storage: The target storage format.
+    :param batch_size: Number of slices rewritten per transaction.
+    :return: The number of rewritten slices.
+    """
+    storage = EmbeddingStorage(storage)
+    rewritten = 0
+    last_id = None
+    while True:
+        query = (
+            select(DocumentSlice.id, DocumentSlice.embedding)
+            .where(
+                DocumentSlice.embedding_model_id == embedding_model_id,
+                DocumentSlice.embedding.is_not(None),
+            )
+            .order_by(DocumentSlice.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            query = query.where(DocumentSlice.id > last_id)
+        rows = session.execute(query).all()
+        if not rows:
+            break
+
+        session.execute(
+            update(DocumentSlice),
+            [
+                {"id": slice_id, "embedding": quantize_embedding(embedding, storage)}
+                for slice_id, embedding in rows
+            ],
+        )
+        session.commit()
+        rewritten += len(rows)
+        last_id = rows[-1].id
+        logger.info("%s slices rewritten as %s", rewritten, storage.value)
+
+    session.execute(
+        update(EmbeddingModel)
+        .where(EmbeddingModel.id == embedding_model_id)
+        .values(embedding_storage=storage.value)
+    )
+    session.commit()
+    return rewritten
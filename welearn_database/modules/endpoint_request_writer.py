@@ -0,0 +1,367 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from queue import Empty, Full, Queue
+from threading import Condition, Lock, Thread
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from welearn_database.data.models.user_related import EndpointRequest
+from welearn_database.database_utils import create_async_db_session, create_db_session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_MS = 200
+DEFAULT_MAX_QUEUE_SIZE = 10_000
+
+_STOP = object()
+
+
+@dataclass
+class WriterStats:
+    """
+    Counters of a buffered writer.
+    :cvar enqueued: Rows accepted in the queue.
+    :cvar dropped: Rows refused because the queue was full or the writer closed.
+    :cvar flushed: Rows written to the database.
+    :cvar failed: Rows lost because their batch could not be written.
+    :cvar batches: Number of multi-row inserts committed.
+    """
+
+    enqueued: int = 0
+    dropped: int = 0
+    flushed: int = 0
+    failed: int = 0
+    batches: int = 0
+
+
+def _endpoint_request_row(
+    session_id: UUID,
+    endpoint_name: str,
+    http_code: int,
+    message: str | None,
+    created_at: datetime | None,
+) -> dict[str, Any]:
+    # id and created_at are set when the request happens, not when its batch is flushed
+    return {
+        "id": uuid.uuid4(),
+        "session_id": session_id,
+        "endpoint_name": endpoint_name,
+        "http_code": http_code,
+        "message": message,
+        "created_at": created_at or datetime.now(),
+    }
+
+
+class EndpointRequestWriter:
+    """
+    Buffer EndpointRequest rows in a bounded queue and insert them in batches from a background thread,
+    so that logging a request does not add a database round trip to the API latency.
+    A batch is flushed once it holds batch_size rows or flush_interval_ms after its first row.
+    When the queue is full, submit waits up to block_timeout seconds, then drops the row.
+    Closing the writer flushes the rows still queued.
+    """
+
+    def __init__(
+        self,
+        session_maker: Callable[[], Session] = create_db_session,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        block_timeout: float | None = 0.0,
+    ):
+        """
+        :param session_maker: Callable returning a new session, the shared engine by default.
+        :param batch_size: Maximum number of rows per insert.
+        :param flush_interval_ms: Maximum time a row waits in a partial batch.
+        :param max_queue_size: Maximum number of rows waiting to be written.
+        :param block_timeout: Seconds submit waits for room in a full queue, 0 drops at once, None waits forever.
+        """
+        self._session_maker = session_maker
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._block_timeout = block_timeout
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        self._thread: Thread | None = None
+        self._closed = False
+        self._lock = Lock()
+        # Guards _closed and the puts; submitters waiting for room release it, they are woken by the
+        # writer thread when it takes a row and by close
+        self._room = Condition(Lock())
+        self.stats = WriterStats()
+
+    def __enter__(self) -> "EndpointRequestWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Start the writer thread.
+        """
+        if self._thread is None:
+            self._thread = Thread(
+                target=self._run, name="endpoint-request-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(
+        self,
+        session_id: UUID,
+        endpoint_name: str,
+        http_code: int,
+        message: str | None = None,
+        created_at: datetime | None = None,
+    ) -> bool:
+        """
+        Queue one endpoint request to be written.
+        :param session_id: The session of the request.
+        :param endpoint_name: The endpoint called.
+        :param http_code: The HTTP status of the response.
+        :param message: Optional message, e.g. an error.
+        :param created_at: Time of the request, now by default.
+        :return: False if the row was dropped.
+        """
+        row = _endpoint_request_row(
+            session_id, endpoint_name, http_code, message, created_at
+        )
+        deadline = (
+            None
+            if self._block_timeout is None
+            else time.monotonic() + self._block_timeout
+        )
+        # close cannot happen between the check and the put, so no row lands after the final drain;
+        # the lock is released while waiting, so each call waits at most its own block_timeout
+        with self._room:
+            while not self._closed:
+                try:
+                    self._queue.put_nowait(row)
+                except Full:
+                    pass
+                else:
+                    self._count(enqueued=1)
+                    return True
+                if deadline is None:
+                    self._room.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._room.wait(remaining)
+        self._count(dropped=1)
+        return False
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Stop accepting rows, flush the queued ones and stop the writer thread.
+        :param timeout: Seconds to wait for the thread, None waits until everything is written.
+        """
+        with self._room:
+            if self._closed:
+                return
+            self._closed = True
+            self._room.notify_all()
+        self.start()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _run(self) -> None:
+        batch: list[dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                row = self._queue.get(timeout=timeout)
+            except Empty:
+                row = None
+            else:
+                with self._room:
+                    self._room.notify()
+            if row is _STOP:
+                # submit and close share a lock, no row is queued behind the stop marker
+                self._flush(batch)
+                return
+            if row is not None:
+                batch.append(row)
+                deadline = deadline or time.monotonic() + self._flush_interval
+            if len(batch) >= self._batch_size or time.monotonic() >= (
+                deadline or float("inf")
+            ):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        try:
+            with self._session_maker() as session:
+                session.execute(insert(EndpointRequest), rows)
+                session.commit()
+        except Exception:
+            logger.exception("Failed to write %s endpoint requests", len(rows))
+            self._count(failed=len(rows))
+        else:
+            self._count(flushed=len(rows), batches=1)
+
+
+class AsyncEndpointRequestWriter:
+    """
+    asyncio counterpart of EndpointRequestWriter: rows are buffered in an asyncio.Queue and inserted
+    in batches by a task of the running event loop.
+    """
+
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncSession] = create_async_db_session,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        block_timeout: float | None = 0.0,
+    ):
+        """
+        :param session_maker: Callable returning a new async session, the shared async engine by default.
+        :param batch_size: Maximum number of rows per insert.
+        :param flush_interval_ms: Maximum time a row waits in a partial batch.
+        :param max_queue_size: Maximum number of rows waiting to be written.
+        :param block_timeout: Seconds submit waits for room in a full queue, 0 drops at once, None waits forever.
+        """
+        self._session_maker = session_maker
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._block_timeout = block_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self.stats = WriterStats()
+
+    async def __aenter__(self) -> "AsyncEndpointRequestWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """
+        Start the writer task on the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(
+        self,
+        session_id: UUID,
+        endpoint_name: str,
+        http_code: int,
+        message: str | None = None,
+        created_at: datetime | None = None,
+    ) -> bool:
+        """
+        Queue one endpoint request to be written.
+        :param session_id: The session of the request.
+        :param endpoint_name: The endpoint called.
+        :param http_code: The HTTP status of the response.
+        :param message: Optional message, e.g. an error.
+        :param created_at: Time of the request, now by default.
+        :return: False if the row was dropped.
+        """
+        row = _endpoint_request_row(
+            session_id, endpoint_name, http_code, message, created_at
+        )
+        if not self._closed:
+            try:
+                if self._block_timeout == 0:
+                    self._queue.put_nowait(row)
+                else:
+                    await asyncio.wait_for(self._queue.put(row), self._block_timeout)
+                self.stats.enqueued += 1
+                if self._task is not None and self._task.done():
+                    # The put waited on a full queue and completed after the final drain
+                    await self._flush(self._drain())
+                return True
+            except (asyncio.QueueFull, asyncio.TimeoutError):
+                pass
+        self.stats.dropped += 1
+        return False
+
+    async def close(self) -> None:
+        """
+        Stop accepting rows, flush the queued ones and wait for the writer task.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self.start()
+        await self._queue.put(_STOP)
+        await self._task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch: list[dict] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0, deadline - loop.time())
+            row = await self._get(timeout)
+            if row is _STOP:
+                await self._flush(batch + self._drain())
+                return
+            if row is not None:
+                batch.append(row)
+                deadline = deadline or loop.time() + self._flush_interval
+            if len(batch) >= self._batch_size or loop.time() >= (
+                deadline or float("inf")
+            ):
+                await self._flush(batch)
+                batch = []
+                deadline = None
+
+    async def _get(self, timeout: float | None):
+        # Not asyncio.wait_for: before Python 3.12 it can drop an item got just as the timeout expires
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        getter = asyncio.ensure_future(self._queue.get())
+        done, _ = await asyncio.wait({getter}, timeout=timeout)
+        if getter in done:
+            return getter.result()
+        # Not done yet, the item of a woken getter stays in the queue when it is cancelled
+        getter.cancel()
+        return None
+
+    def _drain(self) -> list[dict]:
+        # Rows submitted before close but still blocked on a full queue land after the stop marker
+        rows = []
+        while not self._queue.empty():
+            rows.append(self._queue.get_nowait())
+        return rows
+
+    async def _flush(self, rows: list[dict]) -> None:
+        if not rows:
+            return
+        try:
+            async with self._session_maker() as session:
+                await session.execute(insert(EndpointRequest), rows)
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to write %s endpoint requests", len(rows))
+            self.stats.failed += len(rows)
+        else:
+            self.stats.flushed += len(rows)
+            self.stats.batches += 1
@@ -0,0 +1,174 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, delete, func, literal, select, text, true
+from sqlalchemy.orm import Session
+
+from welearn_database.data.models.user_related import (
+    EndpointFeature,
+    EndpointRequest,
+    RollupWatermark,
+)
+from welearn_database.data.models.user_related import Session as UserSession
+from welearn_database.data.models.user_related import SessionFeatureUsage
+from welearn_database.database_utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = "session_feature_usage"
+ADVISORY_LOCK_KEY = "welearn_database.session_feature_usage"
+
+# created_at is the start of the inserting transaction, so recent rows may not be committed yet
+DEFAULT_LAG = timedelta(minutes=1)
+# Rows committed up to this long after their created_at are still counted, see update_session_feature_usage
+DEFAULT_WINDOW = timedelta(hours=1)
+
+
+def update_session_feature_usage(
+    session: Session,
+    until: datetime | None = None,
+    lag: timedelta = DEFAULT_LAG,
+    window: timedelta = DEFAULT_WINDOW,
+) -> int:
+    """
+    Roll up endpoint_request into session_feature_usage for the sessions with requests since the last watermark.
+    created_at does not follow the commit order: the buffered request writer and long transactions commit rows
+    after newer ones, possibly once the watermark has passed them. Each run therefore looks back window before
+    the watermark, and the counts of every session with a request in that range are recomputed from all its
+    requests (endpoint_request is indexed on session_id), so rows committed late within the window are counted
+    exactly once. The watermark then moves to until. On PostgreSQL an advisory lock keeps two runs from
+    writing the same rows concurrently.
+    The update is committed before returning.
+    :param session: The session used to reach the database.
+    :param until: Roll up the rows created up to this timestamp, the database's LOCALTIMESTAMP minus lag by default.
+    :param lag: Margin left for the transactions still inserting rows, ignored when until is given.
+    :param window: How far before the watermark late committed rows are looked for.
+    :return: Number of session_feature_usage rows inserted or updated.
+    """
+    _lock(session)
+    # created_at comes from the database clock, the clock of the application host may drift from it
+    now = session.scalar(select(func.localtimestamp()))
+    until = until or now - lag
+    since = session.scalar(
+        select(RollupWatermark.watermark).where(RollupWatermark.name == WATERMARK_NAME)
+    )
+    if since is not None and since >= until:
+        session.commit()
+        return 0
+
+    touched_sessions = select(EndpointRequest.session_id).where(
+        EndpointRequest.created_at <= until
+    )
+    if since is not None:
+        touched_sessions = touched_sessions.where(
+            EndpointRequest.created_at > since - window
+        )
+    new_requests = (
+        select(EndpointRequest.session_id, EndpointRequest.endpoint_name)
+        .where(
+            EndpointRequest.created_at <= until,
+            EndpointRequest.session_id.in_(touched_sessions.distinct()),
+        )
+        .subquery()
+    )
+    features = select(EndpointFeature.feature_name).distinct().subquery()
+
+    # Every feature gets a row for the session, the unmatched ones with a count of 0
+    counts = (
+        select(
+            new_requests.c.session_id,
+            features.c.feature_name,
+            UserSession.inferred_user_id,
+            UserSession.created_at,
+            func.count(EndpointFeature.endpoint_name),
+            literal(now),
+        )
+        .select_from(new_requests)
+        .join(UserSession, UserSession.id == new_requests.c.session_id)
+        .join(features, true())
+        .outerjoin(
+            EndpointFeature,
+            and_(
+                EndpointFeature.endpoint_name == new_requests.c.endpoint_name,
+                EndpointFeature.feature_name == features.c.feature_name,
+            ),
+        )
+        # SQLite needs a WHERE clause to parse INSERT ... SELECT ... ON CONFLICT
+        .where(true())
+        .group_by(
+            new_requests.c.session_id,
+            features.c.feature_name,
+            UserSession.inferred_user_id,
+            UserSession.created_at,
+        )
+    )
+
+    table = SessionFeatureUsage.__table__
+    stmt = dialect_insert(session, table)
+    stmt = stmt.from_select(
+        [
+            table.c.session_id,
+            table.c.feature_name,
+            table.c.inferred_user_id,
+            table.c.session_created_at,
+            table.c.cnt,
+            table.c.updated_at,
+        ],
+        counts,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.session_id, table.c.feature_name],
+        set_={
+            "cnt": stmt.excluded.cnt,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    row_count = session.execute(stmt).rowcount
+
+    watermark = dialect_insert(session, RollupWatermark.__table__).values(
+        name=WATERMARK_NAME, watermark=until, updated_at=now
+    )
+    watermark = watermark.on_conflict_do_update(
+        index_elements=[RollupWatermark.name],
+        set_={
+            "watermark": watermark.excluded.watermark,
+            "updated_at": watermark.excluded.updated_at,
+        },
+    )
+    session.execute(watermark)
+    session.commit()
+    logger.info(
+        "%s session feature usages updated with the requests from %s to %s",
+        row_count,
+        since,
+        until,
+    )
+    return row_count
+
+
+def rebuild_session_feature_usage(
+    session: Session, until: datetime | None = None, lag: timedelta = DEFAULT_LAG
+) -> int:
+    """
+    Recompute session_feature_usage from the whole endpoint_request history, e.g. after endpoint_feature changed.
+    The rebuild is committed before returning.
+    :param session: The session used to reach the database.
+    :param until: Roll up the rows created up to this timestamp, the database's LOCALTIMESTAMP minus lag by default.
+    :param lag: Margin left for the transactions still inserting rows, ignored when until is given.
+    :return: Number of session_feature_usage rows written.
+    """
+    _lock(session)
+    session.execute(delete(SessionFeatureUsage))
+    session.execute(
+        delete(RollupWatermark).where(RollupWatermark.name == WATERMARK_NAME)
+    )
+    return update_session_feature_usage(session, until=until, lag=lag)
+
+
+def _lock(session: Session) -> None:
+    # Transaction-level advisory locks stack, so rebuilding then updating in one transaction is fine
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": ADVISORY_LOCK_KEY},
+        )
@@ -0,0 +1,142 @@
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from welearn_database.data.enumeration import Step
+from welearn_database.data.models.corpus_related import Corpus
+from welearn_database.data.models.document_related import (
+    DocumentLatestState,
+    HistoricalQtyDocumentInQdrant,
+    HistoricalQtyDocumentInQdrantPerCorpus,
+    HistoricalQtyDocumentPerCorpus,
+    WeLearnDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_KEY = "welearn_database.historical_qty_snapshot"
+
+HISTORICAL_MODELS = (
+    HistoricalQtyDocumentPerCorpus,
+    HistoricalQtyDocumentInQdrantPerCorpus,
+    HistoricalQtyDocumentInQdrant,
+)
+
+
+@dataclass
+class QtySnapshot:
+    """
+    The document quantities written by one snapshot.
+    :cvar created_at: The timestamp shared by every row of the snapshot.
+    :cvar per_corpus: Number of documents with a process state, per corpus source name.
+    :cvar in_qdrant_per_corpus: Number of documents whose latest state is document_in_qdrant, per corpus.
+    :cvar in_qdrant: Number of documents whose latest state is document_in_qdrant.
+    """
+
+    created_at: datetime
+    per_corpus: dict[str, int] = field(default_factory=dict)
+    in_qdrant_per_corpus: dict[str, int] = field(default_factory=dict)
+    in_qdrant: int = 0
+
+
+def compute_qty_snapshot(session: Session, created_at: datetime) -> QtySnapshot:
+    """
+    Compute the three historical quantities with a single aggregate over document_latest_state.
+    :param session: The session used to reach the database.
+    :param created_at: The timestamp of the snapshot.
+    :return: The quantities, nothing is written.
+    """
+    in_qdrant = DocumentLatestState.title == Step.DOCUMENT_IN_QDRANT.value
+    rows = session.execute(
+        select(
+            Corpus.source_name,
+            func.count(),
+            func.count().filter(in_qdrant),
+        )
+        .select_from(DocumentLatestState)
+        .join(WeLearnDocument, WeLearnDocument.id == DocumentLatestState.document_id)
+        .join(Corpus, Corpus.id == WeLearnDocument.corpus_id)
+        .group_by(Corpus.source_name)
+    ).all()
+
+    snapshot = QtySnapshot(created_at=created_at)
+    for source_name, count, in_qdrant_count in rows:
+        snapshot.per_corpus[source_name] = count
+        # Same rows as the in qdrant materialized view, which only lists corpora with documents in Qdrant
+        if in_qdrant_count:
+            snapshot.in_qdrant_per_corpus[source_name] = in_qdrant_count
+        snapshot.in_qdrant += in_qdrant_count
+    return snapshot
+
+
+def snapshot_historical_qty(
+    session: Session, created_at: datetime | None = None
+) -> QtySnapshot:
+    """
+    Fill the historical_qty_* tables from one aggregate query, all rows sharing the same created_at.
+    A day holds at most one snapshot: the rows of an earlier snapshot of the same day are replaced.
+    On PostgreSQL an advisory lock keeps two nodes from writing the same day concurrently.
+    The snapshot is committed before returning.
+    :param session: The session used to reach the database.
+    :param created_at: The timestamp of the snapshot, now by default.
+    :return: The quantities written.
+    """
+    created_at = created_at or datetime.now()
+    day_start = created_at.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timedelta(days=1)
+
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": ADVISORY_LOCK_KEY},
+        )
+    for model in HISTORICAL_MODELS:
+        session.execute(
+            delete(model).where(
+                model.created_at >= day_start, model.created_at < day_end
+            )
+        )
+
+    snapshot = compute_qty_snapshot(session, created_at)
+    if snapshot.per_corpus:
+        session.execute(
+            insert(HistoricalQtyDocumentPerCorpus),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "source_name": source_name,
+                    "count": count,
+                    "created_at": created_at,
+                }
+                for source_name, count in snapshot.per_corpus.items()
+            ],
+        )
+    if snapshot.in_qdrant_per_corpus:
+        session.execute(
+            insert(HistoricalQtyDocumentInQdrantPerCorpus),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "source_name": source_name,
+                    "count": count,
+                    "created_at": created_at,
+                }
+                for source_name, count in snapshot.in_qdrant_per_corpus.items()
+            ],
+        )
+    session.execute(
+        insert(HistoricalQtyDocumentInQdrant).values(
+            id=uuid.uuid4(), count=snapshot.in_qdrant, created_at=created_at
+        )
+    )
+    session.commit()
+    logger.info(
+        "Historical quantities snapshot of %s written for %s corpora",
+        created_at,
+        len(snapshot.per_corpus),
+    )
+    return snapshot
@@ -0,0 +1,100 @@
+"""
+Report the foreign keys of the models that no index can serve.
+
+Usage:
+    python -m welearn_database.modules.index_advisor
+"""
+
+import sys
+from dataclasses import dataclass
+
+from sqlalchemy import ForeignKeyConstraint, MetaData, Table
+
+
+@dataclass
+class UnindexedForeignKey:
+    """
+    A foreign key whose columns are not the leading columns of any index of its table.
+    :cvar table: The table holding the foreign key, schema qualified.
+    :cvar columns: The foreign key columns.
+    :cvar referred_table: The referenced table, schema qualified.
+    """
+
+    table: str
+    columns: tuple[str, ...]
+    referred_table: str
+
+    def suggestion(self) -> str:
+        """
+        :return: The statement creating the missing index.
+        """
+        table_name = self.table.split(".")[-1]
+        name = f"{table_name}_{'_'.join(self.columns)}_idx"
+        return (
+            f"CREATE INDEX CONCURRENTLY {name} ON {self.table} "
+            f"({', '.join(self.columns)});"
+        )
+
+
+def _indexed_prefixes(table: Table) -> list[tuple[str, ...]]:
+    """
+    Column lists able to serve a lookup on their leading columns: indexes, primary and unique keys.
+    """
+    prefixes = [tuple(c.name for c in index.columns) for index in table.indexes]
+    prefixes.append(tuple(c.name for c in table.primary_key.columns))
+    for constraint in table.constraints:
+        if constraint.__visit_name__ == "unique_constraint":
+            prefixes.append(tuple(c.name for c in constraint.columns))
+    prefixes.extend((c.name,) for c in table.columns if c.index or c.unique)
+    return prefixes
+
+
+def _is_covered(columns: tuple[str, ...], prefixes: list[tuple[str, ...]]) -> bool:
+    # Any column order is fine as long as the foreign key columns come first
+    return any(
+        len(prefix) >= len(columns) and set(prefix[: len(columns)]) == set(columns)
+        for prefix in prefixes
+    )
+
+
+def find_unindexed_foreign_keys(metadata: MetaData) -> list[UnindexedForeignKey]:
+    """
+    Inspect the declared tables and list the foreign keys without a supporting index.
+    Joins and ON DELETE checks on these columns scan the whole referencing table.
+    :param metadata: The metadata to inspect, usually Base.metadata.
+    :return: The unindexed foreign keys, sorted by table.
+    """
+    unindexed = []
+    for table in metadata.sorted_tables:
+        prefixes = _indexed_prefixes(table)
+        for constraint in table.constraints:
+            if not isinstance(constraint, ForeignKeyConstraint):
+                continue
+            columns = tuple(c.name for c in constraint.columns)
+            if _is_covered(columns, prefixes):
+                continue
+            unindexed.append(
+                UnindexedForeignKey(
+                    table=table.fullname,
+                    columns=columns,
+                    referred_table=constraint.referred_table.fullname,
+                )
+            )
+    return sorted(unindexed, key=lambda fk: (fk.table, fk.columns))
+
+
+def main() -> int:
+    from welearn_database.data.models import Base
+
+    unindexed = find_unindexed_foreign_keys(Base.metadata)
+    for fk in unindexed:
+        print(
+            f"{fk.table} ({', '.join(fk.columns)}) -> {fk.referred_table}\n"
+            f"    {fk.suggestion()}"
+        )
+    print(f"{len(unindexed)} unindexed foreign keys")
+    return 1 if unindexed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.orm import DeclarativeBase, Session
+
+from welearn_database.data.models import Base
+from welearn_database.data.models.document_related import MaterializedViewRefresh
+
+logger = logging.getLogger(__name__)
+
+# Namespace of the advisory locks taken while refreshing, one lock per view
+ADVISORY_LOCK_NAMESPACE = "welearn_database.materialized_view_refresh"
+
+
+@dataclass
+class RefreshResult:
+    """
+    Outcome of the refresh of one materialized view.
+    :cvar view_name: The schema qualified name of the view.
+    :cvar refreshed: False when the view was skipped because another node held its lock or refreshed it.
+    :cvar concurrently: Whether the view was refreshed without blocking its readers.
+    :cvar duration_seconds: How long the refresh took.
+    """
+
+    view_name: str
+    refreshed: bool
+    concurrently: bool = False
+    duration_seconds: float = 0.0
+
+
+def read_only_tables(base: type[DeclarativeBase] = Base) -> list[Table]:
+    """
+    List the tables of the __read_only__ models, the views and materialized views of the schema.
+    :param base: The declarative base holding the models.
+    :return: The tables, sorted by schema qualified name.
+    """
+    tables = {
+        mapper.local_table
+        for mapper in base.registry.mappers
+        if getattr(mapper.class_, "__read_only__", False)
+    }
+    return sorted(tables, key=lambda table: table.fullname)
+
+
+def unique_index_ddl(table: Table) -> str:
+    """
+    Build the unique index REFRESH MATERIALIZED VIEW CONCURRENTLY needs, on the model primary key.
+    :param table: The table of the materialized view model.
+    :return: The CREATE UNIQUE INDEX IF NOT EXISTS statement.
+    """
+    columns = ", ".join(column.name for column in table.primary_key.columns)
+    return (
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {table.name}_unique_idx "
+        f"ON {table.fullname} ({columns})"
+    )
+
+
+def materialized_views(session: Session) -> dict[Table, bool]:
+    """
+    Find which read-only models are materialized views in the database.
+    :param session: The session used to reach the database.
+    :return: The tables of the materialized views, mapped to whether they are populated.
+    """
+    rows = session.execute(
+        text("SELECT schemaname, matviewname, ispopulated FROM pg_matviews")
+    ).all()
+    populated = {f"{row.schemaname}.{row.matviewname}": row.ispopulated for row in rows}
+    return {
+        table: populated[table.fullname]
+        for table in read_only_tables()
+        if table.fullname in populated
+    }
+
+
+def ensure_unique_indexes(session: Session) -> None:
+    """
+    Create the unique index of every materialized view, so that it can be refreshed concurrently.
+    :param session: The session used to reach the database.
+    """
+    for table in materialized_views(session):
+        session.execute(text(unique_index_ddl(table)))
+    session.commit()
+
+
+def last_refreshes(session: Session) -> dict[str, datetime]:
+    """
+    :param session: The session used to reach the database.
+    :return: The last refresh timestamp of every view refreshed at least once.
+    """
+    rows = session.execute(
+        select(
+            MaterializedViewRefresh.view_name,
+            func.max(MaterializedViewRefresh.refreshed_at),
+        ).group_by(MaterializedViewRefresh.view_name)
+    ).all()
+    return dict(rows)
+
+
+def stale_views(
+    session: Session,
+    view_names: list[str],
+    max_age: timedelta,
+    now: datetime | None = None,
+) -> list[str]:
+    """
+    Select the views not refreshed for longer than max_age, never refreshed views included.
+    :param session: The session used to reach the database.
+    :param view_names: The schema qualified names of the candidate views.
+    :param max_age: How old the last refresh may be.
+    :param now: The reference time, now by default.
+    :return: The stale views, in the order of view_names.
+    """
+    now = now or datetime.now()
+    refreshed_at = last_refreshes(session)
+    return [
+        name
+        for name in view_names
+        if name not in refreshed_at or now - refreshed_at[name] >= max_age
+    ]
+
+
+def refresh_materialized_views(
+    session: Session,
+    max_age: timedelta = timedelta(0),
+    view_names: list[str] | None = None,
+) -> list[RefreshResult]:
+    """
+    Refresh the stale materialized views, each in its own transaction.
+    A view is only refreshed by the node holding its advisory lock, the other nodes skip it.
+    Populated views with a unique index are refreshed CONCURRENTLY so that readers are not blocked,
+    the others with a plain REFRESH. Every refresh is recorded in materialized_view_refresh.
+    :param session: The session used to reach the database.
+    :param max_age: Views refreshed more recently than this are left as is.
+    :param view_names: Restrict the refresh to these schema qualified views.
+    :return: One result per stale view.
+    """
+    views = {
+        table.fullname: (table, populated)
+        for table, populated in materialized_views(session).items()
+    }
+    candidates = [name for name in views if view_names is None or name in view_names]
+    results = []
+    for name in stale_views(session, candidates, max_age):
+        table, populated = views[name]
+        results.append(_refresh_view(session, table, populated, max_age))
+    return results
+
+
+def _has_unique_index(session: Session, table: Table) -> bool:
+    return bool(
+        session.scalar(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indrelid "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = :schema AND c.relname = :name "
+                "AND i.indisunique AND i.indpred IS NULL)"
+            ),
+            {"schema": table.schema, "name": table.name},
+        )
+    )
+
+
+def _refresh_view(
+    session: Session, table: Table, populated: bool, max_age: timedelta
+) -> RefreshResult:
+    # The lock is released with the transaction, i.e. once the refresh is committed
+    locked = session.scalar(
+        text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+        {"key": f"{ADVISORY_LOCK_NAMESPACE}:{table.fullname}"},
+    )
+    if not locked:
+        session.rollback()
+        logger.info("%s is being refreshed by another node, skipped", table.fullname)
+        return RefreshResult(view_name=table.fullname, refreshed=False)
+    if not stale_views(session, [table.fullname], max_age):
+        # Another node refreshed it between the staleness check and the lock
+        session.rollback()
+        return RefreshResult(view_name=table.fullname, refreshed=False)
+
+    concurrently = populated and _has_unique_index(session, table)
+    refreshed_at = datetime.now()
+    start = time.perf_counter()
+    session.execute(
+        text(
+            f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrently else ''}"
+            f"{table.fullname}"
+        )
+    )
+    duration = time.perf_counter() - start
+    session.add(
+        MaterializedViewRefresh(
+            id=uuid.uuid4(),
+            view_name=table.fullname,
+            refreshed_at=refreshed_at,
+            duration_seconds=duration,
+            concurrently=concurrently,
+        )
+    )
+    session.commit()
+    logger.info(
+        "%s refreshed in %.3fs (concurrently: %s)",
+        table.fullname,
+        duration,
+        concurrently,
+    )
+    return RefreshResult(
+        view_name=table.fullname,
+        refreshed=True,
+        concurrently=concurrently,
+        duration_seconds=duration,
+    )
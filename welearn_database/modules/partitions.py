@@ -0,0 +1,214 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Iterable
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Session
+
+from welearn_database.data.models.user_related import EndpointRequest
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_KEY = "welearn_database.partition_maintenance"
+DEFAULT_MONTHS_AHEAD = 3
+
+_PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date | datetime) -> date:
+    """
+    Return the first day of the month of value.
+    :param value: A date or a datetime.
+    :return: The first day of its month.
+    """
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Shift the first day of a month by a number of months.
+    :param month: The first day of a month.
+    :param months: Number of months to add, negative to go back.
+    :return: The first day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class MonthlyPartition:
+    """
+    One month of a table range-partitioned on created_at, named <table>_yYYYYmMM.
+    :cvar schema: The schema of the partitioned table.
+    :cvar table: The name of the partitioned table.
+    :cvar month: The first day of the month held by the partition.
+    """
+
+    schema: str
+    table: str
+    month: date
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_y{self.month:%Y}m{self.month:%m}"
+
+    def create_ddl(self) -> str:
+        return (
+            f"CREATE TABLE IF NOT EXISTS {self.schema}.{self.name} "
+            f"PARTITION OF {self.schema}.{self.table} "
+            f"FOR VALUES FROM ('{self.month}') TO ('{add_months(self.month, 1)}')"
+        )
+
+    def detach_ddl(self) -> str:
+        return (
+            f"ALTER TABLE {self.schema}.{self.table} "
+            f"DETACH PARTITION {self.schema}.{self.name}"
+        )
+
+    @classmethod
+    def from_name(cls, schema: str, table: str, name: str) -> "MonthlyPartition | None":
+        """
+        Parse a partition name, e.g. endpoint_request_y2026m10.
+        :return: The partition, None if the name does not follow the monthly convention (e.g. the default partition).
+        """
+        match = _PARTITION_SUFFIX.search(name)
+        if match is None or name[: match.start()] != table:
+            return None
+        return cls(schema, table, date(int(match[1]), int(match[2]), 1))
+
+
+@dataclass
+class PartitionPlan:
+    """
+    Partitions to create and to detach to bring a table up to date.
+    :cvar to_create: Missing partitions, from the oldest month.
+    :cvar to_detach: Attached partitions past the retention, from the oldest month.
+    """
+
+    to_create: list[MonthlyPartition] = field(default_factory=list)
+    to_detach: list[MonthlyPartition] = field(default_factory=list)
+
+
+def plan_partitions(
+    table: Table,
+    attached: Iterable[str],
+    today: date,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+    retention_months: int | None = None,
+    first_month: date | None = None,
+) -> PartitionPlan:
+    """
+    Decide which monthly partitions to create and to detach, without touching the database.
+    :param table: The partitioned table.
+    :param attached: Names of the partitions currently attached.
+    :param today: The reference date.
+    :param months_ahead: Number of months after the current one that must already have a partition.
+    :param retention_months: Number of months before the current one to keep attached, None keeps every partition.
+    :param first_month: Oldest month that must have a partition, the current month by default.
+    :return: The plan.
+    """
+    current = month_start(today)
+    existing = {
+        partition.month
+        for partition in (
+            MonthlyPartition.from_name(table.schema, table.name, name)
+            for name in attached
+        )
+        if partition is not None
+    }
+    plan = PartitionPlan()
+
+    month = month_start(first_month) if first_month else current
+    if retention_months is not None:
+        oldest = add_months(current, -retention_months)
+        plan.to_detach = [
+            MonthlyPartition(table.schema, table.name, attached_month)
+            for attached_month in sorted(existing)
+            if attached_month < oldest
+        ]
+        month = max(month, oldest)
+    last = add_months(current, months_ahead)
+    while month <= last:
+        if month not in existing:
+            plan.to_create.append(MonthlyPartition(table.schema, table.name, month))
+        month = add_months(month, 1)
+    return plan
+
+
+def attached_partitions(session: Session, table: Table) -> list[str]:
+    """
+    List the partitions attached to a PostgreSQL partitioned table.
+    :param session: The session used to reach the database.
+    :param table: The partitioned table.
+    :return: The names of the partitions, including the default one.
+    """
+    return list(
+        session.scalars(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": f"{table.schema}.{table.name}"},
+        )
+    )
+
+
+def maintain_partitions(
+    session: Session,
+    table: Table = EndpointRequest.__table__,
+    months_ahead: int = DEFAULT_MONTHS_AHEAD,
+    retention_months: int | None = None,
+    archive_schema: str | None = None,
+    today: date | None = None,
+) -> PartitionPlan:
+    """
+    Pre-create the monthly partitions of the coming months and detach the ones past the retention.
+    Detached partitions are kept as plain tables, moved to archive_schema when given, so that they can be
+    dumped or dropped separately. An advisory lock keeps two nodes from maintaining the partitions at once.
+    Only PostgreSQL tables are partitioned, on other backends nothing is done.
+    The changes are committed before returning.
+    :param session: The session used to reach the database.
+    :param table: The partitioned table, user_related.endpoint_request by default.
+    :param months_ahead: Number of months after the current one that must already have a partition.
+    :param retention_months: Number of months before the current one to keep attached, None keeps every partition.
+    :param archive_schema: Existing schema receiving the detached partitions, None leaves them in place.
+    :param today: The reference date, today by default.
+    :return: The partitions created and detached.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        logger.info("%s is not partitioned on this backend", table.fullname)
+        return PartitionPlan()
+
+    session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": ADVISORY_LOCK_KEY},
+    )
+    plan = plan_partitions(
+        table,
+        attached_partitions(session, table),
+        today or date.today(),
+        months_ahead=months_ahead,
+        retention_months=retention_months,
+    )
+    for partition in plan.to_create:
+        session.execute(text(partition.create_ddl()))
+    for partition in plan.to_detach:
+        session.execute(text(partition.detach_ddl()))
+        if archive_schema:
+            session.execute(
+                text(
+                    f"ALTER TABLE {partition.schema}.{partition.name} "
+                    f"SET SCHEMA {archive_schema}"
+                )
+            )
+    session.commit()
+    logger.info(
+        "%s partitions of %s created, %s detached",
+        len(plan.to_create),
+        table.fullname,
+        len(plan.to_detach),
+    )
+    return plan
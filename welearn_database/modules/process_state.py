@@ -0,0 +1,173 @@
+import logging
+import uuid
+from threading import Lock
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import func, insert, select, true
+from sqlalchemy.orm import Session
+
+from welearn_database.data.enumeration import Step
+from welearn_database.data.models.document_related import (
+    DocumentLatestState,
+    ProcessState,
+)
+from welearn_database.database_utils import dialect_insert
+from welearn_database.exceptions import InvalidStepTransition
+from welearn_database.modules.state_machine import ALLOWED_PREVIOUS_STEPS
+
+logger = logging.getLogger(__name__)
+
+# Backends without the operation_order sequence (SQLite) number the states one call at a time
+_operation_order_lock = Lock()
+
+
+def record_transitions(
+    session: Session,
+    document_ids: Iterable[UUID],
+    step: Step,
+    allowed_previous_steps: Iterable[Step | None] | None = None,
+    validate: bool = False,
+) -> tuple[int, int] | None:
+    """
+    Append one ProcessState per document in a single batched INSERT ... RETURNING.
+    On PostgreSQL, operation_order is drawn from its sequence by the INSERT itself and
+    document_latest_state is updated by the trigger; on other backends both are handled here.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :param document_ids: The documents moving to step, duplicates are recorded once.
+    :param step: The step reached by the documents.
+    :param allowed_previous_steps: When given, every document latest step must be one of these,
+    None standing for a document without any state yet.
+    :param validate: Check the transitions against the pipeline of the state_machine module,
+    when allowed_previous_steps is not given.
+    :return: The smallest and greatest operation_order assigned, None when there was no document.
+    With concurrent writers the range may hold states recorded by others.
+    :raises InvalidStepTransition: If a document latest step is not in allowed_previous_steps
+    """
+    document_ids = list(dict.fromkeys(document_ids))
+    if not document_ids:
+        return None
+    if allowed_previous_steps is None and validate:
+        allowed_previous_steps = ALLOWED_PREVIOUS_STEPS[step]
+    if allowed_previous_steps is not None:
+        _check_transitions(session, document_ids, step, allowed_previous_steps)
+
+    table = ProcessState.__table__
+    title = step.value.lower()
+    if session.get_bind().dialect.name == "postgresql":
+        rows = [
+            {"document_id": document_id, "title": title} for document_id in document_ids
+        ]
+        operation_orders = list(
+            session.scalars(insert(table).returning(table.c.operation_order), rows)
+        )
+        first, last = min(operation_orders), max(operation_orders)
+    else:
+        with _operation_order_lock:
+            last_order = session.scalar(select(func.max(table.c.operation_order))) or 0
+            rows = [
+                {
+                    "id": uuid.uuid4(),
+                    "document_id": document_id,
+                    "title": title,
+                    "operation_order": last_order + i,
+                }
+                for i, document_id in enumerate(document_ids, start=1)
+            ]
+            session.execute(insert(table), rows)
+        first, last = last_order + 1, last_order + len(rows)
+        backfill_document_latest_state(session, document_ids)
+
+    logger.info("%s documents moved to %s", len(document_ids), title)
+    return first, last
+
+
+def _check_transitions(
+    session: Session,
+    document_ids: list[UUID],
+    step: Step,
+    allowed_previous_steps: Iterable[Step | None],
+) -> None:
+    allowed = {None if s is None else s.value.lower() for s in allowed_previous_steps}
+    latest_steps = dict(
+        session.execute(
+            select(DocumentLatestState.document_id, DocumentLatestState.title).where(
+                DocumentLatestState.document_id.in_(document_ids)
+            )
+        ).all()
+    )
+    refused = [
+        document_id
+        for document_id in document_ids
+        if latest_steps.get(document_id) not in allowed
+    ]
+    if refused:
+        raise InvalidStepTransition(
+            f"{len(refused)} documents cannot move to {step.value.lower()}, "
+            f"first one is {refused[0]} in {latest_steps.get(refused[0])}"
+        )
+
+
+def backfill_document_latest_state(
+    session: Session, document_ids: Iterable[UUID] | None = None
+) -> int:
+    """
+    Rebuild document_latest_state from the process_state history, in one INSERT ... SELECT.
+    On PostgreSQL the table is then kept current by the trigger on process_state; on other backends
+    this is the way to bring it up to date after appending states.
+    A row is only overwritten by a state with a greater operation_order, so running it twice is harmless.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :param document_ids: Restrict the backfill to these documents, every document when None.
+    :return: Number of rows inserted or updated.
+    """
+    latest = select(
+        ProcessState.document_id,
+        func.max(ProcessState.operation_order).label("operation_order"),
+    ).group_by(ProcessState.document_id)
+    if document_ids is not None:
+        latest = latest.where(ProcessState.document_id.in_(list(document_ids)))
+    latest = latest.subquery()
+
+    states = (
+        select(
+            ProcessState.document_id,
+            ProcessState.id,
+            ProcessState.title,
+            ProcessState.operation_order,
+            ProcessState.created_at,
+        ).join(
+            latest,
+            (latest.c.document_id == ProcessState.document_id)
+            & (latest.c.operation_order == ProcessState.operation_order),
+        )
+        # SQLite needs a WHERE clause to parse INSERT ... SELECT ... ON CONFLICT
+        .where(true())
+    )
+
+    table = DocumentLatestState.__table__
+    stmt = dialect_insert(session, table)
+    stmt = stmt.from_select(
+        [
+            table.c.document_id,
+            table.c.process_state_id,
+            table.c.title,
+            table.c.operation_order,
+            table.c.created_at,
+        ],
+        states,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.document_id],
+        set_={
+            "process_state_id": stmt.excluded.process_state_id,
+            "title": stmt.excluded.title,
+            "operation_order": stmt.excluded.operation_order,
+            "created_at": stmt.excluded.created_at,
+        },
+        where=stmt.excluded.operation_order > table.c.operation_order,
+    )
+    row_count = session.execute(stmt).rowcount
+    logger.info("%s document latest states backfilled", row_count)
+    return row_count
@@ -0,0 +1,179 @@
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Select, select
+
+from welearn_database.data.enumeration import PipelineStage, Step
+from welearn_database.data.models.document_related import (
+    DocumentLatestState,
+    WeLearnDocument,
+)
+
+
+@dataclass(frozen=True)
+class StageDefinition:
+    """
+    A stage of the ingestion pipeline.
+    :cvar consumes: The steps a document must be in for the stage to process it.
+    :cvar produces: The steps the stage can move a document to.
+    """
+
+    consumes: frozenset[Step]
+    produces: frozenset[Step]
+
+
+# The pipeline, every other table of this module is derived from it
+PIPELINE: dict[PipelineStage, StageDefinition] = {
+    PipelineStage.SCRAPE: StageDefinition(
+        consumes=frozenset({Step.URL_RETRIEVED}),
+        produces=frozenset(
+            {
+                Step.DOCUMENT_SCRAPED,
+                Step.DOCUMENT_IS_IRRETRIEVABLE,
+                Step.DOCUMENT_IS_INVALID,
+            }
+        ),
+    ),
+    PipelineStage.VECTORIZE: StageDefinition(
+        consumes=frozenset({Step.DOCUMENT_SCRAPED}),
+        produces=frozenset({Step.DOCUMENT_VECTORIZED, Step.DOCUMENT_IS_INVALID}),
+    ),
+    PipelineStage.CLASSIFY: StageDefinition(
+        consumes=frozenset({Step.DOCUMENT_VECTORIZED}),
+        produces=frozenset(
+            {Step.DOCUMENT_CLASSIFIED_SDG, Step.DOCUMENT_CLASSIFIED_NON_SDG}
+        ),
+    ),
+    PipelineStage.EXTRACT_KEYWORDS: StageDefinition(
+        consumes=frozenset({Step.DOCUMENT_CLASSIFIED_SDG}),
+        produces=frozenset({Step.DOCUMENT_KEYWORDS_EXTRACTED}),
+    ),
+    PipelineStage.LOAD_QDRANT: StageDefinition(
+        consumes=frozenset({Step.DOCUMENT_KEYWORDS_EXTRACTED}),
+        produces=frozenset({Step.DOCUMENT_IN_QDRANT}),
+    ),
+}
+
+# Steps reachable from any state: a document is retrieved again when its source changes,
+# and kept for trace when its source removes it
+ENTRY_STEP = Step.URL_RETRIEVED
+GLOBAL_STEPS = frozenset({Step.URL_RETRIEVED, Step.KEPT_FOR_TRACE})
+
+STEPS: tuple[Step, ...] = tuple(Step)
+STAGES: tuple[PipelineStage, ...] = tuple(PipelineStage)
+# Documents without any process state share the last code
+NO_STATE_CODE = len(STEPS)
+NO_STAGE_CODE = -1
+
+_STEP_CODES: dict[Step | str | None, int] = {
+    **{step: code for code, step in enumerate(STEPS)},
+    **{step.value: code for code, step in enumerate(STEPS)},
+    None: NO_STATE_CODE,
+}
+
+
+def _build_transition_table() -> np.ndarray:
+    table = np.zeros((len(STEPS) + 1, len(STEPS)), dtype=bool)
+    for definition in PIPELINE.values():
+        for previous in definition.consumes:
+            for step in definition.produces:
+                table[_STEP_CODES[previous], _STEP_CODES[step]] = True
+    for step in GLOBAL_STEPS:
+        table[: len(STEPS), _STEP_CODES[step]] = True
+    table[NO_STATE_CODE, _STEP_CODES[ENTRY_STEP]] = True
+    return table
+
+
+def _build_stage_table() -> np.ndarray:
+    table = np.full(len(STEPS) + 1, NO_STAGE_CODE, dtype=np.int8)
+    for stage, definition in PIPELINE.items():
+        for step in definition.consumes:
+            if table[_STEP_CODES[step]] != NO_STAGE_CODE:
+                raise ValueError(f"{step} is consumed by several stages")
+            table[_STEP_CODES[step]] = STAGES.index(stage)
+    return table
+
+
+# TRANSITION_TABLE[previous, next] tells whether a document can move from previous to next
+TRANSITION_TABLE = _build_transition_table()
+TRANSITION_TABLE.flags.writeable = False
+# STAGE_TABLE[step] is the code of the stage processing documents in step, NO_STAGE_CODE for final steps
+STAGE_TABLE = _build_stage_table()
+STAGE_TABLE.flags.writeable = False
+
+ALLOWED_PREVIOUS_STEPS: dict[Step, frozenset[Step | None]] = {
+    step: frozenset(
+        None if code == NO_STATE_CODE else STEPS[code]
+        for code in np.flatnonzero(TRANSITION_TABLE[:, _STEP_CODES[step]])
+    )
+    for step in STEPS
+}
+
+
+def is_transition_allowed(previous: Step | str | None, step: Step | str) -> bool:
+    """
+    Tell whether a document in previous can move to step.
+    :param previous: The current step of the document, None when it has no process state.
+    :param step: The step the document would move to.
+    :return: True if the transition is part of the pipeline.
+    """
+    return bool(TRANSITION_TABLE[_STEP_CODES[previous], _STEP_CODES[step]])
+
+
+def step_codes(steps: Iterable[Step | str | None]) -> np.ndarray:
+    """
+    Encode steps as their position in Step, NO_STATE_CODE standing for None.
+    :param steps: Steps as Step members, database values or None.
+    :return: The codes, as an integer array.
+    """
+    return np.fromiter((_STEP_CODES[step] for step in steps), dtype=np.intp)
+
+
+def classify_by_stage(
+    document_ids: Sequence[UUID], latest_steps: Iterable[Step | str | None]
+) -> dict[PipelineStage, list[UUID]]:
+    """
+    Sort documents into the stages that should process them next, from their latest step.
+    Documents in a final step, or without any state, are left out.
+    :param document_ids: The documents to classify.
+    :param latest_steps: The latest step of each document, in the same order.
+    :return: The documents waiting for each stage, in input order. Every stage is present.
+    """
+    stage_codes = STAGE_TABLE[step_codes(latest_steps)]
+    if len(stage_codes) != len(document_ids):
+        raise ValueError("document_ids and latest_steps must have the same length")
+    buckets = {}
+    for code, stage in enumerate(STAGES):
+        indices = np.flatnonzero(stage_codes == code)
+        buckets[stage] = [document_ids[i] for i in indices]
+    return buckets
+
+
+def ready_for_stage_query(
+    stage: PipelineStage,
+    corpus_id: UUID | None = None,
+    limit: int | None = None,
+) -> Select:
+    """
+    Build the query selecting the documents waiting for a stage, oldest first.
+    It reads document_latest_state only, through its (title, operation_order) index.
+    :param stage: The stage to feed.
+    :param corpus_id: Restrict the selection to a corpus.
+    :param limit: Maximum number of documents selected.
+    :return: A select of DocumentLatestState.document_id.
+    """
+    consumed = [step.value for step in PIPELINE[stage].consumes]
+    query = (
+        select(DocumentLatestState.document_id)
+        .where(DocumentLatestState.title.in_(consumed))
+        .order_by(DocumentLatestState.operation_order)
+    )
+    if corpus_id is not None:
+        query = query.join(
+            WeLearnDocument, WeLearnDocument.id == DocumentLatestState.document_id
+        ).where(WeLearnDocument.corpus_id == corpus_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
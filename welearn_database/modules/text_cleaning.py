@@ -1,16 +1,38 @@
 import logging
+import os
 import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from html import unescape
 from html.parser import HTMLParser
+from itertools import islice
+from typing import Any, Iterable, Iterator
 
 logger = logging.getLogger(__name__)
 
+# Characters that make HTMLParser or unescape change the text, without them both are no-ops
+HTML_MARKUP_CHARS = ("<", "&")
+
+_local = threading.local()
+
+
+class CleanedText(str):
+    """
+    A string already processed by clean_text.
+    WeLearnDocument validators store it as is instead of cleaning it again.
+    """
+
 
 class HTMLTagRemover(HTMLParser):
     def __init__(self):
         super().__init__()
         self.result = []
 
+    def reset(self):
+        super().reset()
+        self.result = []
+
     def handle_data(self, data):
         self.result.append(data)
 
@@ -18,6 +40,32 @@ class HTMLTagRemover(HTMLParser):
         return "".join(self.result)
 
 
+def _get_tag_remover() -> HTMLTagRemover:
+    """
+    Return the HTMLTagRemover of the current thread, reset and ready to be fed.
+    """
+    remover = getattr(_local, "tag_remover", None)
+    if remover is None:
+        remover = HTMLTagRemover()
+        _local.tag_remover = remover
+    else:
+        remover.reset()
+    return remover
+
+
+def has_html_markup(text: str) -> bool:
+    """
+    Tell if the text may contain html tags or entities.
+
+    Args:
+        text (str): text to evaluate
+
+    Returns:
+        bool: False when the text is guaranteed to be markup free
+    """
+    return any(char in text for char in HTML_MARKUP_CHARS)
+
+
 def remove_extra_whitespace(text: str) -> str:
     """removes extra whitespace from text
 
@@ -44,9 +92,11 @@ def remove_html_stuff(text: str) -> str:
     """
     if not isinstance(text, str):
         return text
-    remover = HTMLTagRemover()
+    remover = _get_tag_remover()
     remover.feed(text + "\n")
     txt = remover.get_text()
+    # Do not keep a reference to the (possibly large) parsed text until the next call
+    remover.reset()
     ret = unescape(txt)
     return ret
 
@@ -67,6 +117,7 @@ def format_cc_license(to_format_license: str) -> str:
         f"https://creativecommons.org/licenses/{rights_code.lower()}/{version.lower()}/"
     )
 
+
 def clean_return_to_line(string: str):
     if not isinstance(string, str):
         return string
@@ -86,4 +137,48 @@ def clean_text(content: str) -> str:
     """
     if not isinstance(content, str):
         return content
+    if not has_html_markup(content):
+        # Fast path, html parsing and unescaping would leave the text unchanged
+        return remove_extra_whitespace(content)
     return remove_extra_whitespace(remove_html_stuff(content)).strip()
+
+
+def _clean_chunk(contents: list[Any]) -> list[Any]:
+    return [
+        CleanedText(cleaned) if isinstance(cleaned, str) else cleaned
+        for cleaned in map(clean_text, contents)
+    ]
+
+
+def clean_texts(
+    contents: Iterable[Any], workers: int | None = None, chunksize: int = 64
+) -> Iterator[Any]:
+    """
+    Clean many texts on a process pool, yielding the results in input order.
+    The input is consumed lazily, at most 2 chunks per worker are in flight, so memory stays bounded.
+
+    Args:
+        contents (Iterable): texts to clean, non string items are yielded unchanged
+        workers (int): number of processes, os.cpu_count() by default, 1 cleans in the current process
+        chunksize (int): number of texts sent to a worker at once
+
+    Returns:
+        Iterator: the cleaned texts as CleanedText instances
+    """
+    workers = workers or os.cpu_count() or 1
+    iterator = iter(contents)
+    if workers == 1:
+        while chunk := list(islice(iterator, chunksize)):
+            yield from _clean_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        while True:
+            while len(pending) < 2 * workers and (
+                chunk := list(islice(iterator, chunksize))
+            ):
+                pending.append(executor.submit(_clean_chunk, chunk))
+            if not pending:
+                break
+            yield from pending.popleft().result()
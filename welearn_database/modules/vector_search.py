@@ -0,0 +1,215 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from welearn_database.data.models.document_related import (
+    DocumentSlice,
+    WeLearnDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+# updated_at is the start of the writing transaction, so slices written just before a refresh may not be committed yet
+DEFAULT_REFRESH_LAG = timedelta(minutes=1)
+# Bound of the IN lists, so that large refreshes stay under the bind parameter limits of the drivers
+ID_CHUNK_SIZE = 1000
+
+
+@dataclass
+class SliceMatch:
+    """
+    A slice returned by a search.
+    :cvar slice_id: The id of the matching DocumentSlice.
+    :cvar document_id: The id of the document the slice belongs to.
+    :cvar score: The cosine similarity between the query and the slice.
+    """
+
+    slice_id: UUID
+    document_id: UUID
+    score: float
+
+
+class SliceEmbeddingIndex:
+    """
+    Brute-force cosine search over the DocumentSlice embeddings of one embedding model, held in memory.
+    Meant for offline evaluation and small corpora, where a round trip to Qdrant is not worth it.
+    :ivar build_time: Duration in seconds of the last build or refresh.
+    :ivar query_latency: Duration in seconds of the last search.
+    :ivar loaded_at: Database time of the last build or refresh, None before the first one.
+    """
+
+    def __init__(
+        self,
+        embedding_model_id: UUID,
+        corpus_id: UUID | None = None,
+        lang: str | None = None,
+        refresh_lag: timedelta = DEFAULT_REFRESH_LAG,
+    ):
+        """
+        :param embedding_model_id: The embedding model of the indexed slices.
+        :param corpus_id: Only index the slices of this corpus.
+        :param lang: Only index the slices of documents in this language.
+        :param refresh_lag: Slices updated up to this long before the last refresh are loaded again by the next one.
+        """
+        self.embedding_model_id = embedding_model_id
+        self.corpus_id = corpus_id
+        self.lang = lang
+        self.refresh_lag = refresh_lag
+        self.loaded_at: datetime | None = None
+        self.slice_ids: list[UUID] = []
+        self.document_ids: list[UUID] = []
+        self.matrix: np.ndarray = np.empty((0, 0), dtype=np.float32)
+        self.build_time = 0.0
+        self.query_latency = 0.0
+
+    def __len__(self) -> int:
+        return len(self.slice_ids)
+
+    def build(self, session: Session) -> None:
+        """
+        Load every matching slice embedding into a contiguous, row-normalized float32 matrix.
+        :param session: The session used to reach the database.
+        """
+        start = time.perf_counter()
+        self.loaded_at = session.scalar(select(func.localtimestamp()))
+        rows = session.execute(self._query()).all()
+        self.slice_ids = [row.id for row in rows]
+        self.document_ids = [row.document_id for row in rows]
+        self.matrix = self._to_matrix([row.embedding for row in rows])
+        self.build_time = time.perf_counter() - start
+        logger.info("Index built with %s slices in %.3fs", len(self), self.build_time)
+
+    def refresh(self, session: Session) -> None:
+        """
+        Bring the index up to date: slices updated since the last build or refresh (new or re-vectorized ones)
+        are loaded, by DocumentSlice.updated_at, and slices deleted since are dropped. Slices committed more than
+        refresh_lag after their updated_at are still caught by id when they are new; a re-vectorization committed
+        that late is only seen by the next build.
+        :param session: The session used to reach the database.
+        """
+        if self.loaded_at is None:
+            self.build(session)
+            return
+        start = time.perf_counter()
+        loaded_at = session.scalar(select(func.localtimestamp()))
+        current_ids = set(
+            session.scalars(self._query().with_only_columns(DocumentSlice.id))
+        )
+        updated_rows = session.execute(
+            self._query().where(
+                DocumentSlice.updated_at > self.loaded_at - self.refresh_lag
+            )
+        ).all()
+        updated_ids = {r.id for r in updated_rows}
+        missing_ids = iter(
+            current_ids.difference(self.slice_ids).difference(updated_ids)
+        )
+        while chunk := list(islice(missing_ids, ID_CHUNK_SIZE)):
+            updated_rows += session.execute(
+                self._query().where(DocumentSlice.id.in_(chunk))
+            ).all()
+
+        # Updated slices replace their previous embedding
+        replaced_ids = {r.id for r in updated_rows}
+        kept = [
+            i
+            for i, slice_id in enumerate(self.slice_ids)
+            if slice_id in current_ids and slice_id not in replaced_ids
+        ]
+        self.slice_ids = [self.slice_ids[i] for i in kept] + [
+            r.id for r in updated_rows
+        ]
+        self.document_ids = [self.document_ids[i] for i in kept] + [
+            r.document_id for r in updated_rows
+        ]
+        new_matrix = self._to_matrix([r.embedding for r in updated_rows])
+        if len(kept) == 0:
+            self.matrix = new_matrix
+        elif len(updated_rows) == 0:
+            self.matrix = np.ascontiguousarray(self.matrix[kept])
+        else:
+            self.matrix = np.concatenate([self.matrix[kept], new_matrix])
+        self.loaded_at = loaded_at
+        self.build_time = time.perf_counter() - start
+        logger.info(
+            "Index refreshed, %s slices loaded, %s kept, in %.3fs",
+            len(updated_rows),
+            len(kept),
+            self.build_time,
+        )
+
+    def search(self, queries: np.ndarray, k: int = 10) -> list[list[SliceMatch]]:
+        """
+        Find the k slices closest to each query by cosine similarity.
+        :param queries: One query vector or a (n_queries, dimension) matrix.
+        :param k: Number of slices returned per query.
+        :return: For each query, its matches sorted by decreasing score.
+        """
+        start = time.perf_counter()
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        k = min(k, len(self))
+        if k == 0:
+            self.query_latency = time.perf_counter() - start
+            return [[] for _ in range(len(queries))]
+
+        scores = (queries / _norms(queries)) @ self.matrix.T
+        top_k = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top_k, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_k = np.take_along_axis(top_k, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = [
+            [
+                SliceMatch(
+                    slice_id=self.slice_ids[i],
+                    document_id=self.document_ids[i],
+                    score=float(score),
+                )
+                for i, score in zip(indices, query_scores)
+            ]
+            for indices, query_scores in zip(top_k, top_scores)
+        ]
+        self.query_latency = time.perf_counter() - start
+        return results
+
+    def _query(self):
+        query = select(
+            DocumentSlice.id, DocumentSlice.document_id, DocumentSlice.embedding
+        ).where(
+            DocumentSlice.embedding_model_id == self.embedding_model_id,
+            DocumentSlice.embedding.is_not(None),
+        )
+        if self.corpus_id is not None or self.lang is not None:
+            query = query.join(
+                WeLearnDocument, WeLearnDocument.id == DocumentSlice.document_id
+            )
+        if self.corpus_id is not None:
+            query = query.where(WeLearnDocument.corpus_id == self.corpus_id)
+        if self.lang is not None:
+            query = query.where(WeLearnDocument.lang == self.lang)
+        return query
+
+    def _to_matrix(self, embeddings: list[np.ndarray]) -> np.ndarray:
+        if not embeddings:
+            dimension = self.matrix.shape[1] if self.matrix.size else 0
+            return np.empty((0, dimension), dtype=np.float32)
+        matrix = np.empty((len(embeddings), len(embeddings[0])), dtype=np.float32)
+        for i, embedding in enumerate(embeddings):
+            matrix[i] = embedding
+        matrix /= _norms(matrix)
+        return matrix
+
+
+def _norms(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Null vectors keep a null score instead of producing NaN
+    norms[norms == 0] = 1.0
+    return norms
@@ -0,0 +1,187 @@
+import logging
+from datetime import timedelta
+from threading import Lock
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import (
+    TIMESTAMP,
+    ColumnElement,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from welearn_database.data.enumeration import Step
+from welearn_database.data.models.document_related import (
+    DocumentClaim,
+    DocumentLatestState,
+)
+from welearn_database.database_utils import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 600
+
+# Backends without row locks (SQLite) claim one batch at a time per process
+_claim_lock = Lock()
+
+
+def claim_documents(
+    session: Session,
+    step: Step,
+    worker_id: str,
+    batch_size: int = 100,
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+) -> list[UUID]:
+    """
+    Atomically claim up to batch_size documents whose latest state is step, oldest first.
+    Candidates are read from document_latest_state with FOR UPDATE SKIP LOCKED, so concurrent workers
+    never wait on each other nor claim the same document. A document stays claimed until its lease
+    expires, it is released, or it moves to another step.
+    The claim is committed before returning, so that other workers see it.
+    :param session: The session used to reach the database.
+    :param step: The step the documents must be in, e.g. Step.DOCUMENT_SCRAPED for the vectorizer.
+    :param worker_id: Identifier of the claiming worker, used to release or extend the leases.
+    :param batch_size: Maximum number of documents claimed.
+    :param lease_seconds: Duration of the lease.
+    :return: The identifiers of the claimed documents.
+    """
+    step_value = step.value.lower()
+    now = _db_now(session)
+    claim = DocumentClaim.__table__
+    latest = DocumentLatestState.__table__
+
+    active_claim = exists().where(
+        claim.c.document_id == latest.c.document_id,
+        claim.c.step == step_value,
+        claim.c.lease_expires_at > now,
+    )
+    candidates = (
+        select(
+            latest.c.document_id,
+            literal(step_value, claim.c.step.type),
+            literal(worker_id, claim.c.worker_id.type),
+            now,
+            _lease_expiry(session, now, lease_seconds),
+        )
+        .where(latest.c.title == step_value, ~active_claim)
+        .order_by(latest.c.operation_order)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True, of=latest)
+    )
+    stmt = dialect_insert(session, claim)
+    stmt = stmt.from_select(
+        ["document_id", "step", "worker_id", "claimed_at", "lease_expires_at"],
+        candidates,
+    )
+    # A concurrent worker may have committed a claim after this statement snapshot was taken
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[claim.c.document_id],
+        set_={
+            "step": stmt.excluded.step,
+            "worker_id": stmt.excluded.worker_id,
+            "claimed_at": stmt.excluded.claimed_at,
+            "lease_expires_at": stmt.excluded.lease_expires_at,
+        },
+        where=or_(
+            claim.c.lease_expires_at <= now,
+            claim.c.step != stmt.excluded.step,
+        ),
+    ).returning(claim.c.document_id)
+
+    if session.get_bind().dialect.name == "postgresql":
+        claimed = list(session.scalars(stmt))
+        session.commit()
+    else:
+        with _claim_lock:
+            claimed = list(session.scalars(stmt))
+            session.commit()
+
+    logger.info(
+        "Worker %s claimed %s documents in step %s", worker_id, len(claimed), step_value
+    )
+    return claimed
+
+
+def release_documents(
+    session: Session, worker_id: str, document_ids: Iterable[UUID]
+) -> int:
+    """
+    Release the leases held by a worker, e.g. once it recorded the next ProcessState of the documents.
+    Leases held by other workers are left untouched.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :param worker_id: Identifier of the worker holding the leases.
+    :param document_ids: The documents to release.
+    :return: Number of leases released.
+    """
+    stmt = delete(DocumentClaim).where(
+        DocumentClaim.worker_id == worker_id,
+        DocumentClaim.document_id.in_(list(document_ids)),
+    )
+    return session.execute(stmt).rowcount
+
+
+def extend_leases(
+    session: Session,
+    worker_id: str,
+    document_ids: Iterable[UUID],
+    lease_seconds: int = DEFAULT_LEASE_SECONDS,
+) -> int:
+    """
+    Push back the expiry of leases still held by a worker, for batches longer than the lease.
+    Expired leases are not extended, as another worker may have claimed the documents since.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :param worker_id: Identifier of the worker holding the leases.
+    :param document_ids: The documents whose leases are extended.
+    :param lease_seconds: New duration of the leases, from now.
+    :return: Number of leases extended.
+    """
+    now = _db_now(session)
+    stmt = (
+        update(DocumentClaim)
+        .where(
+            DocumentClaim.worker_id == worker_id,
+            DocumentClaim.document_id.in_(list(document_ids)),
+            DocumentClaim.lease_expires_at > now,
+        )
+        .values(lease_expires_at=_lease_expiry(session, now, lease_seconds))
+    )
+    return session.execute(stmt).rowcount
+
+
+def purge_expired_claims(session: Session) -> int:
+    """
+    Delete expired leases. They are ignored by claim_documents, this only keeps the table small.
+    Nothing is committed, the caller owns the transaction.
+    :param session: The session used to reach the database.
+    :return: Number of leases deleted.
+    """
+    stmt = delete(DocumentClaim).where(
+        DocumentClaim.lease_expires_at <= _db_now(session)
+    )
+    return session.execute(stmt).rowcount
+
+
+def _db_now(session: Session) -> ColumnElement:
+    # Leases are written and checked against the database clock, the clocks of the worker hosts may drift apart.
+    # statement_timestamp rather than LOCALTIMESTAMP, the start of the transaction, as callers own long ones
+    if session.get_bind().dialect.name == "postgresql":
+        return cast(func.statement_timestamp(), TIMESTAMP(timezone=False))
+    return func.localtimestamp()
+
+
+def _lease_expiry(
+    session: Session, now: ColumnElement, lease_seconds: int
+) -> ColumnElement:
+    if session.get_bind().dialect.name == "postgresql":
+        return now + literal(timedelta(seconds=lease_seconds))
+    return func.datetime(now, f"{lease_seconds:+d} seconds")